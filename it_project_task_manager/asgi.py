@@ -13,4 +13,14 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "it_project_task_manager.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# needs the apps loaded by get_asgi_application()
+from tasks import sse  # noqa: E402
+from tasks.search import start_ngram_indexes  # noqa: E402
+
+start_ngram_indexes()
+
+# Django 4.1 can't stream async responses, the task events stream is
+# served by its own ASGI app
+application = sse.route(django_application)
@@ -0,0 +1,26 @@
+"""
+Settings profiles: base.py holds what every environment shares, dev.py
+adds the debug toolbar and DEBUG, prod.py tunes for serving traffic.
+
+DJANGO_SETTINGS_PROFILE picks the profile ("dev" or "prod"). Without it
+DJANGO_DEBUG=False selects prod, as deployments already set it, and
+anything else dev. A profile can also be used directly with
+DJANGO_SETTINGS_MODULE=it_project_task_manager.settings.prod.
+"""
+import os
+
+PROFILES = ("dev", "prod")
+
+PROFILE = os.environ.get("DJANGO_SETTINGS_PROFILE") or (
+    "prod" if os.environ.get("DJANGO_DEBUG", "") == "False" else "dev"
+)
+if PROFILE not in PROFILES:
+    raise ValueError(
+        f"DJANGO_SETTINGS_PROFILE must be one of {', '.join(PROFILES)}, "
+        f"not {PROFILE!r}."
+    )
+
+if PROFILE == "prod":
+    from .prod import *  # noqa: F401,F403
+else:
+    from .dev import *  # noqa: F401,F403
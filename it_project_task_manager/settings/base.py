@@ -0,0 +1,238 @@
+"""
+Django settings for it_project_task_manager project, shared by every
+profile. dev.py and prod.py build on these, see __init__.py for how one
+is picked.
+
+Generated by 'django-admin startproject' using Django 4.1.6.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.1/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/4.1/ref/settings/
+"""
+import os
+from pathlib import Path
+import dj_database_url
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/4.1/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.environ.get(
+    "DJANGO_SECRET_KEY"
+)
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = False
+
+ALLOWED_HOSTS = ["127.0.0.1", "https://it-team-task-manager.onrender.com/"]
+
+# Application definition
+
+INSTALLED_APPS = [
+    "django.contrib.admin",
+    "django.contrib.auth",
+    "django.contrib.contenttypes",
+    "django.contrib.sessions",
+    "django.contrib.messages",
+    "django.contrib.staticfiles",
+    "tasks",
+    "crispy_forms",
+]
+
+MIDDLEWARE = [
+    # first, so its timings cover the other middleware
+    "tasks.metrics.MetricsMiddleware",
+    "tasks.nplusone.NPlusOneMiddleware",
+    "tasks.replicas.ReplicaMiddleware",
+    "django.middleware.security.SecurityMiddleware",
+    "whitenoise.middleware.WhiteNoiseMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+ROOT_URLCONF = "it_project_task_manager.urls"
+
+TEMPLATES = [
+    {
+        "BACKEND": "django.template.backends.django.DjangoTemplates",
+        "DIRS": [BASE_DIR / "templates"],
+        "APP_DIRS": True,
+        "OPTIONS": {
+            "context_processors": [
+                "django.template.context_processors.debug",
+                "django.template.context_processors.request",
+                "django.contrib.auth.context_processors.auth",
+                "django.contrib.messages.context_processors.messages",
+            ],
+        },
+    },
+]
+
+CRISPY_TEMPLATE_PACK = "bootstrap4"
+
+# Keyset pagination for list views instead of COUNT(*) + OFFSET pages
+CURSOR_PAGINATION = os.environ.get("DJANGO_CURSOR_PAGINATION", "") == "True"
+
+WSGI_APPLICATION = "it_project_task_manager.wsgi.application"
+
+
+# Database
+# https://docs.djangoproject.com/en/4.1/ref/settings/#databases
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / "db.sqlite3",
+    }
+}
+
+# dj-database-url
+db_from_env = dj_database_url.config(conn_max_age=500)
+DATABASES["default"].update(db_from_env)
+
+# Read replicas: every <NAME>_DATABASE_URL next to DATABASE_URL adds the
+# "<name>" alias, e.g. REPLICA1_DATABASE_URL -> "replica1". The views in
+# DATABASE_REPLICA_VIEWS read from them, see tasks.replicas.
+DATABASE_REPLICAS = []
+for variable, url in sorted(os.environ.items()):
+    alias = variable.removesuffix("_DATABASE_URL").lower()
+    if variable.endswith("_DATABASE_URL") and alias != "default":
+        DATABASES[alias] = dj_database_url.parse(url, conn_max_age=500)
+        DATABASE_REPLICAS.append(alias)
+
+DATABASE_ROUTERS = ["tasks.replicas.ReplicaRouter"]
+DATABASE_REPLICA_VIEWS = [
+    "tasks:index",
+    "tasks:dashboard-stats",
+    "tasks:dashboard-team",
+    "tasks:dashboard-my-tasks",
+    "tasks:api-search-tasks",
+    "tasks:api-search-workers",
+    "tasks:api-worker-lookup",
+    "tasks:workers-list",
+    "tasks:workload-leaderboard",
+    "tasks:tasks-list",
+    "tasks:tasks-export",
+    "tasks:high-priority-tasks-list",
+    "tasks:tasks-completed-list",
+    "tasks:tasks-due-soon",
+    "tasks:tasks-calendar",
+    "tasks:notifications",
+]
+# After a POST (or any other write) the client reads from the primary for
+# this long, so it sees its own change whatever the replication lag
+DATABASE_REPLICA_STICKY_SECONDS = int(
+    os.environ.get("DJANGO_REPLICA_STICKY_SECONDS", 10)
+)
+
+# Cache
+# https://docs.djangoproject.com/en/4.1/topics/cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        # room for the task row fragments, the default is 300 entries
+        "OPTIONS": {"MAX_ENTRIES": 10000},
+    }
+}
+
+# Redis (or a Redis-compatible server) needs the redis package installed
+if os.environ.get("REDIS_URL"):
+    CACHES["default"] = {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": os.environ["REDIS_URL"],
+    }
+
+# Cache alias holding the per-worker notification digests
+NOTIFICATIONS_CACHE = "default"
+# The workload matrix is keyed by a version in the database, so it stays
+# correct in per-process caches, a shared one saves each process a rebuild
+WORKLOAD_CACHE = "default"
+# Rendered task list pages and rows, see tasks.page_cache
+PAGE_CACHE = "default"
+PAGE_CACHE_TIMEOUT = 60 * 60
+
+# Live task events, see tasks.events. LocalBroker only reaches clients of
+# the same process, use RedisBroker when running several processes.
+EVENTS_BROKER = "tasks.events.LocalBroker"
+EVENTS_REDIS_URL = os.environ.get("REDIS_URL")
+if EVENTS_REDIS_URL:
+    EVENTS_BROKER = "tasks.events.RedisBroker"
+# frames a connection may fall behind before it is told to resync
+EVENTS_QUEUE_SIZE = 100
+EVENTS_HEARTBEAT = 15
+EVENTS_RETRY_MS = 5000
+
+# Per view request metrics served at /metrics, see tasks.metrics. Staff
+# can read them, scrapers send "Authorization: Bearer <METRICS_TOKEN>".
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
+# requests at least this slow are logged with their slowest queries, an
+# empty value turns the log off
+METRICS_SLOW_REQUEST_MS = os.environ.get("METRICS_SLOW_REQUEST_MS", "1000")
+METRICS_SLOW_REQUEST_MS = (
+    int(METRICS_SLOW_REQUEST_MS) if METRICS_SLOW_REQUEST_MS else None
+)
+METRICS_SLOW_QUERIES = 5
+
+# Repeated query detection, see tasks.nplusone: "warn" logs on the
+# tasks.nplusone logger (staging), "raise" fails the request (tests),
+# empty turns it off
+NPLUSONE_DETECTION = os.environ.get("NPLUSONE_DETECTION") or None
+NPLUSONE_THRESHOLD = 5
+
+
+# Password validation
+# https://docs.djangoproject.com/en/4.1/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.MinimumLengthValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.CommonPasswordValidator",
+    },
+    {
+        "NAME": "django.contrib.auth.password_validation.NumericPasswordValidator",
+    },
+]
+
+AUTH_USER_MODEL = "tasks.Worker"
+
+LOGIN_REDIRECT_URL = "/"
+
+# Internationalization
+# https://docs.djangoproject.com/en/4.1/topics/i18n/
+
+LANGUAGE_CODE = "en-us"
+
+TIME_ZONE = "UTC"
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/4.1/howto/static-files/
+
+STATIC_URL = "/static/"
+STATICFILES_DIRS = (BASE_DIR / "static",)
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/4.1/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
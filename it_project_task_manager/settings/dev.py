@@ -0,0 +1,13 @@
+"""Local development: DEBUG on unless DJANGO_DEBUG=False, debug toolbar."""
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, MIDDLEWARE, os
+
+DEBUG = os.environ.get("DJANGO_DEBUG", "") != "False"
+
+INTERNAL_IPS = [
+    "127.0.0.1",
+]
+
+INSTALLED_APPS = [*INSTALLED_APPS, "debug_toolbar"]
+
+MIDDLEWARE = [*MIDDLEWARE, "debug_toolbar.middleware.DebugToolbarMiddleware"]
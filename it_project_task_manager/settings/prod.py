@@ -0,0 +1,42 @@
+"""
+Serving traffic: no debug toolbar, templates compiled once per process,
+persistent database connections checked before reuse, sessions read from
+the cache and compressed, hashed static files.
+"""
+from .base import *  # noqa: F401,F403
+from .base import CACHES, DATABASES, TEMPLATES, os
+
+DEBUG = False
+
+# Persistent connections, a connection that died while idle (database
+# restart, proxy timeout) is replaced instead of failing the request
+for database in DATABASES.values():
+    database["CONN_MAX_AGE"] = int(os.environ.get("DJANGO_CONN_MAX_AGE", 600))
+    database["CONN_HEALTH_CHECKS"] = True
+
+# Compile every template once per process
+TEMPLATES[0]["APP_DIRS"] = False
+TEMPLATES[0]["OPTIONS"]["loaders"] = [
+    (
+        "django.template.loaders.cached.Loader",
+        [
+            "django.template.loaders.filesystem.Loader",
+            "django.template.loaders.app_directories.Loader",
+        ],
+    ),
+]
+
+# Any cache backend, e.g. DJANGO_CACHE_BACKEND=django.core.cache.backends.
+# memcached.PyMemcacheCache and DJANGO_CACHE_LOCATION=127.0.0.1:11211.
+# Otherwise REDIS_URL or the local memory cache as in base.py.
+if os.environ.get("DJANGO_CACHE_BACKEND"):
+    CACHES["default"] = {
+        "BACKEND": os.environ["DJANGO_CACHE_BACKEND"],
+        "LOCATION": os.environ.get("DJANGO_CACHE_LOCATION", ""),
+    }
+
+# Sessions are read from the cache and written through to the database,
+# so a cache restart or a per-process cache doesn't log anyone out
+SESSION_ENGINE = "django.contrib.sessions.backends.cached_db"
+
+STATICFILES_STORAGE = "whitenoise.storage.CompressedManifestStaticFilesStorage"
@@ -18,9 +18,15 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 
+from tasks.metrics import metrics
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", include("tasks.urls", namespace="tasks")),
     path("accounts/", include("django.contrib.auth.urls")),
-    path("__debug__/", include("debug_toolbar.urls")),
+    path("metrics", metrics, name="metrics"),
 ] + static(settings.STATIC_URL, document_root=settings.STATIC_ROOT)
+
+# only the dev profile installs the toolbar
+if "debug_toolbar" in settings.INSTALLED_APPS:
+    urlpatterns.append(path("__debug__/", include("debug_toolbar.urls")))
@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "it_project_task_manager.settings")
 
 application = get_wsgi_application()
+
+# needs the apps loaded by get_wsgi_application()
+from tasks.search import start_ngram_indexes  # noqa: E402
+
+start_ngram_indexes()
@@ -1,11 +1,52 @@
-from django.contrib import admin
+from django.contrib import admin, messages
 from django.contrib.auth.admin import UserAdmin
+from django.core.exceptions import ValidationError
+
+from .bulk import MAX_TASKS, UPDATED, run_bulk_action
 from .models import Worker, TaskType, Task, Position
 
 
+def run_admin_bulk_action(modeladmin, request, queryset, action, **options):
+    # "select all" on a large changelist can exceed the per call limit
+    pks = list(queryset.values_list("pk", flat=True))
+    results = []
+    try:
+        for start in range(0, len(pks), MAX_TASKS):
+            results += run_bulk_action(
+                action, pks[start:start + MAX_TASKS], **options
+            )
+    except ValidationError as e:
+        modeladmin.message_user(
+            request, " ".join(e.messages), level=messages.ERROR
+        )
+        return
+    updated = sum(status == UPDATED for _, status in results)
+    modeladmin.message_user(
+        request, f"{updated} of {len(results)} tasks changed."
+    )
+
+
+@admin.action(description="Mark selected tasks as completed")
+def complete_tasks(modeladmin, request, queryset):
+    run_admin_bulk_action(modeladmin, request, queryset, "complete")
+
+
+def reprioritize_action(priority):
+    def reprioritize_tasks(modeladmin, request, queryset):
+        run_admin_bulk_action(
+            modeladmin, request, queryset, "reprioritize", priority=priority
+        )
+
+    reprioritize_tasks.__name__ = f"reprioritize_{priority.lower()}"
+    return admin.action(
+        description=f"Set priority of selected tasks to {priority}"
+    )(reprioritize_tasks)
+
+
 @admin.register(Worker)
 class WorkerAdmin(UserAdmin):
     list_display = UserAdmin.list_display + ("position",)
+    list_select_related = ("position",)
     fieldsets = UserAdmin.fieldsets + (
         (("Additional info", {"fields": ("position",)}),)
     )
@@ -47,3 +88,13 @@ class Task(admin.ModelAdmin):
         "task_type",
         "is_completed"
     )
+    actions = [complete_tasks] + [
+        reprioritize_action(priority)
+        for priority in Task.PriorityType.values
+    ]
+
+    def formfield_for_manytomany(self, db_field, request, **kwargs):
+        if db_field.name == "assignees":
+            # Worker.__str__ shows the position
+            kwargs["queryset"] = Worker.objects.select_related("position")
+        return super().formfield_for_manytomany(db_field, request, **kwargs)
@@ -0,0 +1,166 @@
+import json
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.decorators import login_required
+from django.core.exceptions import ValidationError
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import require_GET, require_POST
+
+from tasks.bulk import run_bulk_action
+from tasks.forms import worker_label
+from tasks.models import Task, Worker
+from tasks.search import get_search_backend
+from tasks.services import DashboardStats
+
+SEARCH_MIN_LENGTH = 2
+SEARCH_DEFAULT_LIMIT = 10
+SEARCH_MAX_LIMIT = 25
+# identical keystroke sequences are answered from the browser cache
+SEARCH_MAX_AGE = 30
+WORKER_LOOKUP_PAGE_SIZE = 20
+
+
+@login_required
+@require_GET
+def dashboard_stats(request):
+    """Dashboard counters as JSON."""
+    return JsonResponse(DashboardStats.collect().as_dict())
+
+
+@require_GET
+def worker_lookup(request):
+    """
+    Workers for the assignee pickers, `q` matches the start of the
+    username. Pages are keyed on the last username sent, `next`, so
+    there is no OFFSET or COUNT. On PostgreSQL the prefix is served by
+    the varchar_pattern_ops index of migration 0016; SQLite's LIKE is
+    case-insensitive and scans, fine at its scale.
+    """
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=401,
+        )
+
+    workers = Worker.objects.order_by("username")
+    query = request.GET.get("q", "").strip()
+    if query:
+        workers = workers.filter(username__startswith=query)
+    after = request.GET.get("after")
+    if after:
+        workers = workers.filter(username__gt=after)
+    rows = list(
+        workers.values("id", "username", "first_name", "last_name")[
+            :WORKER_LOOKUP_PAGE_SIZE + 1
+        ]
+    )
+
+    page = rows[:WORKER_LOOKUP_PAGE_SIZE]
+    response = JsonResponse({
+        "query": query,
+        "results": [
+            {
+                "id": row["id"],
+                "text": worker_label(
+                    row["username"], row["first_name"], row["last_name"]
+                ),
+            }
+            for row in page
+        ],
+        "next": page[-1]["username"] if len(rows) > len(page) else None,
+    })
+    patch_cache_control(response, private=True, max_age=SEARCH_MAX_AGE)
+    return response
+
+
+@login_required
+@require_POST
+def bulk_tasks(request):
+    """
+    Apply one action to many tasks. Expects a JSON body like
+    {"action": "reprioritize", "ids": [1, 2], "priority": "High"},
+    see tasks.bulk.ACTIONS, and reports a status per task ID.
+    """
+    try:
+        payload = json.loads(request.body)
+        if not isinstance(payload, dict):
+            raise ValidationError("Expected a JSON object.")
+        action = payload.get("action")
+        results = run_bulk_action(
+            action,
+            payload.get("ids"),
+            **{
+                name: payload[name]
+                for name in ("priority", "assignees")
+                if name in payload
+            }
+        )
+    except ValueError:
+        return JsonResponse({"detail": "Malformed JSON."}, status=400)
+    except ValidationError as e:
+        return JsonResponse({"detail": " ".join(e.messages)}, status=400)
+
+    return JsonResponse({
+        "action": action,
+        "results": [
+            {"id": pk, "status": status} for pk, status in results
+        ],
+    })
+
+
+def _search_limit(request):
+    try:
+        limit = int(request.GET.get("limit", SEARCH_DEFAULT_LIMIT))
+    except ValueError:
+        limit = SEARCH_DEFAULT_LIMIT
+    return min(max(limit, 1), SEARCH_MAX_LIMIT)
+
+
+async def _search_response(request, search, fields):
+    """
+    Top-N search results as lightweight JSON rows. The query is echoed
+    back so clients can drop responses to keystrokes they already moved
+    past; nothing is rendered and no COUNT query runs.
+    """
+    if request.method != "GET":
+        return HttpResponseNotAllowed(["GET"])
+
+    is_authenticated = await sync_to_async(
+        lambda: request.user.is_authenticated
+    )()
+    if not is_authenticated:
+        return JsonResponse(
+            {"detail": "Authentication credentials were not provided."},
+            status=401,
+        )
+
+    query = request.GET.get("q", "").strip()
+    results = []
+    if len(query) >= SEARCH_MIN_LENGTH:
+        queryset = search(query).values(*fields)[:_search_limit(request)]
+        results = [row async for row in queryset]
+
+    response = JsonResponse({"query": query, "results": results})
+    patch_cache_control(response, private=True, max_age=SEARCH_MAX_AGE)
+    return response
+
+
+async def search_tasks(request):
+    return await _search_response(
+        request,
+        lambda query: get_search_backend().search_tasks(
+            Task.objects.all(), query
+        ),
+        ("id", "name", "priority", "deadline"),
+    )
+
+
+async def search_workers(request):
+    return await _search_response(
+        request,
+        lambda query: get_search_backend().search_workers(
+            Worker.objects.all(), query
+        ),
+        ("id", "username", "first_name", "last_name"),
+    )
@@ -1,6 +1,20 @@
 from django.apps import AppConfig
+from django.db import connection
+from django.db.models import CharField
+from django.db.models.signals import post_migrate
 
 
 class TasksConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "tasks"
+
+    def ready(self):
+        from tasks import signals, sorting  # noqa: F401
+        from tasks.search import ensure_sqlite_search_triggers
+
+        post_migrate.connect(ensure_sqlite_search_triggers, sender=self)
+
+        if connection.vendor == "postgresql":
+            from django.contrib.postgres.lookups import TrigramWordSimilar
+
+            CharField.register_lookup(TrigramWordSimilar)
@@ -0,0 +1,234 @@
+import platform
+import random
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from tasks.importing import TaskImporter, WorkerImporter
+from tasks.models import Task, Worker
+
+WORKER_PREFIX = "bench"
+POSITIONS = (
+    "Developer", "Senior Developer", "QA Engineer", "Designer",
+    "Project Manager", "DevOps Engineer",
+)
+TASK_TYPES = ("Bug", "Feature", "Refactoring", "Research", "QA", "Docs")
+FIRST_NAMES = (
+    "Anna", "Bohdan", "Chloe", "Dmytro", "Emma", "Farid", "Grace", "Ivan",
+    "Julia", "Kenji", "Lena", "Marco", "Nina", "Oleh", "Priya", "Sofia",
+)
+LAST_NAMES = (
+    "Smith", "Kovalenko", "Garcia", "Nakamura", "Shevchenko", "Müller",
+    "Rossi", "Novak", "Kim", "Bondar", "Silva", "Dubois",
+)
+VERBS = (
+    "Fix", "Add", "Refactor", "Document", "Test", "Speed up", "Remove",
+    "Review", "Migrate", "Investigate",
+)
+SUBJECTS = (
+    "login form", "task export", "search results", "dashboard counters",
+    "deadline reminders", "worker profile", "assignee picker", "API client",
+    "database indexes", "notification digest", "pagination", "CSV import",
+)
+# roughly how a backlog is spread over the priorities
+PRIORITY_WEIGHTS = {"Urgent": 5, "High": 15, "Medium": 45, "Low": 35}
+COMPLETED_RATIO = 0.3
+
+
+def worker_username(number):
+    return f"{WORKER_PREFIX}{number:07}"
+
+
+def generate_worker_rows(count, rng):
+    for number in range(count):
+        yield number + 1, {
+            "username": worker_username(number),
+            "first_name": rng.choice(FIRST_NAMES),
+            "last_name": rng.choice(LAST_NAMES),
+            "email": f"{worker_username(number)}@example.com",
+            "position": rng.choice(POSITIONS),
+        }
+
+
+def generate_task_rows(count, workers, rng, today=None):
+    """Rows for TaskImporter: deadlines from two months ago to four months
+    ahead, 1-3 assignees, COMPLETED_RATIO of them completed."""
+    today = today or timezone.localdate()
+    priorities = list(PRIORITY_WEIGHTS)
+    weights = list(PRIORITY_WEIGHTS.values())
+    for number in range(count):
+        name = f"{rng.choice(VERBS)} {rng.choice(SUBJECTS)} #{number}"
+        assignees = {
+            worker_username(rng.randrange(workers))
+            for _ in range(rng.randint(1, 3))
+        }
+        yield number + 1, {
+            "name": name,
+            "description": f"{name}, generated for benchmarks.",
+            "deadline": (
+                today + timedelta(days=rng.randint(-60, 120))
+            ).isoformat(),
+            "priority": rng.choices(priorities, weights)[0],
+            "task_type": rng.choice(TASK_TYPES),
+            "is_completed": rng.random() < COMPLETED_RATIO,
+            "assignees": sorted(assignees),
+        }
+
+
+def seed(workers, tasks, random_seed=0, batch_size=None):
+    """
+    Generate `workers` workers and `tasks` tasks through the bulk
+    importers, rows are produced lazily so memory stays flat. The same
+    seed gives the same data. Returns the two ImportResults.
+    """
+    rng = random.Random(random_seed)
+    options = {"batch_size": batch_size} if batch_size else {}
+    worker_result = WorkerImporter(**options).run(
+        generate_worker_rows(workers, rng)
+    )
+    task_result = TaskImporter(**options).run(
+        generate_task_rows(tasks, workers, rng)
+    )
+    return worker_result, task_result
+
+
+def benchmark_urls(task_id, word):
+    """(name, url) of every benchmarked page."""
+    return [
+        ("index", reverse("tasks:index")),
+        ("task_list", reverse("tasks:tasks-list")),
+        ("task_list_cursor", reverse("tasks:tasks-list") + "?cursor="),
+        (
+            "task_detail",
+            reverse("tasks:task-detail", kwargs={"pk": task_id}),
+        ),
+        ("notifications", reverse("tasks:notifications")),
+        ("urgent_high", reverse("tasks:high-priority-tasks-list")),
+        ("completed", reverse("tasks:tasks-completed-list")),
+        ("search", reverse("tasks:tasks-list") + f"?name={word}"),
+        (
+            "search_fuzzy",
+            # one letter dropped, a typo
+            reverse("tasks:tasks-list") + f"?name={word[:-2]}{word[-1]}"
+            "&fuzzy=on",
+        ),
+        ("api_search_tasks", reverse("tasks:api-search-tasks") + f"?q={word}"),
+        (
+            "api_search_workers",
+            reverse("tasks:api-search-workers") + f"?q={WORKER_PREFIX}00",
+        ),
+    ]
+
+
+def percentile(samples, percent):
+    if len(samples) == 1:
+        return samples[0]
+    return statistics.quantiles(samples, n=100, method="inclusive")[
+        percent - 1
+    ]
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def measure(client, url, iterations, warm):
+    """Latency percentiles, queries and peak Python memory of one URL.
+    Unless `warm`, the caches are cleared before every request."""
+
+    def prepare():
+        if not warm:
+            for cache in caches.all():
+                cache.clear()
+
+    # first request: warm-up, status and queries
+    prepare()
+    with CaptureQueriesContext(connection) as captured:
+        status = client.get(url).status_code
+    # the log is reset by the next request
+    queries = len(captured)
+
+    samples = []
+    for _ in range(iterations):
+        prepare()
+        start = time.perf_counter()
+        client.get(url)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    # traced separately, tracemalloc slows everything down
+    prepare()
+    tracemalloc.start()
+    try:
+        client.get(url)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "url": url,
+        "status": status,
+        "queries": queries,
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "peak_memory_kb": round(peak / 1024),
+    }
+
+
+def run_benchmarks(iterations=20, warm=False, names=None, username=None):
+    """
+    Benchmark every page of benchmark_urls() as one worker, in process
+    with the test client. Returns a JSON serializable dict.
+    """
+    workers = Worker.objects.order_by("pk")
+    if username:
+        workers = workers.filter(username=username)
+    worker = workers.filter(task__isnull=False).first() or workers.first()
+    if worker is None:
+        raise ValueError("No workers, run seed_benchmark_data first.")
+    task = Task.objects.order_by("pk").first()
+    if task is None:
+        raise ValueError("No tasks, run seed_benchmark_data first.")
+
+    # an allowed host of every settings profile
+    client = Client(HTTP_HOST="127.0.0.1")
+    client.force_login(worker)
+    # the longest word makes a selective search and a fuzzy match
+    word = max(task.name.split(), key=len)
+
+    results = {}
+    for name, url in benchmark_urls(task.pk, word):
+        if names and name not in names:
+            continue
+        results[name] = measure(client, url, iterations, warm)
+
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "debug": settings.DEBUG,
+            "tasks": Task.objects.count(),
+            "workers": Worker.objects.count(),
+            "iterations": iterations,
+            "warm": warm,
+        },
+        "results": results,
+    }
@@ -0,0 +1,193 @@
+from contextvars import ContextVar
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.dispatch import Signal
+from django.utils import timezone
+
+from tasks.models import Task, Worker
+
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+NOT_FOUND = "not_found"
+
+MAX_TASKS = 1000
+
+# Sent once per bulk operation, after the rows are written, with `action`,
+# `task_ids`, `task_type_ids` and `worker_ids` of everything it touched.
+tasks_bulk_changed = Signal()
+
+_running = ContextVar("tasks_bulk_running", default=False)
+
+Assignment = Task.assignees.through
+
+
+def in_bulk_operation():
+    """True while a bulk operation writes, per-object receivers leave the
+    bookkeeping to the tasks_bulk_changed receivers."""
+    return _running.get()
+
+
+def complete(task_ids, assignments):
+    changed = set(
+        Task.objects.filter(pk__in=task_ids, is_completed=False).values_list(
+            "pk", flat=True
+        )
+    )
+    Task.objects.filter(pk__in=changed).update(
+        is_completed=True, updated_at=timezone.now()
+    )
+    return changed
+
+
+def reprioritize(task_ids, assignments, priority):
+    changed = set(
+        Task.objects.filter(pk__in=task_ids).exclude(
+            priority=priority
+        ).values_list("pk", flat=True)
+    )
+    Task.objects.filter(pk__in=changed).update(
+        priority=priority,
+        priority_rank=Task.PRIORITY_RANKS[priority],
+        updated_at=timezone.now(),
+    )
+    return changed
+
+
+def reassign(task_ids, assignments, assignees):
+    current = {task_id: set() for task_id in task_ids}
+    for task_id, worker_id in assignments:
+        current[task_id].add(worker_id)
+    changed = {
+        task_id for task_id, workers in current.items()
+        if workers != assignees
+    }
+    Assignment.objects.filter(task_id__in=changed).delete()
+    Assignment.objects.bulk_create(
+        [
+            Assignment(task_id=task_id, worker_id=worker_id)
+            for task_id in changed
+            for worker_id in assignees
+        ],
+        batch_size=500,
+    )
+    Task.objects.filter(pk__in=changed).update(updated_at=timezone.now())
+    return changed
+
+
+def delete(task_ids, assignments):
+    Task.objects.filter(pk__in=task_ids).delete()
+    return set(task_ids)
+
+
+ACTIONS = {
+    "complete": complete,
+    "reprioritize": reprioritize,
+    "reassign": reassign,
+    "delete": delete,
+}
+
+
+def is_id_list(value):
+    """A list of integers, not a string or anything else iterable that
+    int() would happily coerce."""
+    return isinstance(value, (list, tuple)) and all(
+        isinstance(pk, int) and not isinstance(pk, bool) for pk in value
+    )
+
+
+def clean_task_ids(task_ids):
+    """Distinct integer IDs in the order they were given."""
+    if task_ids is None:
+        task_ids = []
+    if not is_id_list(task_ids):
+        raise ValidationError("Task IDs must be a list of integers.")
+    cleaned = list(dict.fromkeys(task_ids))
+    if not cleaned:
+        raise ValidationError("No task IDs given.")
+    if len(cleaned) > MAX_TASKS:
+        raise ValidationError(
+            f"At most {MAX_TASKS} tasks can be changed at once."
+        )
+    return cleaned
+
+
+def clean_options(action, priority=None, assignees=None):
+    if action == "reprioritize":
+        if priority not in Task.PriorityType.values:
+            raise ValidationError(f"Unknown priority: {priority!r}.")
+        return {"priority": priority}
+
+    if action == "reassign":
+        if assignees is None:
+            assignees = []
+        if not is_id_list(assignees):
+            raise ValidationError("Assignees must be a list of integers.")
+        assignees = set(assignees)
+        found = set(
+            Worker.objects.filter(pk__in=assignees).values_list(
+                "pk", flat=True
+            )
+        )
+        if found != assignees:
+            missing = ", ".join(map(str, sorted(assignees - found)))
+            raise ValidationError(f"Unknown assignees: {missing}.")
+        return {"assignees": assignees}
+
+    return {}
+
+
+def run_bulk_action(action, task_ids, **options):
+    """
+    Apply `action` to every task in `task_ids` with QuerySet.update() and
+    bulk writes to the assignees table, in one transaction. Counters and
+    caches are refreshed once by the tasks_bulk_changed receivers instead
+    of per object.
+    Returns (task_id, status) pairs in the order the IDs were given.
+    """
+    if action not in ACTIONS:
+        raise ValidationError(f"Unknown action: {action!r}.")
+    task_ids = clean_task_ids(task_ids)
+    options = clean_options(action, **options)
+
+    with transaction.atomic():
+        task_types = dict(
+            Task.objects.select_for_update().filter(
+                pk__in=task_ids
+            ).values_list("pk", "task_type_id")
+        )
+        assignments = list(
+            Assignment.objects.filter(task_id__in=task_types).values_list(
+                "task_id", "worker_id"
+            )
+        )
+
+        token = _running.set(True)
+        try:
+            changed = ACTIONS[action](set(task_types), assignments, **options)
+        finally:
+            _running.reset(token)
+
+        if changed:
+            worker_ids = {
+                worker_id for task_id, worker_id in assignments
+                if task_id in changed
+            }
+            worker_ids |= options.get("assignees", set())
+            tasks_bulk_changed.send(
+                sender=Task,
+                action=action,
+                task_ids=changed,
+                task_type_ids={task_types[pk] for pk in changed},
+                worker_ids=worker_ids,
+            )
+
+    return [
+        (
+            pk,
+            UPDATED if pk in changed
+            else UNCHANGED if pk in task_types
+            else NOT_FOUND
+        )
+        for pk in task_ids
+    ]
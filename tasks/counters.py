@@ -0,0 +1,161 @@
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from tasks.models import Task, TaskCounters
+
+URGENT_PRIORITIES = [Task.PriorityType.URGENT, Task.PriorityType.HIGH]
+COUNTER_FIELDS = ("total", "completed", "open_urgent_high")
+NO_TASKS = (0, 0, 0)
+
+Scope = TaskCounters.Scope
+
+
+def counter_aggregates(prefix=""):
+    """Count() expressions for every counter field, `prefix` points at
+    the task when aggregating over a related model."""
+    return {
+        "total": Count(f"{prefix}pk"),
+        "completed": Count(
+            f"{prefix}pk", filter=Q(**{f"{prefix}is_completed": True})
+        ),
+        "open_urgent_high": Count(
+            f"{prefix}pk",
+            filter=Q(**{
+                f"{prefix}is_completed": False,
+                f"{prefix}priority__in": URGENT_PRIORITIES,
+            }),
+        ),
+    }
+
+
+def contribution(is_completed, priority):
+    """What a single task adds to (total, completed, open_urgent_high)."""
+    return (
+        1,
+        int(bool(is_completed)),
+        int(not is_completed and priority in URGENT_PRIORITIES),
+    )
+
+
+def task_contribution(task):
+    return contribution(task.is_completed, task.priority)
+
+
+def subtract(new, old):
+    return tuple(a - b for a, b in zip(new, old))
+
+
+def negate(counts):
+    return subtract(NO_TASKS, counts)
+
+
+def apply_delta(scope, object_id, delta):
+    if not any(delta):
+        return
+
+    changes = dict(zip(COUNTER_FIELDS, delta))
+    updated = TaskCounters.objects.filter(
+        scope=scope, object_id=object_id
+    ).update(**{name: F(name) + value for name, value in changes.items()})
+
+    if not updated:
+        _, created = TaskCounters.objects.get_or_create(
+            scope=scope, object_id=object_id, defaults=changes
+        )
+        if not created:
+            # lost a race with a concurrent insert
+            apply_delta(scope, object_id, delta)
+
+
+def apply_worker_deltas(worker_ids, delta):
+    for worker_id in worker_ids:
+        apply_delta(Scope.WORKER, worker_id, delta)
+
+
+def get_counters(scope, object_id=0):
+    """Stored counters, or an unsaved zero row when nothing is tracked."""
+    return (
+        TaskCounters.objects.filter(scope=scope, object_id=object_id).first()
+        or TaskCounters(scope=scope, object_id=object_id)
+    )
+
+
+@transaction.atomic
+def rebuild_task_counters():
+    """Recompute every counters row from the tasks tables."""
+    TaskCounters.objects.all().delete()
+
+    rows = [
+        TaskCounters(
+            scope=Scope.GLOBAL,
+            object_id=0,
+            **Task.objects.aggregate(**counter_aggregates())
+        )
+    ]
+    rows.extend(
+        TaskCounters(scope=Scope.TASK_TYPE, object_id=row.pop("task_type"), **row)
+        for row in Task.objects.order_by().values("task_type").annotate(
+            **counter_aggregates()
+        )
+    )
+    rows.extend(
+        TaskCounters(scope=Scope.WORKER, object_id=row.pop("worker"), **row)
+        for row in Task.assignees.through.objects.order_by().values(
+            "worker"
+        ).annotate(**counter_aggregates("task__"))
+    )
+
+    TaskCounters.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
+
+
+def _counter_rows(scope, grouped, object_ids):
+    totals = {
+        object_id: dict.fromkeys(COUNTER_FIELDS, 0) for object_id in object_ids
+    }
+    for row in grouped:
+        totals[row.pop("object_id")] = row
+    return [
+        TaskCounters(scope=scope, object_id=object_id, **row)
+        for object_id, row in totals.items()
+    ]
+
+
+@transaction.atomic
+def refresh_task_counters(task_type_ids=(), worker_ids=()):
+    """
+    Recompute the global row and the rows of the given task types and
+    workers from the tasks tables, for changes made with QuerySet.update()
+    or bulk_create() that bypass the per-object signals.
+    """
+    task_type_ids, worker_ids = set(task_type_ids), set(worker_ids)
+
+    rows = _counter_rows(
+        Scope.GLOBAL,
+        [{"object_id": 0, **Task.objects.aggregate(**counter_aggregates())}],
+        [0],
+    )
+    rows.extend(_counter_rows(
+        Scope.TASK_TYPE,
+        Task.objects.filter(task_type__in=task_type_ids).order_by().values(
+            object_id=F("task_type")
+        ).annotate(**counter_aggregates()),
+        task_type_ids,
+    ))
+    rows.extend(_counter_rows(
+        Scope.WORKER,
+        Task.assignees.through.objects.filter(
+            worker__in=worker_ids
+        ).order_by().values(object_id=F("worker")).annotate(
+            **counter_aggregates("task__")
+        ),
+        worker_ids,
+    ))
+
+    TaskCounters.objects.bulk_create(
+        rows,
+        batch_size=500,
+        update_conflicts=True,
+        unique_fields=("scope", "object_id"),
+        update_fields=COUNTER_FIELDS,
+    )
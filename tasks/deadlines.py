@@ -0,0 +1,114 @@
+from datetime import date, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.utils import timezone
+
+from tasks.models import DeadlineBucket, Task
+
+# Row of the tasks due before today: changes to past days go here and
+# the nightly rollover folds the days that became past into it. Overdue
+# is this row plus any past day rows not folded yet, so counts stay
+# right whether or not the rollover ran.
+OVERDUE = date.min
+
+_deadline_field = Task._meta.get_field("deadline")
+
+
+def add(deadline, delta, today=None):
+    """Move the open tasks count of `deadline`'s day, or of the overdue
+    row for a past day, by `delta`."""
+    if not delta:
+        return
+    day = _deadline_field.to_python(deadline)
+    if day < (today or timezone.localdate()):
+        # the day may already be folded, its own row would go negative
+        day = OVERDUE
+    updated = DeadlineBucket.objects.filter(day=day).update(
+        open_tasks=F("open_tasks") + delta
+    )
+    if not updated:
+        _, created = DeadlineBucket.objects.get_or_create(
+            day=day, defaults={"open_tasks": delta}
+        )
+        if not created:
+            # lost a race with a concurrent insert
+            add(day, delta)
+
+
+def task_changed(previous, task):
+    """Apply a saved task, `previous` being its (is_completed, deadline)
+    before the save or None for a new task."""
+    deadline = _deadline_field.to_python(task.deadline)
+    if previous is not None and not previous[0]:
+        if not task.is_completed and previous[1] == deadline:
+            return
+        add(previous[1], -1)
+    if not task.is_completed:
+        add(deadline, 1)
+
+
+def overdue_count(today=None):
+    """Open tasks due before `today`, from the overdue row and whatever
+    past days the rollover hasn't folded yet."""
+    today = today or timezone.localdate()
+    return DeadlineBucket.objects.filter(day__lt=today).aggregate(
+        total=Sum("open_tasks")
+    )["total"] or 0
+
+
+def due_counts(start, end, today=None):
+    """{day: open tasks} for every day from `start` to `end` inclusive.
+    Days before `today` are None, their tasks are counted as overdue."""
+    today = today or timezone.localdate()
+    counts = dict(
+        DeadlineBucket.objects.filter(
+            day__gte=max(start, today), day__lte=end
+        ).values_list("day", "open_tasks")
+    )
+    days = (start + timedelta(days=n) for n in range((end - start).days + 1))
+    return {
+        day: None if day < today else counts.get(day, 0) for day in days
+    }
+
+
+@transaction.atomic
+def rollover(today=None):
+    """Fold the day rows before `today` into the overdue row, returns how
+    many days were folded."""
+    today = today or timezone.localdate()
+    past = DeadlineBucket.objects.select_for_update().filter(
+        day__gt=OVERDUE, day__lt=today
+    )
+    folded = past.aggregate(days=Count("pk"), total=Sum("open_tasks"))
+    if folded["days"]:
+        past.delete()
+        add(OVERDUE, folded["total"])
+    DeadlineBucket.objects.filter(day__gte=today, open_tasks=0).delete()
+    return folded["days"]
+
+
+@transaction.atomic
+def rebuild_deadline_buckets(today=None):
+    """Recompute every bucket from the open tasks, used after bulk
+    changes that bypass the per-object signals."""
+    today = today or timezone.localdate()
+    DeadlineBucket.objects.all().delete()
+
+    rows = Task.objects.filter(is_completed=False).order_by().values(
+        "deadline"
+    ).annotate(open_tasks=Count("pk"))
+    overdue = 0
+    buckets = []
+    for row in rows:
+        if row["deadline"] < today:
+            overdue += row["open_tasks"]
+        else:
+            buckets.append(DeadlineBucket(
+                day=row["deadline"], open_tasks=row["open_tasks"]
+            ))
+    if overdue:
+        buckets.append(DeadlineBucket(day=OVERDUE, open_tasks=overdue))
+
+    DeadlineBucket.objects.bulk_create(buckets, batch_size=500)
+    return len(buckets)
@@ -0,0 +1,164 @@
+import asyncio
+import json
+import threading
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+TEAM_CHANNEL = "team"
+# marks a subscription that fell too far behind
+OVERFLOW = object()
+
+
+def worker_channel(worker_id):
+    return f"worker:{worker_id}"
+
+
+def format_event(event, data):
+    """One server-sent event frame."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+class Subscription:
+    """
+    Bounded queue of frames for one connection. When the reader falls
+    more than `maxsize` frames behind the queue is dropped and OVERFLOW
+    is delivered instead, so a stalled client costs at most `maxsize`
+    frames of memory and gets told to resync.
+    """
+
+    def __init__(self, channels, maxsize, on_close=None):
+        self.channels = tuple(channels)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+        self.on_close = on_close
+
+    def deliver(self, frame):
+        """Thread-safe, publishers run in sync code."""
+        try:
+            self.loop.call_soon_threadsafe(self._put, frame)
+        except RuntimeError:
+            # the connection's event loop is gone
+            self.close()
+
+    def _put(self, frame):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            self.overflowed = True
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(OVERFLOW)
+
+    async def get(self, timeout):
+        """The next frame, OVERFLOW, or None after `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        if self.on_close:
+            self.on_close(self)
+            self.on_close = None
+
+
+class LocalBroker:
+    """
+    In-process pub/sub, only reaches connections served by the same
+    process. With several server processes use RedisBroker.
+    """
+
+    def __init__(self, queue_size=None):
+        self.queue_size = queue_size or settings.EVENTS_QUEUE_SIZE
+        self.lock = threading.Lock()
+        self.subscriptions = set()
+
+    def subscribe(self, channels):
+        subscription = Subscription(
+            channels, self.queue_size, on_close=self.unsubscribe
+        )
+        with self.lock:
+            self.subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+
+    def publish(self, channels, frame):
+        channels = set(channels)
+        with self.lock:
+            targets = [
+                subscription for subscription in self.subscriptions
+                if channels.intersection(subscription.channels)
+            ]
+        for subscription in targets:
+            subscription.deliver(frame)
+
+
+class RedisBroker:
+    """
+    Pub/sub through Redis or a Redis-compatible server, needs the redis
+    package. Channels are prefixed so several sites can share a server.
+    """
+    prefix = "tasks:events:"
+
+    def __init__(self, url=None, queue_size=None):
+        import redis
+
+        self.url = url or settings.EVENTS_REDIS_URL
+        self.queue_size = queue_size or settings.EVENTS_QUEUE_SIZE
+        self.client = redis.Redis.from_url(self.url)
+
+    def publish(self, channels, frame):
+        with self.client.pipeline(transaction=False) as pipeline:
+            for channel in channels:
+                pipeline.publish(self.prefix + channel, frame)
+            pipeline.execute()
+
+    def subscribe(self, channels):
+        from redis import asyncio as aioredis
+
+        pubsub = aioredis.Redis.from_url(self.url).pubsub()
+
+        async def read():
+            await pubsub.subscribe(
+                *[self.prefix + channel for channel in channels]
+            )
+            async for message in pubsub.listen():
+                if message["type"] == "message":
+                    subscription._put(message["data"].decode())
+
+        def close(subscription):
+            reader.cancel()
+            asyncio.ensure_future(pubsub.close())
+
+        subscription = Subscription(channels, self.queue_size, close)
+        reader = asyncio.ensure_future(read())
+        return subscription
+
+
+@lru_cache(maxsize=None)
+def get_broker():
+    return import_string(settings.EVENTS_BROKER)()
+
+
+TASK_FIELDS = ("id", "name", "deadline", "priority", "is_completed")
+
+
+def task_data(task):
+    return {field: getattr(task, field) for field in TASK_FIELDS}
+
+
+def publish(event, data, worker_ids=()):
+    """Send `event` to the team channel and the channels of `worker_ids`
+    once the current transaction commits."""
+    frame = format_event(event, data)
+    channels = [TEAM_CHANNEL, *map(worker_channel, worker_ids)]
+    transaction.on_commit(lambda: get_broker().publish(channels, frame))
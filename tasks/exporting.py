@@ -0,0 +1,110 @@
+import csv
+import json
+
+from django.db.models import Aggregate, CharField, F, Value
+
+from tasks.filters import filter_tasks
+from tasks.importing import ASSIGNEES_SEPARATOR
+from tasks.models import Task
+from tasks.sorting import get_task_sort
+
+DEFAULT_CHUNK_SIZE = 2000
+FORMATS = ("csv", "jsonl")
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "jsonl": "application/x-ndjson",
+}
+
+# the columns import_tasks reads, so exports can be imported elsewhere
+COLUMNS = (
+    "id",
+    "name",
+    "description",
+    "deadline",
+    "priority",
+    "task_type",
+    "is_completed",
+    "assignees",
+)
+
+
+class GroupConcat(Aggregate):
+    """GROUP_CONCAT(expression, delimiter), STRING_AGG on PostgreSQL."""
+    function = "GROUP_CONCAT"
+    output_field = CharField()
+
+    def __init__(self, expression, delimiter, **extra):
+        super().__init__(expression, Value(delimiter), **extra)
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return self.as_sql(
+            compiler, connection, function="STRING_AGG", **extra_context
+        )
+
+
+def export_queryset(params):
+    """
+    One row per task with the assignee usernames aggregated in the same
+    query, filtered like the task list. Ordered by id unless `sort_by`
+    is given, ranking is meaningless for an export.
+    """
+    queryset = filter_tasks(Task.objects.all(), params)
+    if not get_task_sort(params.get("sort_by")):
+        queryset = queryset.order_by("pk")
+
+    return queryset.values(
+        "id",
+        "name",
+        "description",
+        "deadline",
+        "priority",
+        "is_completed",
+        task_type_name=F("task_type__name"),
+    ).annotate(
+        assignee_names=GroupConcat(
+            "assignees__username", ASSIGNEES_SEPARATOR
+        ),
+    )
+
+
+def export_rows(params, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Rows keyed by COLUMNS, fetched `chunk_size` at a time (through a
+    server-side cursor on PostgreSQL)."""
+    for row in export_queryset(params).iterator(chunk_size=chunk_size):
+        names = row.pop("assignee_names")
+        row["task_type"] = row.pop("task_type_name")
+        row["assignees"] = names.split(ASSIGNEES_SEPARATOR) if names else []
+        yield row
+
+
+class Echo:
+    """File-like object handing back what csv.writer writes."""
+
+    def write(self, value):
+        return value
+
+
+def render_csv(rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        row["assignees"] = ASSIGNEES_SEPARATOR.join(row["assignees"])
+        yield writer.writerow([row[column] for column in COLUMNS])
+
+
+def render_jsonl(rows):
+    for row in rows:
+        yield json.dumps(
+            {column: row[column] for column in COLUMNS}, default=str
+        ) + "\n"
+
+
+RENDERERS = {
+    "csv": render_csv,
+    "jsonl": render_jsonl,
+}
+
+
+def export_tasks(params, format="csv", chunk_size=DEFAULT_CHUNK_SIZE):
+    """Lazily rendered lines of the export."""
+    return RENDERERS[format](export_rows(params, chunk_size))
@@ -0,0 +1,23 @@
+from tasks.search import get_search_backend
+from tasks.sorting import get_task_sort
+
+
+def filter_tasks(queryset, params):
+    """
+    Apply the task list GET parameters: `name` (full-text, or typo
+    tolerant with `fuzzy`) and `sort_by`. Unknown sort keys are ignored,
+    searches without a sort stay ordered by rank.
+    """
+    name = params.get("name")
+    if name:
+        backend = get_search_backend()
+        if params.get("fuzzy"):
+            queryset = backend.fuzzy_search_tasks(queryset, name)
+        else:
+            queryset = backend.search_tasks(queryset, name)
+
+    sort = get_task_sort(params.get("sort_by"))
+    if sort:
+        queryset = queryset.order_by(*sort.ordering)
+
+    return queryset
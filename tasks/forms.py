@@ -2,8 +2,10 @@ from django import forms
 from django.contrib.auth import get_user_model
 from django.contrib.auth.forms import UserCreationForm
 from django.core.exceptions import ValidationError
+from django.urls import reverse_lazy
 
 from tasks.models import Worker, Task, Position
+from tasks.sorting import TASK_SORTS
 
 
 class DateInput(forms.DateInput):
@@ -11,7 +13,9 @@ class DateInput(forms.DateInput):
 
 
 def validate_position(position):
-    if position not in Position.objects.all():
+    if position is None or not Position.objects.filter(
+        pk=position.pk
+    ).exists():
         raise ValidationError(
             "Position must be one of the defined in the Task Manager"
         )
@@ -19,6 +23,56 @@ def validate_position(position):
     return position
 
 
+def worker_label(*parts):
+    # the same text the lookup endpoint sends
+    return " · ".join(part for part in parts if part)
+
+
+class RemoteSelectMultiple(forms.SelectMultiple):
+    """
+    Renders only the selected options, the rest are fetched page by page
+    from `url` by includes/remote_select.html as the user types.
+    """
+
+    def __init__(self, url, attrs=None):
+        super().__init__(attrs)
+        self.url = url
+
+    def get_context(self, name, value, attrs):
+        attrs = {**(attrs or {}), "data-remote-url": str(self.url)}
+        return super().get_context(name, value, attrs)
+
+    def optgroups(self, name, value, attrs=None):
+        pks = [pk for pk in value if str(pk).isdigit()]
+        choices = self.choices
+        if hasattr(choices, "queryset"):
+            self.choices = forms.models.ModelChoiceIterator(choices.field)
+            self.choices.queryset = choices.queryset.filter(pk__in=pks)
+        try:
+            return super().optgroups(name, value, attrs)
+        finally:
+            self.choices = choices
+
+
+class WorkerMultipleChoiceField(forms.ModelMultipleChoiceField):
+    """Workers picked through the lookup endpoint, validated with one
+    `pk IN (...)` query for the columns of the labels."""
+    widget = RemoteSelectMultiple(reverse_lazy("tasks:api-worker-lookup"))
+
+    def __init__(self, **kwargs):
+        super().__init__(
+            queryset=Worker.objects.only(
+                "username", "first_name", "last_name"
+            ),
+            **kwargs
+        )
+
+    def label_from_instance(self, worker):
+        return worker_label(
+            worker.username, worker.first_name, worker.last_name
+        )
+
+
 class WorkerCreationForm(UserCreationForm):
 
     class Meta(UserCreationForm.Meta):
@@ -30,14 +84,28 @@ class WorkerCreationForm(UserCreationForm):
         )
 
 
+class TaskCreationForm(forms.ModelForm):
+    assignees = WorkerMultipleChoiceField()
+
+    class Meta:
+        model = Task
+        fields = [
+            "name",
+            "description",
+            "deadline",
+            "priority",
+            "task_type",
+            "assignees"
+        ]
+
+
 class AssigneesForm(forms.ModelForm):
+    assignees = WorkerMultipleChoiceField()
+
     class Meta:
         model = Task
         fields = ["assignees"]
 
-    def clean_position(self):
-        return validate_position(self.cleaned_data["assignees"])
-
 
 class WorkerPositionUpdateForm(forms.ModelForm):
     class Meta:
@@ -55,6 +123,7 @@ class WorkerSearchForm(forms.Form):
         label="",
         widget=forms.TextInput(attrs={"placeholder": "Search by username"})
     )
+    fuzzy = forms.BooleanField(required=False, label="Typo tolerant")
 
 
 class TaskSearchForm(forms.Form):
@@ -64,3 +133,11 @@ class TaskSearchForm(forms.Form):
         label="",
         widget=forms.TextInput(attrs={"placeholder": "Search by task name"})
     )
+    fuzzy = forms.BooleanField(required=False, label="Typo tolerant")
+    sort_by = forms.ChoiceField(
+        choices=[("", "Default order")] + [
+            (key, option.label) for key, option in TASK_SORTS.items()
+        ],
+        required=False,
+        label="",
+    )
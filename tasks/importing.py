@@ -0,0 +1,328 @@
+import csv
+import json
+from datetime import date
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from tasks import versions
+from tasks.bulk import tasks_bulk_changed
+from tasks.models import Position, Task, TaskType, Worker
+from tasks.search import ngram_indexes
+
+DEFAULT_BATCH_SIZE = 2000
+# separates usernames in the assignees column of CSV files
+ASSIGNEES_SEPARATOR = ";"
+
+FORMATS = ("csv", "jsonl")
+MAX_REPORTED_ERRORS = 100
+TRUE_VALUES = ("1", "true", "yes")
+
+
+class RowError(ValueError):
+    pass
+
+
+def detect_format(path):
+    for name in FORMATS:
+        if str(path).endswith(f".{name}"):
+            return name
+    raise ValueError(f"Can't tell the format of {path}, pass --format.")
+
+
+def read_rows(file, format):
+    """Yield (line number, dict) for every record of an open file, a
+    RowError in place of the dict for a record that isn't an object."""
+    if format == "csv":
+        for number, row in enumerate(csv.DictReader(file), start=2):
+            yield number, row
+        return
+
+    for number, line in enumerate(file, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"line {number}: {e}")
+        if not isinstance(row, dict):
+            row = RowError(f"expected an object, got {type(row).__name__}")
+        yield number, row
+
+
+def batches(rows, size):
+    rows = iter(rows)
+    while batch := list(islice(rows, size)):
+        yield batch
+
+
+def valid_rows(batch, result):
+    """The rows of `batch` read_rows could parse, the others are
+    reported as errors."""
+    rows = []
+    for number, row in batch:
+        if isinstance(row, RowError):
+            result.error(number, row)
+        else:
+            rows.append((number, row))
+    return rows
+
+
+def get_text(row, field):
+    """The string value of `field`, None when it is missing or empty."""
+    value = row.get(field)
+    if value in (None, ""):
+        return None
+    if not isinstance(value, str):
+        raise RowError(f"{field} must be a string, got {value!r}")
+    return value
+
+
+def split_usernames(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        value = value.split(ASSIGNEES_SEPARATOR)
+    elif not isinstance(value, list) or not all(
+        isinstance(name, str) for name in value
+    ):
+        raise RowError(f"assignees must be a list of usernames, got {value!r}")
+    return [name.strip() for name in value if name.strip()]
+
+
+class Lookup:
+    """
+    name -> pk map of a model, filled once per batch with a single query
+    for the names the batch uses; names not found are created when
+    `create` is given.
+    """
+
+    def __init__(self, model, field="name", create=None):
+        self.model = model
+        self.field = field
+        self.create = create
+        self.pks = {}
+
+    def load(self, names):
+        missing = {name for name in names if name} - self.pks.keys()
+        if not missing:
+            return
+        # names aren't unique, the oldest row wins
+        for pk, name in self.model.objects.filter(
+            **{f"{self.field}__in": missing}
+        ).order_by("pk").values_list("pk", self.field):
+            self.pks.setdefault(name, pk)
+
+        missing -= self.pks.keys()
+        if missing and self.create:
+            created = self.model.objects.bulk_create(
+                [self.create(name) for name in sorted(missing)]
+            )
+            self.pks.update(
+                (getattr(obj, self.field), obj.pk) for obj in created
+            )
+
+    def get(self, name):
+        return self.pks.get(name)
+
+
+class ImportResult:
+    def __init__(self):
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def warn(self, number, message):
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"line {number}: {message}")
+
+    def error(self, number, message):
+        """The row is skipped."""
+        self.failed += 1
+        self.warn(number, message)
+
+
+class TaskImporter:
+    """Inserts tasks and their assignments with bulk_create, one
+    transaction per batch. Missing task types are created, unknown
+    assignees are reported and skipped."""
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.task_types = Lookup(TaskType, create=lambda name: TaskType(
+            name=name
+        ))
+        self.workers = Lookup(Worker, field="username")
+        self.task_type_ids = set()
+        self.worker_ids = set()
+
+    def build(self, row):
+        """An unsaved Task for a row, without its task type."""
+        priority = get_text(row, "priority") or Task.PriorityType.MEDIUM
+        if priority not in Task.PRIORITY_RANKS:
+            raise RowError(f"unknown priority {priority!r}")
+        name = get_text(row, "name")
+        if not name:
+            raise RowError("name is required")
+        is_completed = row.get("is_completed") or False
+        if isinstance(is_completed, str):
+            is_completed = is_completed.strip().lower() in TRUE_VALUES
+        try:
+            deadline = date.fromisoformat(get_text(row, "deadline") or "")
+        except ValueError:
+            raise RowError(f"invalid deadline {row.get('deadline')!r}")
+
+        return Task(
+            name=name,
+            description=get_text(row, "description") or "",
+            deadline=deadline,
+            is_completed=bool(is_completed),
+            priority=priority,
+            # bulk_create skips Task.save()
+            priority_rank=Task.PRIORITY_RANKS[priority],
+        )
+
+    def import_batch(self, batch, result):
+        # rows are checked before the lookups so that a row failing
+        # validation doesn't leave a task type behind
+        rows = []
+        for number, row in valid_rows(batch, result):
+            try:
+                task = self.build(row)
+                task_type = get_text(row, "task_type")
+                usernames = split_usernames(row.get("assignees"))
+            except RowError as e:
+                result.error(number, e)
+                continue
+            if task_type is None:
+                result.error(number, "task_type is required")
+                continue
+            rows.append((number, task, task_type, usernames))
+
+        self.task_types.load(task_type for _, _, task_type, _ in rows)
+        self.workers.load(
+            name for _, _, _, usernames in rows for name in usernames
+        )
+
+        tasks, assignees = [], []
+        for number, task, task_type, usernames in rows:
+            task.task_type_id = self.task_types.get(task_type)
+            worker_ids = []
+            for username in usernames:
+                worker_id = self.workers.get(username)
+                if worker_id is None:
+                    result.warn(number, f"unknown assignee {username!r}")
+                else:
+                    worker_ids.append(worker_id)
+            tasks.append(task)
+            assignees.append(worker_ids)
+
+        with transaction.atomic():
+            Task.objects.bulk_create(tasks)
+            Task.assignees.through.objects.bulk_create(
+                [
+                    Task.assignees.through(task_id=task.pk, worker_id=pk)
+                    for task, worker_ids in zip(tasks, assignees)
+                    for pk in set(worker_ids)
+                ],
+                ignore_conflicts=True,
+            )
+
+        ngram_indexes[Task._meta.db_table].update_many(tasks)
+        self.task_type_ids.update(task.task_type_id for task in tasks)
+        for worker_ids in assignees:
+            self.worker_ids.update(worker_ids)
+        result.imported += len(tasks)
+
+    def run(self, rows):
+        result = ImportResult()
+        try:
+            for batch in batches(rows, self.batch_size):
+                self.import_batch(batch, result)
+        finally:
+            # batches are committed one by one, a failure halfway still
+            # leaves rows the derived data has to account for
+            if result.imported:
+                tasks_bulk_changed.send(
+                    sender=Task,
+                    action="import",
+                    task_ids=set(),
+                    task_type_ids=self.task_type_ids,
+                    worker_ids=self.worker_ids,
+                )
+        return result
+
+
+class WorkerImporter:
+    """Inserts workers with bulk_create. Imported accounts get an unusable
+    password, missing positions are created."""
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.positions = Lookup(Position, create=lambda name: Position(
+            name=name
+        ))
+        # hashing is deliberately slow, share one unusable hash
+        self.unusable_password = make_password(None)
+
+    def import_batch(self, batch, result):
+        rows = []
+        for number, row in valid_rows(batch, result):
+            try:
+                fields = {
+                    field: get_text(row, field)
+                    for field in (
+                        "username", "first_name", "last_name", "email",
+                        "position",
+                    )
+                }
+            except RowError as e:
+                result.error(number, e)
+                continue
+            if not fields["username"]:
+                result.error(number, "username is required")
+                continue
+            rows.append((number, fields))
+
+        existing = set(
+            Worker.objects.filter(
+                username__in=[fields["username"] for _, fields in rows]
+            ).values_list("username", flat=True)
+        )
+        new_rows = []
+        for number, fields in rows:
+            username = fields["username"]
+            if username in existing:
+                result.error(number, f"username {username!r} is taken")
+                continue
+            existing.add(username)
+            new_rows.append(fields)
+
+        # only rows that will be inserted create positions
+        self.positions.load(fields["position"] for fields in new_rows)
+        workers = [
+            Worker(
+                username=fields["username"],
+                first_name=fields["first_name"] or "",
+                last_name=fields["last_name"] or "",
+                email=fields["email"] or "",
+                password=self.unusable_password,
+                position_id=self.positions.get(fields["position"]),
+            )
+            for fields in new_rows
+        ]
+
+        Worker.objects.bulk_create(workers)
+        ngram_indexes[Worker._meta.db_table].update_many(workers)
+        result.imported += len(workers)
+
+    def run(self, rows):
+        result = ImportResult()
+        try:
+            for batch in batches(rows, self.batch_size):
+                self.import_batch(batch, result)
+        finally:
+            if result.imported:
+                versions.bump(versions.WORKERS)
+        return result
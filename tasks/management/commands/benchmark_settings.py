@@ -0,0 +1,99 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+PROFILES = ("dev", "prod")
+
+
+def measure(urls, repeat):
+    """
+    Run in a fresh interpreter for one profile: time django.setup(), the
+    first request (imports, template compilation) and the median of the
+    following requests, print the result as JSON.
+    """
+    start = time.perf_counter()
+    import django
+
+    django.setup()
+    setup = time.perf_counter() - start
+
+    from django.test import Client
+
+    # an allowed host of every profile
+    client = Client(HTTP_HOST="127.0.0.1")
+    result = {"setup_ms": setup * 1000, "urls": {}}
+    for url in urls:
+        start = time.perf_counter()
+        status = client.get(url).status_code
+        first = time.perf_counter() - start
+        samples = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            client.get(url)
+            samples.append(time.perf_counter() - start)
+        result["urls"][url] = {
+            "status": status,
+            "first_ms": first * 1000,
+            "median_ms": statistics.median(samples) * 1000,
+        }
+    print(json.dumps(result))
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare the startup time and per-request overhead of the settings "
+        "profiles, each measured in its own process. The prod profile "
+        "needs collectstatic to have been run."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "urls", nargs="*", default=["/accounts/login/", "/tasks/"],
+            help="Paths to request, anonymously."
+        )
+        parser.add_argument("--repeat", type=int, default=200)
+        parser.add_argument(
+            "--profiles", nargs="+", choices=PROFILES, default=PROFILES
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f"{'profile':<8} {'url':<24} {'status':>6} {'setup ms':>9} "
+            f"{'first ms':>9} {'median ms':>10}"
+        )
+        for profile in options["profiles"]:
+            result = self.run_profile(
+                profile, options["urls"], options["repeat"]
+            )
+            for url, timings in result["urls"].items():
+                self.stdout.write(
+                    f"{profile:<8} {url:<24} {timings['status']:>6} "
+                    f"{result['setup_ms']:>9.1f} {timings['first_ms']:>9.1f} "
+                    f"{timings['median_ms']:>10.3f}"
+                )
+
+    def run_profile(self, profile, urls, repeat):
+        env = {
+            **os.environ,
+            "DJANGO_SETTINGS_MODULE": "it_project_task_manager.settings",
+            "DJANGO_SETTINGS_PROFILE": profile,
+        }
+        code = (
+            f"from {__name__} import measure; "
+            f"measure({list(urls)!r}, {repeat!r})"
+        )
+        process = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+        )
+        if process.returncode:
+            raise CommandError(
+                f"The {profile} profile failed:\n{process.stderr}"
+            )
+        return json.loads(process.stdout.splitlines()[-1])
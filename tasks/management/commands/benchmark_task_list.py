@@ -0,0 +1,78 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from tasks.models import Task, Worker
+from tasks.page_cache import get_cache, page_key
+from tasks.views import TaskListView
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the task list view on the current database for several page "
+        "sizes: rendered from scratch, with the row fragments cached and "
+        "served from the page cache."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows", type=int, nargs="+", default=[8, 50, 500],
+            help="Page sizes to time."
+        )
+        parser.add_argument("--repeat", type=int, default=20)
+        parser.add_argument(
+            "--username",
+            help="Render the page as this worker, the first one by default."
+        )
+
+    def handle(self, *args, **options):
+        workers = Worker.objects.order_by("pk")
+        if options["username"]:
+            workers = workers.filter(username=options["username"])
+        user = workers.first()
+        if user is None:
+            raise CommandError("No worker to render the page as.")
+        tasks = Task.objects.count()
+
+        self.stdout.write(
+            f"{'rows':>6} {'cold ms':>10} {'rows ms':>10} {'page ms':>10}"
+        )
+        for rows in options["rows"]:
+            if rows > tasks:
+                self.stderr.write(f"Only {tasks} tasks, skipping {rows}.")
+                continue
+            timings = self.time_page(user, rows, options["repeat"])
+            self.stdout.write(
+                f"{rows:>6} "
+                + " ".join(f"{timing:>10.2f}" for timing in timings)
+            )
+
+    def time_page(self, user, rows, repeat):
+        """Median milliseconds for a cold cache, cached rows only and a
+        cached page."""
+        view = TaskListView.as_view(paginate_by=rows)
+        request = RequestFactory().get("/tasks/")
+        request.user = user
+        cache = get_cache()
+
+        def cold():
+            cache.clear()
+
+        def rows_only():
+            cache.delete(page_key("task_list", request))
+
+        timings = []
+        for prepare in (cold, rows_only, None):
+            samples = []
+            for _ in range(repeat):
+                # the versions are read once per request
+                request.__dict__.pop("_collection_versions", None)
+                if prepare:
+                    prepare()
+                start = time.perf_counter()
+                view(request).render()
+                samples.append((time.perf_counter() - start) * 1000)
+            timings.append(statistics.median(samples))
+        return timings
@@ -0,0 +1,73 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.benchmarking import run_benchmarks
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure p50/p95 latency, queries and peak memory of the task "
+        "views on the current database and write the results as JSON, "
+        "to diff between commits. Run it with the prod settings profile, "
+        "DEBUG and the debug toolbar distort the numbers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", default="-",
+            help="JSON file to write, standard output by default."
+        )
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument(
+            "--warm", action="store_true",
+            help="Keep the caches between requests instead of clearing "
+                 "them before each one."
+        )
+        parser.add_argument(
+            "--view", action="append", dest="views",
+            help="Only this page, can be repeated."
+        )
+        parser.add_argument("--username", help="Request pages as this worker.")
+        parser.add_argument(
+            "--compare", help="Earlier results to print the changes against."
+        )
+
+    def handle(self, *args, **options):
+        try:
+            report = run_benchmarks(
+                iterations=options["iterations"],
+                warm=options["warm"],
+                names=options["views"],
+                username=options["username"],
+            )
+        except ValueError as e:
+            raise CommandError(e)
+        if report["meta"]["debug"]:
+            self.stderr.write("DEBUG is on, latencies include its overhead.")
+
+        output = json.dumps(report, indent=2, sort_keys=True) + "\n"
+        if options["output"] == "-":
+            self.stdout.write(output, ending="")
+        else:
+            with open(options["output"], "w") as f:
+                f.write(output)
+
+        if options["compare"]:
+            with open(options["compare"]) as f:
+                self.write_comparison(json.load(f), report)
+
+    def write_comparison(self, before, after):
+        self.stderr.write(
+            f"{'view':<20} {'p50 ms':>16} {'p95 ms':>16} {'queries':>10}"
+        )
+        for name, result in after["results"].items():
+            old = before["results"].get(name)
+            if old is None:
+                continue
+            self.stderr.write(
+                f"{name:<20} "
+                f"{old['p50_ms']:>7.1f} → {result['p50_ms']:<6.1f} "
+                f"{old['p95_ms']:>7.1f} → {result['p95_ms']:<6.1f} "
+                f"{old['queries']:>3} → {result['queries']:<4}"
+            )
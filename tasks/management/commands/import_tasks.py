@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.importing import (
+    DEFAULT_BATCH_SIZE,
+    FORMATS,
+    TaskImporter,
+    detect_format,
+    read_rows,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Import tasks from a CSV or JSON lines file. Columns: name, "
+        "description, deadline (YYYY-MM-DD), priority, task_type, "
+        "is_completed and assignees (usernames, ';' separated in CSV)."
+    )
+    importer_class = TaskImporter
+    label = "tasks"
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--format", choices=FORMATS)
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        importer = self.importer_class(batch_size=options["batch_size"])
+        started = time.perf_counter()
+        try:
+            format = options["format"] or detect_format(path)
+            with open(path, newline="", encoding="utf-8") as file:
+                result = importer.run(read_rows(file, format))
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+        elapsed = time.perf_counter() - started
+
+        for error in result.errors:
+            self.stderr.write(error)
+        if result.failed:
+            self.stderr.write(f"Skipped {result.failed} invalid rows.")
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {result.imported} {self.label} in {elapsed:.2f}s "
+            f"({result.imported / max(elapsed, 1e-9):.0f} rows/sec)."
+        ))
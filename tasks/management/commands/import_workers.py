@@ -0,0 +1,12 @@
+from tasks.importing import WorkerImporter
+from tasks.management.commands import import_tasks
+
+
+class Command(import_tasks.Command):
+    help = (
+        "Import workers from a CSV or JSON lines file. Columns: username, "
+        "first_name, last_name, email and position. Imported accounts "
+        "can't log in until a password is set."
+    )
+    importer_class = WorkerImporter
+    label = "workers"
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from tasks.counters import rebuild_task_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the denormalized TaskCounters table from scratch, "
+        "e.g. after bulk imports that bypass model signals."
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_task_counters()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt {rows} task counters rows.")
+        )
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from tasks.deadlines import rebuild_deadline_buckets, rollover
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold the deadline buckets of past days into the overdue bucket. "
+        "Meant to run nightly, after local midnight."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rebuild",
+            action="store_true",
+            help="Recompute every bucket from the tasks table instead.",
+        )
+
+    def handle(self, *args, **options):
+        if options["rebuild"]:
+            rows = rebuild_deadline_buckets()
+            self.stdout.write(
+                self.style.SUCCESS(f"Rebuilt {rows} deadline buckets.")
+            )
+            return
+
+        days = rollover()
+        self.stdout.write(
+            self.style.SUCCESS(f"Folded {days} past days into overdue.")
+        )
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from tasks.benchmarking import seed
+from tasks.importing import DEFAULT_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate realistic workers and tasks for benchmarks through the "
+        "bulk importers. The same --seed gives the same data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=100)
+        parser.add_argument("--tasks", type=int, default=1000)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        workers, tasks = seed(
+            options["workers"],
+            options["tasks"],
+            random_seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+        for result in (workers, tasks):
+            for error in result.errors:
+                self.stderr.write(error)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {workers.imported} workers and {tasks.imported} tasks "
+            f"in {time.perf_counter() - started:.2f}s."
+        ))
@@ -0,0 +1,276 @@
+import functools
+import hmac
+import logging
+import threading
+import time
+from bisect import bisect_left
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import HttpResponse, HttpResponseForbidden
+from django.template.backends.django import Template
+from django.views.decorators.http import require_GET
+
+logger = logging.getLogger(__name__)
+
+DURATION_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (1_000, 10_000, 50_000, 100_000, 500_000, 1_000_000)
+
+# requests that didn't resolve to a view, one label keeps the cardinality
+# bounded whatever paths clients try
+UNMATCHED = "unmatched"
+
+
+class Histogram:
+    """Cumulative buckets, sum and count of one labelled series."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        # one slot per bucket plus +Inf
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def samples(self):
+        """(le, cumulative count) pairs, +Inf last."""
+        total = 0
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts):
+            total += count
+            yield bound, total
+
+
+class Registry:
+    """
+    In-process metrics. Every server process keeps its own, a scraper
+    sees the process that answered /metrics.
+    """
+
+    histograms = {
+        "tasks_request_duration_seconds": (
+            "Wall time of a request.", DURATION_BUCKETS
+        ),
+        "tasks_db_queries": ("Database queries per request.", QUERY_BUCKETS),
+        "tasks_db_duration_seconds": (
+            "Time spent in database queries per request.", DURATION_BUCKETS
+        ),
+        "tasks_template_render_seconds": (
+            "Time spent rendering the response template.", DURATION_BUCKETS
+        ),
+        "tasks_response_size_bytes": (
+            "Size of non-streaming response bodies.", SIZE_BUCKETS
+        ),
+    }
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.series = {name: {} for name in self.histograms}
+            self.requests = {}
+
+    def observe(self, name, view, value):
+        with self.lock:
+            series = self.series[name]
+            if view not in series:
+                series[view] = Histogram(self.histograms[name][1])
+            series[view].observe(value)
+
+    def count_request(self, view, status):
+        key = (view, status)
+        with self.lock:
+            self.requests[key] = self.requests.get(key, 0) + 1
+
+    def render(self):
+        """Everything in the Prometheus text exposition format."""
+        lines = [
+            "# HELP tasks_requests_total Requests by view and status.",
+            "# TYPE tasks_requests_total counter",
+        ]
+        with self.lock:
+            for (view, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'tasks_requests_total{{view="{view}",'
+                    f'status="{status}"}} {count}'
+                )
+            for name, (help_text, _) in self.histograms.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} histogram")
+                for view, histogram in sorted(self.series[name].items()):
+                    for bound, count in histogram.samples():
+                        lines.append(
+                            f'{name}_bucket{{view="{view}",le="{bound}"}} '
+                            f"{count}"
+                        )
+                    lines.append(
+                        f'{name}_sum{{view="{view}"}} {histogram.sum}'
+                    )
+                    lines.append(
+                        f'{name}_count{{view="{view}"}} {histogram.count}'
+                    )
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+
+class QueryRecorder:
+    """execute_wrapper counting the queries of a request and their time,
+    keeping the SQL of the slowest ones for the slow request log."""
+
+    def __init__(self, keep):
+        self.keep = keep
+        self.count = 0
+        self.duration = 0
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            if self.keep:
+                self.slowest.append((duration, sql))
+                if len(self.slowest) > self.keep:
+                    self.slowest.sort(reverse=True)
+                    self.slowest.pop()
+
+
+class RenderTimer:
+    """Time spent in the outermost template renders of a request."""
+
+    def __init__(self):
+        self.duration = 0
+        self.depth = 0
+
+
+_render_timer = ContextVar("render_timer", default=None)
+
+
+def _timed(render):
+    @functools.wraps(render)
+    def timed_render(*args, **kwargs):
+        timer = _render_timer.get()
+        if timer is None or timer.depth:
+            # outside a request, or a template rendered by another one
+            # (crispy forms) which is already being timed
+            return render(*args, **kwargs)
+        timer.depth += 1
+        start = time.perf_counter()
+        try:
+            return render(*args, **kwargs)
+        finally:
+            timer.depth -= 1
+            timer.duration += time.perf_counter() - start
+
+    timed_render.metrics_timed = True
+    return timed_render
+
+
+def install_render_timing():
+    """
+    Time every render of a template loaded through the template engine:
+    render(), render_to_string(), TemplateResponse and the page cache
+    fragments all go through django.template.backends.django.Template.
+    """
+    if not getattr(Template.render, "metrics_timed", False):
+        Template.render = _timed(Template.render)
+
+
+class MetricsMiddleware:
+    """
+    Record wall time, database queries and time, template render time and
+    response size per view name. Requests slower than
+    METRICS_SLOW_REQUEST_MS are logged with their slowest SQL.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "METRICS_SLOW_REQUEST_MS", None)
+        self.slow_queries = getattr(settings, "METRICS_SLOW_QUERIES", 5)
+        install_render_timing()
+
+    def __call__(self, request):
+        recorder = QueryRecorder(
+            self.slow_queries if self.slow_ms is not None else 0
+        )
+        render_timer = RenderTimer()
+        token = _render_timer.set(render_timer)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            _render_timer.reset(token)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match else UNMATCHED
+        registry.count_request(view, response.status_code)
+        registry.observe("tasks_request_duration_seconds", view, duration)
+        registry.observe("tasks_db_queries", view, recorder.count)
+        registry.observe("tasks_db_duration_seconds", view, recorder.duration)
+        if render_timer.duration:
+            registry.observe(
+                "tasks_template_render_seconds", view, render_timer.duration
+            )
+        if not response.streaming:
+            registry.observe(
+                "tasks_response_size_bytes", view, len(response.content)
+            )
+
+        if self.slow_ms is not None and duration * 1000 >= self.slow_ms:
+            self.log_slow_request(request, view, duration, recorder)
+        return response
+
+    def log_slow_request(self, request, view, duration, recorder):
+        queries = "".join(
+            f"\n  {query_duration * 1000:.1f} ms: {sql}"
+            for query_duration, sql in sorted(recorder.slowest, reverse=True)
+        )
+        logger.warning(
+            "Slow request %s %s (%s): %.0f ms, %d queries in %.0f ms%s",
+            request.method,
+            request.get_full_path(),
+            view,
+            duration * 1000,
+            recorder.count,
+            recorder.duration * 1000,
+            queries,
+        )
+
+
+@require_GET
+def metrics(request):
+    """
+    The metrics in the Prometheus text format, for staff or for scrapers
+    sending `Authorization: Bearer <METRICS_TOKEN>`.
+    """
+    token = getattr(settings, "METRICS_TOKEN", None)
+    authorization = request.headers.get("Authorization", "")
+    allowed = request.user.is_staff or (
+        token and hmac.compare_digest(
+            authorization.encode(), f"Bearer {token}".encode()
+        )
+    )
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(
+        registry.render(), content_type="text/plain; version=0.0.4"
+    )
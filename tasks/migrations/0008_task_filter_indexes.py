@@ -0,0 +1,71 @@
+# Generated by Django 4.1.6 on 2026-10-18 12:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0007_alter_task_name"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="position",
+            name="name",
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="task",
+            name="description",
+            field=models.TextField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="task",
+            name="name",
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AlterField(
+            model_name="tasktype",
+            name="name",
+            field=models.CharField(max_length=255),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["is_completed", "priority", "deadline"],
+                name="task_status_priority_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("is_completed", False)),
+                fields=["priority", "deadline"],
+                name="task_open_priority_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("is_completed", False)),
+                fields=["deadline", "priority"],
+                name="task_open_deadline_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                condition=models.Q(("is_completed", True)),
+                fields=["deadline", "priority"],
+                name="task_done_deadline_idx",
+            ),
+        ),
+        migrations.RunSQL(
+            sql=(
+                "CREATE INDEX tasks_task_assignees_worker_task_idx "
+                "ON tasks_task_assignees (worker_id, task_id);"
+            ),
+            reverse_sql="DROP INDEX tasks_task_assignees_worker_task_idx;",
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 4.1.6 on 2026-10-18 13:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0008_task_filter_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TaskCounters",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("global", "Global"),
+                            ("task_type", "Task type"),
+                            ("worker", "Worker"),
+                        ],
+                        max_length=9,
+                    ),
+                ),
+                ("object_id", models.PositiveBigIntegerField(default=0)),
+                ("total", models.IntegerField(default=0)),
+                ("completed", models.IntegerField(default=0)),
+                ("open_urgent_high", models.IntegerField(default=0)),
+            ],
+            options={
+                "verbose_name_plural": "task counters",
+            },
+        ),
+        migrations.AddConstraint(
+            model_name="taskcounters",
+            constraint=models.UniqueConstraint(
+                fields=("scope", "object_id"), name="unique_task_counters_scope"
+            ),
+        ),
+    ]
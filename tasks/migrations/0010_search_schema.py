@@ -0,0 +1,105 @@
+# Generated by Django 4.1.6 on 2026-10-18 13:40
+
+from django.db import migrations
+
+# The DDL is spelled out rather than imported from tasks.search, so later
+# changes there don't rewrite what this migration did.
+SQLITE_SEARCH = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_task_fts USING fts5("
+    "name, description, content='tasks_task', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_task_fts_ai AFTER INSERT ON tasks_task"
+    " BEGIN INSERT INTO tasks_task_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_task_fts_ad AFTER DELETE ON tasks_task"
+    " BEGIN INSERT INTO tasks_task_fts(tasks_task_fts, rowid, name, "
+    "description) VALUES ('delete', old.id, old.name, old.description); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_task_fts_au AFTER UPDATE ON tasks_task"
+    " BEGIN INSERT INTO tasks_task_fts(tasks_task_fts, rowid, name, "
+    "description) VALUES ('delete', old.id, old.name, old.description); "
+    "INSERT INTO tasks_task_fts(rowid, name, description) "
+    "VALUES (new.id, new.name, new.description); END",
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+    "CREATE VIRTUAL TABLE IF NOT EXISTS tasks_worker_fts USING fts5("
+    "username, first_name, last_name, content='tasks_worker', "
+    "content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "CREATE TRIGGER IF NOT EXISTS tasks_worker_fts_ai AFTER INSERT ON "
+    "tasks_worker BEGIN INSERT INTO tasks_worker_fts(rowid, username, "
+    "first_name, last_name) VALUES (new.id, new.username, new.first_name, "
+    "new.last_name); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_worker_fts_ad AFTER DELETE ON "
+    "tasks_worker BEGIN INSERT INTO tasks_worker_fts(tasks_worker_fts, "
+    "rowid, username, first_name, last_name) VALUES ('delete', old.id, "
+    "old.username, old.first_name, old.last_name); END",
+    "CREATE TRIGGER IF NOT EXISTS tasks_worker_fts_au AFTER UPDATE ON "
+    "tasks_worker BEGIN INSERT INTO tasks_worker_fts(tasks_worker_fts, "
+    "rowid, username, first_name, last_name) VALUES ('delete', old.id, "
+    "old.username, old.first_name, old.last_name); "
+    "INSERT INTO tasks_worker_fts(rowid, username, first_name, last_name) "
+    "VALUES (new.id, new.username, new.first_name, new.last_name); END",
+    "INSERT INTO tasks_worker_fts(tasks_worker_fts) VALUES ('rebuild')",
+]
+SQLITE_SEARCH_REVERSE = [
+    f"DROP {kind} IF EXISTS {table}_fts{suffix}"
+    for table in ("tasks_task", "tasks_worker")
+    for kind, suffix in (
+        ("TABLE", ""),
+        ("TRIGGER", "_ai"),
+        ("TRIGGER", "_ad"),
+        ("TRIGGER", "_au"),
+    )
+]
+
+POSTGRES_SEARCH = [
+    "ALTER TABLE tasks_task ADD COLUMN IF NOT EXISTS search_vector tsvector "
+    "GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS tasks_task_search_vector_idx "
+    "ON tasks_task USING gin (search_vector)",
+    "ALTER TABLE tasks_worker ADD COLUMN IF NOT EXISTS search_vector "
+    "tsvector GENERATED ALWAYS AS ("
+    "setweight(to_tsvector('english', coalesce(username, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(first_name, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(last_name, '')), 'C')"
+    ") STORED",
+    "CREATE INDEX IF NOT EXISTS tasks_worker_search_vector_idx "
+    "ON tasks_worker USING gin (search_vector)",
+]
+POSTGRES_SEARCH_REVERSE = [
+    statement
+    for table in ("tasks_task", "tasks_worker")
+    for statement in (
+        f"DROP INDEX IF EXISTS {table}_search_vector_idx",
+        f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector",
+    )
+]
+
+STATEMENTS = {
+    "sqlite": (SQLITE_SEARCH, SQLITE_SEARCH_REVERSE),
+    "postgresql": (POSTGRES_SEARCH, POSTGRES_SEARCH_REVERSE),
+}
+
+
+def create_search_schema(apps, schema_editor):
+    install, _ = STATEMENTS.get(schema_editor.connection.vendor, ([], []))
+    for statement in install:
+        schema_editor.execute(statement, params=None)
+
+
+def drop_search_schema(apps, schema_editor):
+    _, uninstall = STATEMENTS.get(schema_editor.connection.vendor, ([], []))
+    for statement in uninstall:
+        schema_editor.execute(statement, params=None)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0009_taskcounters"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_schema, drop_search_schema),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.1.6 on 2026-10-18 14:10
+
+from django.db import migrations
+
+# The DDL is spelled out rather than imported from tasks.search, so later
+# changes there don't rewrite what this migration did.
+TRIGRAM_COLUMNS = [
+    ("tasks_task", "name"),
+    ("tasks_worker", "username"),
+    ("tasks_worker", "first_name"),
+    ("tasks_worker", "last_name"),
+]
+
+
+def create_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm_idx "
+            f"ON {table} USING gin ({column} gin_trgm_ops)"
+        )
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, column in TRIGRAM_COLUMNS:
+        schema_editor.execute(
+            f"DROP INDEX IF EXISTS {table}_{column}_trgm_idx"
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0010_search_schema"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.1.6 on 2026-10-18 14:45
+
+from django.db import migrations, models
+
+PRIORITY_RANKS = {"Urgent": 4, "High": 3, "Medium": 2, "Low": 1}
+
+
+def fill_priority_rank(apps, schema_editor):
+    Task = apps.get_model("tasks", "Task")
+    for priority, rank in PRIORITY_RANKS.items():
+        Task.objects.filter(priority=priority).update(priority_rank=rank)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0011_trigram_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="task",
+            name="priority_rank",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_priority_rank, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["deadline", "-priority_rank", "id"],
+                name="task_deadline_sort_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(
+                fields=["-priority_rank", "deadline", "id"],
+                name="task_priority_sort_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="task",
+            index=models.Index(fields=["name", "id"], name="task_name_sort_idx"),
+        ),
+    ]
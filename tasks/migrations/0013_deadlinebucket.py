@@ -0,0 +1,32 @@
+# Generated by Django 4.1.6 on 2026-10-18 12:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0012_task_priority_rank"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeadlineBucket",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("day", models.DateField(unique=True)),
+                ("open_tasks", models.IntegerField(default=0)),
+            ],
+            options={
+                "ordering": ["day"],
+            },
+        ),
+    ]
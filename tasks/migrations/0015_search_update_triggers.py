@@ -0,0 +1,53 @@
+# Generated by Django 4.1.6 on 2026-10-19 09:00
+
+from django.db import migrations
+
+# Reindex a row only when one of its searched columns changes.
+TRIGGERS = {
+    "tasks_task": (
+        "name, description",
+        "old.name, old.description",
+        "new.name, new.description",
+    ),
+    "tasks_worker": (
+        "username, first_name, last_name",
+        "old.username, old.first_name, old.last_name",
+        "new.username, new.first_name, new.last_name",
+    ),
+}
+
+
+def update_trigger(table, columns, old, new, of_columns):
+    fts = f"{table}_fts"
+    watched = f"OF {columns} " if of_columns else ""
+    return (
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE {watched}ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {columns}) "
+        f"VALUES ('delete', old.id, {old}); "
+        f"INSERT INTO {fts}(rowid, {columns}) VALUES (new.id, {new}); END"
+    )
+
+
+def replace_triggers(of_columns):
+    def operation(apps, schema_editor):
+        if schema_editor.connection.vendor != "sqlite":
+            return
+        for table, (columns, old, new) in TRIGGERS.items():
+            schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_au")
+            schema_editor.execute(
+                update_trigger(table, columns, old, new, of_columns),
+                params=None,
+            )
+
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0014_updated_at_collectionversion"),
+    ]
+
+    operations = [
+        migrations.RunPython(replace_triggers(True), replace_triggers(False)),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.1.6 on 2026-10-19 10:00
+
+from django.db import migrations
+
+INDEX = "tasks_worker_username_prefix_idx"
+
+
+def create_prefix_index(apps, schema_editor):
+    """
+    The worker lookup filters on username LIKE 'x%'. Under a non-C
+    collation PostgreSQL can only use a varchar_pattern_ops index for
+    that. Django adds one (the *_like index) when it creates a unique
+    varchar column; make sure one exists without adding a duplicate.
+    """
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT 1 FROM pg_indexes WHERE tablename = 'tasks_worker' "
+            "AND indexdef LIKE '%%(username varchar_pattern_ops)%%'"
+        )
+        if cursor.fetchone():
+            return
+    schema_editor.execute(
+        f"CREATE INDEX {INDEX} ON tasks_worker (username varchar_pattern_ops)"
+    )
+
+
+def drop_prefix_index(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("tasks", "0015_search_update_triggers"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_prefix_index, drop_prefix_index),
+    ]
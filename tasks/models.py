@@ -1,8 +1,7 @@
-from django.urls import reverse
-
-from it_project_task_manager.settings import AUTH_USER_MODEL
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.urls import reverse
 
 
 class TaskType(models.Model):
@@ -32,6 +31,7 @@ class Worker(AbstractUser):
         related_name="worker_position",
         null=True
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     class Meta:
         ordering = ["username", "position"]
@@ -45,6 +45,20 @@ class Worker(AbstractUser):
         return reverse("tasks:worker-detail", kwargs={"pk": self.pk})
 
 
+class TaskQuerySet(models.QuerySet):
+    def for_listing(self):
+        """Everything the task list templates render, in a fixed number
+        of queries no matter how many rows are shown."""
+        return self.select_related("task_type").prefetch_related(
+            models.Prefetch(
+                "assignees",
+                queryset=Worker.objects.select_related("position").only(
+                    "username", "first_name", "last_name", "position__name"
+                ),
+            )
+        )
+
+
 class Task(models.Model):
     class PriorityType(models.TextChoices):
         URGENT = "Urgent", "Urgent"
@@ -52,16 +66,118 @@ class Task(models.Model):
         MEDIUM = "Medium", "Medium"
         LOW = "Low", "Low"
 
+    # real severity, the choice values sort lexically
+    PRIORITY_RANKS = {
+        PriorityType.URGENT: 4,
+        PriorityType.HIGH: 3,
+        PriorityType.MEDIUM: 2,
+        PriorityType.LOW: 1,
+    }
+
     name = models.CharField(max_length=255)
     description = models.TextField(max_length=255)
     deadline = models.DateField()
     is_completed = models.BooleanField(verbose_name="task_status", default=False)
     priority = models.CharField(max_length=6, choices=PriorityType.choices)
+    priority_rank = models.PositiveSmallIntegerField(default=0, editable=False)
     task_type = models.ForeignKey(to=TaskType, on_delete=models.PROTECT)
-    assignees = models.ManyToManyField(to=AUTH_USER_MODEL)
+    assignees = models.ManyToManyField(to=settings.AUTH_USER_MODEL)
+    # also bumped by assignee changes and bulk updates, see tasks.signals
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    objects = TaskQuerySet.as_manager()
+
+    def save(self, *args, **kwargs):
+        self.priority_rank = self.PRIORITY_RANKS.get(self.priority, 0)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and "priority" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "priority_rank"}
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return f"{self.name} -  {self.priority} priority, Deadline: {self.deadline} Is_Completed: {self.is_completed}"
 
     class Meta:
         ordering = ["deadline", "priority"]
+        indexes = [
+            models.Index(
+                fields=["is_completed", "priority", "deadline"],
+                name="task_status_priority_idx",
+            ),
+            # partial indexes keep the open/completed lists off the full table
+            models.Index(
+                fields=["priority", "deadline"],
+                name="task_open_priority_idx",
+                condition=models.Q(is_completed=False),
+            ),
+            models.Index(
+                fields=["deadline", "priority"],
+                name="task_open_deadline_idx",
+                condition=models.Q(is_completed=False),
+            ),
+            models.Index(
+                fields=["deadline", "priority"],
+                name="task_done_deadline_idx",
+                condition=models.Q(is_completed=True),
+            ),
+            # sort_by orderings, see tasks.sorting
+            models.Index(
+                fields=["deadline", "-priority_rank", "id"],
+                name="task_deadline_sort_idx",
+            ),
+            models.Index(
+                fields=["-priority_rank", "deadline", "id"],
+                name="task_priority_sort_idx",
+            ),
+            models.Index(fields=["name", "id"], name="task_name_sort_idx"),
+        ]
+
+
+class TaskCounters(models.Model):
+    """Denormalized task counts, kept current by tasks.signals."""
+    class Scope(models.TextChoices):
+        GLOBAL = "global", "Global"
+        TASK_TYPE = "task_type", "Task type"
+        WORKER = "worker", "Worker"
+
+    scope = models.CharField(max_length=9, choices=Scope.choices)
+    object_id = models.PositiveBigIntegerField(default=0)
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    open_urgent_high = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.scope} {self.object_id}: {self.total} tasks"
+
+    class Meta:
+        verbose_name_plural = "task counters"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "object_id"],
+                name="unique_task_counters_scope",
+            ),
+        ]
+
+
+class DeadlineBucket(models.Model):
+    """Open tasks per deadline day, kept current by tasks.signals. See
+    tasks.deadlines for the overdue row the nightly rollover folds past
+    days into."""
+    day = models.DateField(unique=True)
+    open_tasks = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.day}: {self.open_tasks} open tasks"
+
+    class Meta:
+        ordering = ["day"]
+
+
+class CollectionVersion(models.Model):
+    """Counter bumped on every write to a collection ("tasks",
+    "workers"), cheap validators for list pages, see tasks.versions."""
+    name = models.CharField(max_length=50, unique=True)
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.name} v{self.version}"
@@ -0,0 +1,55 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.utils import timezone
+
+from tasks.models import Task
+
+CACHE_KEY = "tasks:notifications:{worker_id}"
+DEADLINE_WINDOW = timedelta(days=3)
+
+
+def get_cache():
+    return caches[getattr(settings, "NOTIFICATIONS_CACHE", "default")]
+
+
+def seconds_until_midnight(now=None):
+    """The deadline window only moves once a day, so a digest can live
+    until the next local midnight."""
+    now = timezone.localtime(now)
+    midnight = (now + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return max(int((midnight - now).total_seconds()), 1)
+
+
+def cache_key(worker_id):
+    return CACHE_KEY.format(worker_id=worker_id)
+
+
+def get_notification_tasks(worker_id):
+    """Summary rows of the worker's tasks with a deadline in the next
+    three days, served from the cache when possible."""
+    cache = get_cache()
+    key = cache_key(worker_id)
+    tasks = cache.get(key)
+
+    if tasks is None:
+        # deadlines are dates, compare them with the local date
+        deadline = timezone.localdate() + DEADLINE_WINDOW
+        tasks = list(
+            Task.objects.filter(
+                assignees=worker_id,
+                deadline__lte=deadline
+            ).order_by("deadline").values("id", "name", "deadline", "priority")
+        )
+        cache.set(key, tasks, seconds_until_midnight())
+
+    return tasks
+
+
+def invalidate(worker_ids):
+    keys = [cache_key(worker_id) for worker_id in worker_ids]
+    if keys:
+        get_cache().delete_many(keys)
@@ -0,0 +1,182 @@
+import json
+import logging
+import re
+import sys
+from contextlib import ExitStack
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+from django.db import connections
+
+from tasks import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_THRESHOLD = 5
+RAISE = "raise"
+WARN = "warn"
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r"\b\d+(?:\.\d+)?\b")
+_LISTS = re.compile(r"\((?:\s*(?:%s|\?|NULL)\s*,?)+\)")
+_SPACES = re.compile(r"\s+")
+
+_PROJECT_DIR = Path(settings.BASE_DIR).resolve()
+# the execute wrappers themselves are never the call site
+_WRAPPERS = {Path(__file__).resolve(), Path(metrics.__file__).resolve()}
+
+
+class NPlusOneDetected(AssertionError):
+    pass
+
+
+def fingerprint(sql):
+    """The shape of a statement: literals, placeholders and IN lists of
+    any length collapse to the same text."""
+    sql = _STRINGS.sub("?", sql)
+    sql = _NUMBERS.sub("?", sql)
+    sql = _LISTS.sub("(...)", sql)
+    return _SPACES.sub(" ", sql).strip()
+
+
+@lru_cache(maxsize=None)
+def project_path(filename):
+    """`filename` relative to the project, None for code outside it and
+    for installed packages."""
+    if filename.startswith("<"):
+        # <string>, <frozen ...>
+        return None
+    path = Path(filename).resolve()
+    if path in _WRAPPERS or "site-packages" in path.parts:
+        return None
+    try:
+        return str(path.relative_to(_PROJECT_DIR))
+    except ValueError:
+        return None
+
+
+def call_site():
+    """file:line of the innermost project frame that ran the query."""
+    frame = sys._getframe(1)
+    while frame is not None:
+        path = project_path(frame.f_code.co_filename)
+        if path:
+            return f"{path}:{frame.f_lineno}"
+        frame = frame.f_back
+    return "<unknown>"
+
+
+class Detector:
+    """
+    execute_wrapper counting queries per (fingerprint, call site) while
+    active. The same shape from the same line more than `threshold`
+    times in one unit of work is almost always a lazy load in a loop.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD):
+        self.threshold = threshold
+        self.counts = {}
+        self.samples = {}
+        self._stack = None
+
+    def __call__(self, execute, sql, params, many, context):
+        key = (fingerprint(sql), call_site())
+        self.counts[key] = self.counts.get(key, 0) + 1
+        self.samples.setdefault(key, sql)
+        return execute(sql, params, many, context)
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stack.close()
+
+    def violations(self):
+        """[{"fingerprint", "call_site", "count", "sql"}], worst first."""
+        found = [
+            {
+                "fingerprint": shape,
+                "call_site": site,
+                "count": count,
+                "sql": self.samples[shape, site],
+            }
+            for (shape, site), count in self.counts.items()
+            if count > self.threshold
+        ]
+        return sorted(found, key=lambda violation: -violation["count"])
+
+
+def describe(violations):
+    return "\n".join(
+        f"{violation['count']} x {violation['call_site']}: "
+        f"{violation['fingerprint']}"
+        for violation in violations
+    )
+
+
+def report(violations, mode, label):
+    if not violations:
+        return
+    if mode == RAISE:
+        raise NPlusOneDetected(
+            f"Repeated queries in {label}:\n{describe(violations)}"
+        )
+    for violation in violations:
+        logger.warning(
+            "Repeated query in %s: %s",
+            label,
+            json.dumps({"request": label, **violation}),
+            extra={"nplusone": violation, "request_label": label},
+        )
+
+
+class NPlusOneMiddleware:
+    """
+    Fingerprint every query of a request. NPLUSONE_DETECTION "raise"
+    fails the request (for tests), "warn" logs a structured warning per
+    offending shape on the tasks.nplusone logger (for staging), unset
+    turns detection off. NPLUSONE_THRESHOLD is how often one shape may
+    repeat from one line.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = getattr(settings, "NPLUSONE_DETECTION", None)
+        if mode not in (RAISE, WARN):
+            return self.get_response(request)
+
+        threshold = getattr(settings, "NPLUSONE_THRESHOLD", DEFAULT_THRESHOLD)
+        with Detector(threshold) as detector:
+            response = self.get_response(request)
+        report(
+            detector.violations(), mode,
+            f"{request.method} {request.get_full_path()}"
+        )
+        return response
+
+
+class NPlusOneTestMixin:
+    """
+    For view tests: any request made through the test client that
+    repeats a query shape from one line more than `nplusone_threshold`
+    times raises NPlusOneDetected, which the client re-raises in the test.
+    """
+    nplusone_threshold = 3
+
+    @classmethod
+    def setUpClass(cls):
+        from django.test.utils import override_settings
+
+        super().setUpClass()
+        overridden = override_settings(
+            NPLUSONE_DETECTION=RAISE,
+            NPLUSONE_THRESHOLD=cls.nplusone_threshold,
+        )
+        overridden.enable()
+        cls.addClassCleanup(overridden.disable)
@@ -0,0 +1,79 @@
+import hashlib
+
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from tasks import versions
+from tasks.templatetags.query_transform import normalized_query
+
+STAFF = "staff"
+MEMBER = "member"
+
+
+def get_cache():
+    return caches[getattr(settings, "PAGE_CACHE", "default")]
+
+
+def permission_tier(user):
+    """What decides the parts of a page that differ between users, staff
+    see the buttons to create and edit tasks."""
+    return STAFF if user.is_staff else MEMBER
+
+
+def page_key(name, request):
+    """
+    Cache key of page `name` for `request`: the permission tier, the
+    normalized query string and every collection version. Any write to
+    tasks, workers or task types bumps a version, so stale pages are
+    never read again and expire on their own.
+    """
+    query = hashlib.md5(
+        normalized_query(request.GET).encode(), usedforsecurity=False
+    ).hexdigest()
+    collection_versions = versions.get_request_versions(request)
+    return ":".join(
+        map(
+            str,
+            (
+                "tasks:page",
+                name,
+                permission_tier(request.user),
+                query,
+                *collection_versions.values(),
+            ),
+        )
+    )
+
+
+class PageCacheMixin:
+    """
+    Cache the rendered content of a list page, shared by every user of a
+    permission tier. The content lives in its own template
+    (`content_template_name`), the page template wraps it in base.html
+    with `{{ page_content }}`, which keeps the navigation per user.
+    On a hit the view's queries are skipped altogether.
+    """
+    page_cache_name = None
+    content_template_name = None
+
+    def get_content_context_data(self, **kwargs):
+        return super().get_context_data(**kwargs)
+
+    def get_context_data(self, **kwargs):
+        cache = get_cache()
+        key = page_key(self.page_cache_name, self.request)
+        content = cache.get(key)
+        if content is None:
+            context = self.get_content_context_data(**kwargs)
+            context["page_cache"] = {
+                "alias": getattr(settings, "PAGE_CACHE", "default"),
+                "timeout": settings.PAGE_CACHE_TIMEOUT,
+                "versions": versions.get_request_versions(self.request),
+            }
+            content = render_to_string(
+                self.content_template_name, context, self.request
+            )
+            cache.set(key, content, settings.PAGE_CACHE_TIMEOUT)
+        return {"view": self, "page_content": mark_safe(content)}
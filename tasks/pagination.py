@@ -0,0 +1,180 @@
+import base64
+import json
+from functools import reduce
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.db.models import Q
+from django.http import Http404
+
+NEXT = "n"
+PREVIOUS = "p"
+
+
+class InvalidCursor(InvalidPage):
+    pass
+
+
+class CursorPage:
+    """Page of a keyset paginated queryset, mirrors the bits of
+    django.core.paginator.Page used by the templates."""
+    is_cursor = True
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f"<Cursor page of {len(self.object_list)} objects>"
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Keyset paginator: seeks past the last row of the previous page with
+    a WHERE clause on the ordering columns instead of COUNT(*) + OFFSET,
+    so every page costs the same no matter how deep it is.
+    The ordering must be total (end with a unique column).
+    """
+
+    def __init__(self, queryset, per_page, ordering):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.ordering = tuple(ordering)
+        self.fields = [
+            self._get_field(name.lstrip("-")) for name in self.ordering
+        ]
+
+    def _get_field(self, name):
+        opts = self.queryset.model._meta
+        return opts.pk if name == "pk" else opts.get_field(name)
+
+    def encode_cursor(self, obj, direction):
+        values = [getattr(obj, field.attname) for field in self.fields]
+        payload = json.dumps({"d": direction, "v": values}, default=str)
+        token = base64.urlsafe_b64encode(payload.encode())
+        return token.decode().rstrip("=")
+
+    def decode_cursor(self, token):
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            direction, values = payload["d"], payload["v"]
+            if direction not in (NEXT, PREVIOUS):
+                raise ValueError(direction)
+            if len(values) != len(self.fields):
+                raise ValueError(values)
+            return direction, [
+                field.to_python(value)
+                for field, value in zip(self.fields, values)
+            ]
+        except Exception:
+            raise InvalidCursor("That cursor is not valid")
+
+    def _seek_filter(self, values, backwards):
+        conditions = []
+        for position, name in enumerate(self.ordering):
+            descending = name.startswith("-")
+            lookup = "lt" if descending != backwards else "gt"
+            equal = {
+                field.name: value
+                for field, value in zip(
+                    self.fields[:position], values[:position]
+                )
+            }
+            conditions.append(Q(
+                **equal,
+                **{f"{name.lstrip('-')}__{lookup}": values[position]}
+            ))
+        # the OR chain alone is not sargable, a plain range on the first
+        # column lets the planner seek into the index instead of scanning
+        first = self.ordering[0]
+        bound = "lte" if first.startswith("-") != backwards else "gte"
+        leading = Q(**{f"{first.lstrip('-')}__{bound}": values[0]})
+        return leading & reduce(lambda left, right: left | right, conditions)
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith("-") else f"-{name}"
+            for name in self.ordering
+        ]
+
+    def page(self, cursor=None):
+        direction, values = NEXT, None
+        if cursor:
+            direction, values = self.decode_cursor(cursor)
+        backwards = direction == PREVIOUS
+
+        queryset = self.queryset.order_by(
+            *(self._reversed_ordering() if backwards else self.ordering)
+        )
+        if values is not None:
+            queryset = queryset.filter(self._seek_filter(values, backwards))
+
+        object_list = list(queryset[:self.per_page + 1])
+        has_more = len(object_list) > self.per_page
+        object_list = object_list[:self.per_page]
+
+        if backwards:
+            object_list.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, values is not None
+
+        next_cursor = previous_cursor = None
+        if object_list and has_next:
+            next_cursor = self.encode_cursor(object_list[-1], NEXT)
+        if object_list and has_previous:
+            previous_cursor = self.encode_cursor(object_list[0], PREVIOUS)
+
+        return CursorPage(object_list, self, next_cursor, previous_cursor)
+
+
+class CursorPaginationMixin:
+    """
+    Opt-in keyset pagination for ListView. Enabled for every request with
+    settings.CURSOR_PAGINATION, or per request by a `cursor` GET parameter.
+    """
+    cursor_ordering = None
+    cursor_kwarg = "cursor"
+
+    def get_cursor_ordering(self):
+        return self.cursor_ordering
+
+    def use_cursor_pagination(self):
+        if not self.get_cursor_ordering():
+            return False
+        return (
+            getattr(settings, "CURSOR_PAGINATION", False)
+            or self.cursor_kwarg in self.request.GET
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_cursor_pagination():
+            return super().paginate_queryset(queryset, page_size)
+
+        paginator = CursorPaginator(
+            queryset, page_size, self.get_cursor_ordering()
+        )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+
+        return paginator, page, page.object_list, page.has_other_pages()
@@ -0,0 +1,97 @@
+import itertools
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+STICKY_COOKIE = "db_primary"
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+
+# the replica the current request reads from, None reads from the primary
+_read_alias = ContextVar("read_alias", default=None)
+_rotations = {}
+
+
+def next_replica():
+    """The configured replicas in turn, None without any."""
+    replicas = tuple(getattr(settings, "DATABASE_REPLICAS", ()))
+    if not replicas:
+        return None
+    if replicas not in _rotations:
+        _rotations[replicas] = itertools.cycle(replicas)
+    return next(_rotations[replicas])
+
+
+def is_sticky(request):
+    return STICKY_COOKIE in request.COOKIES
+
+
+class ReplicaRouter:
+    """
+    Reads of the tasks app go to the replica ReplicaMiddleware picked for
+    the request, everything else (writes, sessions, permissions, code
+    outside a request) to the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label == "tasks":
+            return _read_alias.get()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the same rows as the primary
+        return True
+
+
+def _pinned(content, alias):
+    # a streaming body is read after the middleware returned
+    token = _read_alias.set(alias)
+    try:
+        yield from content
+    finally:
+        _read_alias.reset(token)
+
+
+class ReplicaMiddleware:
+    """
+    Safe requests to the views in DATABASE_REPLICA_VIEWS read from the
+    next replica. A write marks the client with a cookie for
+    DATABASE_REPLICA_STICKY_SECONDS, during which it reads from the
+    primary and sees its own changes.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        token = _read_alias.set(None)
+        try:
+            response = self.get_response(request)
+            if response.streaming and _read_alias.get():
+                response.streaming_content = _pinned(
+                    response.streaming_content, _read_alias.get()
+                )
+        finally:
+            _read_alias.reset(token)
+
+        if request.method not in SAFE_METHODS:
+            response.set_cookie(
+                STICKY_COOKIE,
+                "1",
+                max_age=settings.DATABASE_REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite="Lax",
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in SAFE_METHODS
+            and request.resolver_match.view_name
+            in settings.DATABASE_REPLICA_VIEWS
+            and not is_sticky(request)
+        ):
+            _read_alias.set(next_replica())
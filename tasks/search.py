@@ -0,0 +1,517 @@
+import logging
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from django.conf import settings
+from django.db import connection, connections
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+from tasks.models import Task, Worker
+
+logger = logging.getLogger(__name__)
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# table -> (weighted search columns, most important first)
+SEARCH_COLUMNS = {
+    "tasks_task": ("name", "description"),
+    "tasks_worker": ("username", "first_name", "last_name"),
+}
+
+# columns searched by the typo tolerant lookup mode
+FUZZY_COLUMNS = {
+    "tasks_task": ("name",),
+    "tasks_worker": ("username", "first_name", "last_name"),
+}
+FUZZY_THRESHOLD = 0.3
+FUZZY_LIMIT = 200
+# documents scored per query at most
+FUZZY_MAX_CANDIDATES = 5000
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())
+
+
+def trigrams(text):
+    """pg_trgm style trigrams: every word padded with two leading and one
+    trailing space."""
+    grams = set()
+    for word in tokenize(text):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class NgramIndex:
+    """
+    In-process inverted trigram index over FUZZY_COLUMNS, the SQLite
+    stand-in for pg_trgm. Built off the request path by
+    start_ngram_indexes(), kept current by the Task/Worker signals and
+    the importers of this process, and rebuilt every
+    settings.NGRAM_INDEX_MAX_AGE seconds to pick up writes made by other
+    processes. Searches never build it, see SQLiteSearchBackend.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.fields = FUZZY_COLUMNS[model._meta.db_table]
+        self.postings = defaultdict(set)
+        self.documents = {}
+        self.built_at = None
+        # changes made while a build reads the table, None when idle
+        self.pending = None
+        self.lock = threading.RLock()
+
+    @property
+    def is_built(self):
+        return self.built_at is not None
+
+    def build(self):
+        """Index the table into new structures and swap them in, searches
+        keep using the previous index meanwhile."""
+        postings, documents = defaultdict(set), {}
+        with self.lock:
+            self.pending = []
+        try:
+            rows = self.model._base_manager.values_list("pk", *self.fields)
+            for pk, *values in rows.iterator(chunk_size=2000):
+                self._add(postings, documents, pk, values)
+        except Exception:
+            with self.lock:
+                self.pending = None
+            raise
+
+        with self.lock:
+            for pk, values in self.pending:
+                self._apply(postings, documents, pk, values)
+            self.postings, self.documents = postings, documents
+            self.pending = None
+            self.built_at = time.monotonic()
+
+    def reset(self):
+        with self.lock:
+            self.postings = defaultdict(set)
+            self.documents = {}
+            self.built_at = None
+
+    @staticmethod
+    def _add(postings, documents, pk, values):
+        grams = trigrams(" ".join(value or "" for value in values))
+        documents[pk] = grams
+        for gram in grams:
+            postings[gram].add(pk)
+
+    def _apply(self, postings, documents, pk, values):
+        for gram in documents.pop(pk, ()):
+            postings[gram].discard(pk)
+        if values is not None:
+            self._add(postings, documents, pk, values)
+
+    def _change(self, pk, values):
+        with self.lock:
+            if self.pending is not None:
+                self.pending.append((pk, values))
+            if self.is_built:
+                self._apply(self.postings, self.documents, pk, values)
+
+    def remove(self, pk):
+        self._change(pk, None)
+
+    def update(self, instance):
+        self._change(
+            instance.pk, [getattr(instance, field) for field in self.fields]
+        )
+
+    def update_many(self, instances):
+        # bulk_create leaves pk unset on databases that can't return it,
+        # those rows are picked up by the next rebuild
+        with self.lock:
+            for instance in instances:
+                if instance.pk is not None:
+                    self.update(instance)
+
+    def search(self, query, threshold=FUZZY_THRESHOLD, limit=FUZZY_LIMIT,
+               max_candidates=FUZZY_MAX_CANDIDATES):
+        """(pk, score) pairs, score being the share of the query trigrams
+        found in the document, like pg_trgm word_similarity()."""
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        needed = max(1, math.ceil(threshold * len(query_grams)))
+
+        with self.lock:
+            # a document sharing `needed` trigrams with the query contains
+            # at least one of its len - needed + 1 rarest trigrams
+            rarest = sorted(
+                query_grams, key=lambda gram: len(self.postings.get(gram, ()))
+            )[:len(query_grams) - needed + 1]
+            hits = Counter()
+            for gram in rarest:
+                hits.update(self.postings.get(gram, ()))
+            # short or common queries match a large share of the table,
+            # only score the documents sharing the most rare trigrams
+            candidates = (
+                [pk for pk, _ in hits.most_common(max_candidates)]
+                if len(hits) > max_candidates else hits
+            )
+            shared = {
+                pk: len(self.documents[pk] & query_grams)
+                for pk in candidates
+            }
+
+        scores = [
+            (pk, count / len(query_grams))
+            for pk, count in shared.items()
+            if count >= needed
+        ]
+        scores.sort(key=lambda item: (-item[1], item[0]))
+        return scores[:limit]
+
+
+ngram_indexes = {
+    model._meta.db_table: NgramIndex(model) for model in (Task, Worker)
+}
+_ngram_refresher = None
+_ngram_refresher_lock = threading.Lock()
+
+
+def _refresh_ngram_indexes(max_age):
+    while True:
+        for index in ngram_indexes.values():
+            try:
+                index.build()
+            except Exception:
+                logger.exception("Building %s failed", index.model.__name__)
+            finally:
+                connections.close_all()
+        if max_age is None:
+            return
+        time.sleep(max_age)
+
+
+def start_ngram_indexes():
+    """Build the trigram indexes in a background thread, once per process,
+    when the SQLite backend serves fuzzy searches. Called by the WSGI and
+    ASGI entry points."""
+    global _ngram_refresher
+    if not isinstance(get_search_backend(), SQLiteSearchBackend):
+        return
+    with _ngram_refresher_lock:
+        if _ngram_refresher is not None:
+            return
+        _ngram_refresher = threading.Thread(
+            target=_refresh_ngram_indexes,
+            args=(getattr(settings, "NGRAM_INDEX_MAX_AGE", 600),),
+            name="ngram-index",
+            daemon=True,
+        )
+    _ngram_refresher.start()
+
+
+class SearchBackend:
+    """Substring search, used where no full-text index is available."""
+
+    def search_tasks(self, queryset, query):
+        return queryset.filter(name__icontains=query)
+
+    def search_workers(self, queryset, query):
+        return queryset.filter(username__icontains=query)
+
+    def fuzzy_search_tasks(self, queryset, query):
+        return self.search_tasks(queryset, query)
+
+    def fuzzy_search_workers(self, queryset, query):
+        return self.search_workers(queryset, query)
+
+
+class SQLiteSearchBackend(SearchBackend):
+    """
+    FTS5 external content tables (<table>_fts) kept in sync with the
+    model tables by triggers, see install_sqlite_search().
+    Every search term matches as a prefix, results are ranked by bm25
+    with the name/username column weighted highest.
+    """
+    weights = {
+        "tasks_task": (10.0, 1.0),
+        "tasks_worker": (10.0, 2.0, 2.0),
+    }
+
+    def match_expression(self, query):
+        return " ".join(f'"{token}"*' for token in tokenize(query))
+
+    def search(self, queryset, query):
+        table = queryset.model._meta.db_table
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+
+        weights = ", ".join(str(weight) for weight in self.weights[table])
+        # join the fts table so MATCH and bm25() run once for the whole
+        # result set, a correlated rank subquery would re-run MATCH per row
+        return queryset.extra(
+            tables=[f"{table}_fts"],
+            where=[
+                f"{table}_fts MATCH %s",
+                f"{table}_fts.rowid = {table}.id",
+            ],
+            params=[match],
+            # bm25() is lower for better matches
+            select={"search_rank": f"-bm25({table}_fts, {weights})"},
+        ).order_by("-search_rank", "pk")
+
+    def search_tasks(self, queryset, query):
+        return self.search(queryset, query)
+
+    def search_workers(self, queryset, query):
+        return self.search(queryset, query)
+
+    def fuzzy_search(self, queryset, query):
+        index = ngram_indexes[queryset.model._meta.db_table]
+        if not index.is_built:
+            # still building in the background, prefix matches meanwhile
+            return self.search(queryset, query)
+
+        scores = index.search(query)
+        if not scores:
+            return queryset.none()
+
+        return queryset.filter(pk__in=[pk for pk, _ in scores]).annotate(
+            search_rank=Case(
+                *[When(pk=pk, then=Value(score)) for pk, score in scores],
+                output_field=FloatField(),
+            )
+        ).order_by("-search_rank", "pk")
+
+    def fuzzy_search_tasks(self, queryset, query):
+        return self.fuzzy_search(queryset, query)
+
+    def fuzzy_search_workers(self, queryset, query):
+        return self.fuzzy_search(queryset, query)
+
+
+class PostgresSearchBackend(SearchBackend):
+    """
+    Stored, GIN indexed `search_vector` tsvector columns generated from
+    the weighted search columns, see install_postgres_search().
+    """
+    config = "english"
+
+    def search(self, queryset, query):
+        from django.contrib.postgres.search import (
+            SearchQuery,
+            SearchRank,
+            SearchVectorField,
+        )
+
+        tokens = tokenize(query)
+        if not tokens:
+            return queryset.none()
+
+        table = queryset.model._meta.db_table
+        vector = RawSQL(
+            f'"{table}"."search_vector"', [],
+            output_field=SearchVectorField()
+        )
+        search_query = SearchQuery(
+            " & ".join(f"{token}:*" for token in tokens),
+            config=self.config,
+            search_type="raw",
+        )
+        return queryset.alias(search_vector=vector).annotate(
+            search_rank=SearchRank(vector, search_query),
+        ).filter(search_vector=search_query).order_by("-search_rank", "pk")
+
+    def search_tasks(self, queryset, query):
+        return self.search(queryset, query)
+
+    def search_workers(self, queryset, query):
+        return self.search(queryset, query)
+
+    def fuzzy_search(self, queryset, query):
+        """pg_trgm word similarity, the `%>` operator is served by the
+        gin_trgm_ops indexes, see install_postgres_trigram(). The
+        trigram_word_similar lookup is registered by TasksConfig.ready()."""
+        from django.contrib.postgres.search import TrigramWordSimilarity
+        from django.db.models.functions import Greatest
+
+        fields = FUZZY_COLUMNS[queryset.model._meta.db_table]
+        similar = Q()
+        for field in fields:
+            similar |= Q(**{f"{field}__trigram_word_similar": query})
+        similarities = [
+            TrigramWordSimilarity(query, field) for field in fields
+        ]
+        rank = (
+            Greatest(*similarities) if len(similarities) > 1
+            else similarities[0]
+        )
+        return queryset.filter(similar).annotate(
+            search_rank=rank
+        ).order_by("-search_rank", "pk")
+
+    def fuzzy_search_tasks(self, queryset, query):
+        return self.fuzzy_search(queryset, query)
+
+    def fuzzy_search_workers(self, queryset, query):
+        return self.fuzzy_search(queryset, query)
+
+
+BACKENDS = {
+    "sqlite": SQLiteSearchBackend,
+    "postgresql": PostgresSearchBackend,
+}
+
+
+def get_search_backend():
+    """settings.SEARCH_BACKEND if set, otherwise the full-text backend
+    for the default database."""
+    backend_path = getattr(settings, "SEARCH_BACKEND", None)
+    if backend_path:
+        return import_string(backend_path)()
+    return BACKENDS.get(connection.vendor, SearchBackend)()
+
+
+def _sqlite_statements(table, columns):
+    fts = f"{table}_fts"
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    insert = f"INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});"
+    delete = (
+        f"INSERT INTO {fts}({fts}, rowid, {names}) "
+        f"VALUES ('delete', old.id, {old});"
+    )
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+        f"{names}, content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2')",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {table} "
+        f"BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {table} "
+        f"BEGIN {delete} END",
+        # only when a searched column changes, not on logins or touches
+        f"CREATE TRIGGER IF NOT EXISTS {fts}_au "
+        f"AFTER UPDATE OF {names} ON {table} BEGIN {delete} {insert} END",
+    ]
+
+
+def install_sqlite_search(cursor):
+    for table, columns in SEARCH_COLUMNS.items():
+        for statement in _sqlite_statements(table, columns):
+            cursor.execute(statement)
+        cursor.execute(
+            f"INSERT INTO {table}_fts({table}_fts) VALUES ('rebuild')"
+        )
+
+
+def uninstall_sqlite_search(cursor):
+    for table in SEARCH_COLUMNS:
+        cursor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+
+
+def install_postgres_search(cursor):
+    for table, columns in SEARCH_COLUMNS.items():
+        weighted = " || ".join(
+            f"setweight(to_tsvector('{PostgresSearchBackend.config}', "
+            f"coalesce({column}, '')), '{'ABCD'[min(position, 3)]}')"
+            for position, column in enumerate(columns)
+        )
+        cursor.execute(
+            f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS search_vector "
+            f"tsvector GENERATED ALWAYS AS ({weighted}) STORED"
+        )
+        cursor.execute(
+            f"CREATE INDEX IF NOT EXISTS {table}_search_vector_idx "
+            f"ON {table} USING gin (search_vector)"
+        )
+
+
+def uninstall_postgres_search(cursor):
+    for table in SEARCH_COLUMNS:
+        cursor.execute(f"DROP INDEX IF EXISTS {table}_search_vector_idx")
+        cursor.execute(
+            f"ALTER TABLE {table} DROP COLUMN IF EXISTS search_vector"
+        )
+
+
+def install_postgres_trigram(cursor):
+    cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table, columns in FUZZY_COLUMNS.items():
+        for column in columns:
+            cursor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_{column}_trgm_idx "
+                f"ON {table} USING gin ({column} gin_trgm_ops)"
+            )
+
+
+def uninstall_postgres_trigram(cursor):
+    for table, columns in FUZZY_COLUMNS.items():
+        for column in columns:
+            cursor.execute(f"DROP INDEX IF EXISTS {table}_{column}_trgm_idx")
+
+
+def install_trigram_indexes(db_connection):
+    if db_connection.vendor == "postgresql":
+        with db_connection.cursor() as cursor:
+            install_postgres_trigram(cursor)
+
+
+def uninstall_trigram_indexes(db_connection):
+    if db_connection.vendor == "postgresql":
+        with db_connection.cursor() as cursor:
+            uninstall_postgres_trigram(cursor)
+
+
+INSTALLERS = {
+    "sqlite": (install_sqlite_search, uninstall_sqlite_search),
+    "postgresql": (install_postgres_search, uninstall_postgres_search),
+}
+
+
+def install_search_schema(db_connection):
+    install, _ = INSTALLERS.get(db_connection.vendor, (None, None))
+    if install:
+        with db_connection.cursor() as cursor:
+            install(cursor)
+
+
+def uninstall_search_schema(db_connection):
+    _, uninstall = INSTALLERS.get(db_connection.vendor, (None, None))
+    if uninstall:
+        with db_connection.cursor() as cursor:
+            uninstall(cursor)
+
+
+def ensure_sqlite_search_triggers(sender, using, **kwargs):
+    """
+    post_migrate handler: SQLite migrations that alter tasks_task or
+    tasks_worker rebuild the table and drop its triggers, put them back
+    and reindex when that happened.
+    """
+    search_connection = connections[using]
+    if search_connection.vendor != "sqlite":
+        return
+
+    with search_connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')"
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if not {f"{table}_fts" for table in SEARCH_COLUMNS} <= existing:
+            # the search migration has not run yet
+            return
+        triggers = {
+            f"{table}_fts_{suffix}"
+            for table in SEARCH_COLUMNS
+            for suffix in ("ai", "ad", "au")
+        }
+        if not triggers <= existing:
+            install_sqlite_search(cursor)
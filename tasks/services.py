@@ -0,0 +1,67 @@
+from dataclasses import asdict, dataclass
+
+from django.db.models import (
+    Count,
+    F,
+    Func,
+    IntegerField,
+    Q,
+    Subquery,
+)
+
+from tasks.counters import URGENT_PRIORITIES
+from tasks.models import Task, TaskCounters, Worker
+
+
+def _workers_count():
+    return Subquery(
+        Worker.objects.order_by().values(count=Func("pk", function="COUNT")),
+        output_field=IntegerField(),
+    )
+
+
+@dataclass(frozen=True)
+class DashboardStats:
+    """Counters shown on the dashboard cards."""
+    num_workers: int
+    num_tasks: int
+    num_tasks_is_solved: int
+    urgent_and_high: int
+
+    @classmethod
+    def collect(cls) -> "DashboardStats":
+        """Read the counters from the global TaskCounters row in O(1),
+        falling back to aggregating the tasks table when it is missing."""
+        stats = TaskCounters.objects.filter(
+            scope=TaskCounters.Scope.GLOBAL, object_id=0
+        ).values(
+            num_tasks=F("total"),
+            num_tasks_is_solved=F("completed"),
+            urgent_and_high=F("open_urgent_high"),
+            num_workers=_workers_count(),
+        ).first()
+        if stats is None:
+            return cls.aggregate()
+
+        return cls(**stats)
+
+    @classmethod
+    def aggregate(cls) -> "DashboardStats":
+        """Compute the task counters with a single query over the tasks
+        table."""
+        stats = Task.objects.aggregate(
+            num_tasks=Count("pk"),
+            num_tasks_is_solved=Count("pk", filter=Q(is_completed=True)),
+            urgent_and_high=Count(
+                "pk",
+                filter=Q(is_completed=False, priority__in=URGENT_PRIORITIES),
+            ),
+        )
+        # a second plain COUNT is cheaper to read than folding the workers
+        # into an aggregate over tasks, and this fallback is rarely taken
+        stats["num_workers"] = Worker.objects.count()
+
+        return cls(**stats)
+
+    def as_dict(self) -> dict:
+        return asdict(self)
@@ -0,0 +1,350 @@
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from tasks import (
+    bulk,
+    counters,
+    deadlines,
+    events,
+    notifications,
+    versions,
+    workload,
+)
+from tasks.search import ngram_indexes
+from tasks.models import Task, TaskCounters, TaskType, Worker
+
+Scope = TaskCounters.Scope
+
+
+@receiver(pre_save, sender=Task)
+def remember_previous_task(sender, instance, raw, **kwargs):
+    instance._counters_previous = None
+    if instance.pk and not raw:
+        instance._counters_previous = sender._base_manager.filter(
+            pk=instance.pk
+        ).values(
+            "task_type_id", "is_completed", "priority", "deadline"
+        ).first()
+
+
+@receiver(post_save, sender=Task)
+def update_counters_on_save(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+
+    new = counters.task_contribution(instance)
+    previous = getattr(instance, "_counters_previous", None)
+    old = counters.NO_TASKS
+    if previous is not None:
+        old = counters.contribution(
+            previous["is_completed"], previous["priority"]
+        )
+
+    delta = counters.subtract(new, old)
+    counters.apply_delta(Scope.GLOBAL, 0, delta)
+
+    if previous is not None and (
+        previous["task_type_id"] != instance.task_type_id
+    ):
+        counters.apply_delta(
+            Scope.TASK_TYPE, previous["task_type_id"], counters.negate(old)
+        )
+        counters.apply_delta(Scope.TASK_TYPE, instance.task_type_id, new)
+    else:
+        counters.apply_delta(Scope.TASK_TYPE, instance.task_type_id, delta)
+
+    if not created and any(delta):
+        counters.apply_worker_deltas(
+            instance.assignees.values_list("pk", flat=True), delta
+        )
+
+
+@receiver(pre_delete, sender=Task)
+def remember_deleted_task_assignees(sender, instance, **kwargs):
+    if bulk.in_bulk_operation():
+        return
+    # the through rows are gone by post_delete
+    instance._deleted_assignee_ids = list(
+        instance.assignees.values_list("pk", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Task)
+def update_counters_on_delete(sender, instance, **kwargs):
+    if bulk.in_bulk_operation():
+        return
+    removed = counters.negate(counters.task_contribution(instance))
+    counters.apply_delta(Scope.GLOBAL, 0, removed)
+    counters.apply_delta(Scope.TASK_TYPE, instance.task_type_id, removed)
+    counters.apply_worker_deltas(
+        getattr(instance, "_deleted_assignee_ids", []), removed
+    )
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def remember_cleared_assignments(sender, instance, action, reverse, **kwargs):
+    # post_clear is sent without pk_set, keep what is about to go
+    if action == "pre_clear":
+        related = instance.task_set if reverse else instance.assignees
+        instance._cleared_pks = set(related.values_list("pk", flat=True))
+
+
+def changed_pks(instance, action, pk_set):
+    """Primary keys on the other side of an assignees m2m_changed."""
+    if action == "post_clear":
+        return getattr(instance, "_cleared_pks", set())
+    if action in ("post_add", "post_remove"):
+        return pk_set or set()
+    return set()
+
+
+def affected_worker_ids(instance, action, reverse, pk_set):
+    pks = changed_pks(instance, action, pk_set)
+    if reverse:
+        return {instance.pk} if pks else set()
+    return pks
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def update_counters_on_assignment(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    pk_set = changed_pks(instance, action, pk_set)
+    if not pk_set:
+        return
+
+    sign = 1 if action == "post_add" else -1
+
+    if not reverse:
+        delta = counters.task_contribution(instance)
+        counters.apply_worker_deltas(
+            pk_set, delta if sign > 0 else counters.negate(delta)
+        )
+        return
+
+    totals = Task.objects.filter(pk__in=pk_set).aggregate(
+        **counters.counter_aggregates()
+    )
+    delta = tuple(sign * totals[name] for name in counters.COUNTER_FIELDS)
+    counters.apply_delta(Scope.WORKER, instance.pk, delta)
+
+
+@receiver(post_delete, sender=Worker)
+def drop_worker_counters(sender, instance, **kwargs):
+    TaskCounters.objects.filter(
+        scope=Scope.WORKER, object_id=instance.pk
+    ).delete()
+
+
+@receiver(bulk.tasks_bulk_changed)
+def refresh_counters_on_bulk_change(
+    sender, task_type_ids, worker_ids, **kwargs
+):
+    counters.refresh_task_counters(task_type_ids, worker_ids)
+
+
+@receiver(post_save, sender=Task)
+def invalidate_notifications_on_save(sender, instance, created, **kwargs):
+    if not created:
+        notifications.invalidate(
+            instance.assignees.values_list("pk", flat=True)
+        )
+
+
+@receiver(post_delete, sender=Task)
+def invalidate_notifications_on_delete(sender, instance, **kwargs):
+    if bulk.in_bulk_operation():
+        return
+    notifications.invalidate(getattr(instance, "_deleted_assignee_ids", []))
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def invalidate_notifications_on_assignment(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    notifications.invalidate(
+        affected_worker_ids(instance, action, reverse, pk_set)
+    )
+
+
+@receiver(bulk.tasks_bulk_changed)
+def invalidate_notifications_on_bulk_change(sender, worker_ids, **kwargs):
+    notifications.invalidate(worker_ids)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_save, sender=Worker)
+def update_ngram_index(sender, instance, raw, **kwargs):
+    ngram_indexes[sender._meta.db_table].update(instance)
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Worker)
+def remove_from_ngram_index(sender, instance, **kwargs):
+    ngram_indexes[sender._meta.db_table].remove(instance.pk)
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def update_workload_on_assignment(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    pk_set = changed_pks(instance, action, pk_set)
+    if not pk_set:
+        return
+
+    sign = 1 if action == "post_add" else -1
+    task_ids, worker_ids = (pk_set, [instance.pk]) if reverse else (
+        [instance.pk], pk_set
+    )
+    # lazy, only runs when a matrix is cached
+    tasks = Task.objects.filter(pk__in=task_ids).values(
+        "task_type_id", "is_completed", "priority", "deadline"
+    )
+    workload.apply_assignments(tasks, worker_ids, sign)
+
+
+@receiver(post_save, sender=Task)
+def update_workload_on_save(sender, instance, created, raw, **kwargs):
+    # a new task has no assignees yet
+    if created:
+        return
+    previous = getattr(instance, "_counters_previous", None)
+    if raw or previous is None:
+        workload.invalidate()
+    else:
+        workload.apply_task_change(previous, instance)
+
+
+@receiver(post_delete, sender=Task)
+@receiver(post_delete, sender=Worker)
+def invalidate_workload_on_delete(sender, instance, **kwargs):
+    if not bulk.in_bulk_operation():
+        workload.invalidate()
+
+
+@receiver(post_save, sender=Task)
+def update_deadline_buckets_on_save(sender, instance, raw, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, "_counters_previous", None)
+    deadlines.task_changed(
+        previous and (previous["is_completed"], previous["deadline"]),
+        instance,
+    )
+
+
+@receiver(post_delete, sender=Task)
+def update_deadline_buckets_on_delete(sender, instance, **kwargs):
+    if not bulk.in_bulk_operation() and not instance.is_completed:
+        deadlines.add(instance.deadline, -1)
+
+
+@receiver(bulk.tasks_bulk_changed)
+def rebuild_deadline_buckets_on_bulk_change(sender, action, **kwargs):
+    if action != "reassign":
+        deadlines.rebuild_deadline_buckets()
+
+
+@receiver(post_save, sender=Task)
+def publish_task_saved(sender, instance, created, raw, **kwargs):
+    if raw:
+        return
+    if created:
+        # no assignees yet
+        events.publish("task.created", events.task_data(instance))
+        return
+
+    previous = getattr(instance, "_counters_previous", None)
+    completed = (
+        instance.is_completed
+        and previous is not None
+        and not previous["is_completed"]
+    )
+    events.publish(
+        "task.completed" if completed else "task.updated",
+        events.task_data(instance),
+        instance.assignees.values_list("pk", flat=True),
+    )
+
+
+@receiver(post_delete, sender=Task)
+def publish_task_deleted(sender, instance, **kwargs):
+    if not bulk.in_bulk_operation():
+        events.publish(
+            "task.deleted",
+            events.task_data(instance),
+            getattr(instance, "_deleted_assignee_ids", []),
+        )
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def publish_assignment(sender, instance, action, reverse, pk_set, **kwargs):
+    pk_set = changed_pks(instance, action, pk_set)
+    if not pk_set:
+        return
+
+    event = "task.assigned" if action == "post_add" else "task.unassigned"
+    if not reverse:
+        events.publish(event, events.task_data(instance), pk_set)
+        return
+    for task in Task.objects.filter(pk__in=pk_set).only(*events.TASK_FIELDS):
+        events.publish(event, events.task_data(task), [instance.pk])
+
+
+@receiver(bulk.tasks_bulk_changed)
+def publish_bulk_change(sender, action, task_ids, worker_ids, **kwargs):
+    events.publish(
+        "task.bulk", {"action": action, "ids": sorted(task_ids)}, worker_ids
+    )
+
+
+@receiver(m2m_changed, sender=Task.assignees.through)
+def touch_tasks_on_assignment(
+    sender, instance, action, reverse, pk_set, **kwargs
+):
+    pk_set = changed_pks(instance, action, pk_set)
+    if not pk_set:
+        return
+    # the assignees are part of what a task page shows
+    now = timezone.now()
+    Task.objects.filter(pk__in=pk_set if reverse else [instance.pk]).update(
+        updated_at=now
+    )
+    if not reverse:
+        instance.updated_at = now
+    versions.bump(versions.TASKS)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def bump_tasks_version(sender, **kwargs):
+    if not bulk.in_bulk_operation():
+        versions.bump(versions.TASKS)
+
+
+@receiver(bulk.tasks_bulk_changed)
+def bump_tasks_version_on_bulk_change(sender, **kwargs):
+    # drops the cached workload matrix too, see workload.invalidate()
+    versions.bump(versions.TASKS, versions.WORKLOAD)
+
+
+@receiver(post_save, sender=Worker)
+@receiver(post_delete, sender=Worker)
+def bump_workers_version(sender, update_fields=None, **kwargs):
+    # logging in only saves last_login, which no page shows
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    versions.bump(versions.WORKERS)
+
+
+@receiver(post_save, sender=TaskType)
+@receiver(post_delete, sender=TaskType)
+def bump_task_types_version(sender, **kwargs):
+    versions.bump(versions.TASK_TYPES)
@@ -0,0 +1,72 @@
+from dataclasses import dataclass
+
+from django.core import checks
+
+from tasks.models import Task
+
+
+@dataclass(frozen=True)
+class SortOption:
+    label: str
+    ordering: tuple
+
+
+def reverse_ordering(ordering):
+    return tuple(
+        name[1:] if name.startswith("-") else f"-{name}" for name in ordering
+    )
+
+
+def _sort_pair(key, label, reversed_label, ordering):
+    """An ordering and its reverse are served by the same index, scanned
+    forwards or backwards."""
+    return {
+        key: SortOption(label, ordering),
+        f"-{key}": SortOption(reversed_label, reverse_ordering(ordering)),
+    }
+
+
+# sort_by values accepted by TaskListView, each ordering must match a
+# Task.Meta index (see check_sort_indexes) and end with a unique column
+TASK_SORTS = {
+    **_sort_pair(
+        "deadline", "Deadline: soonest first", "Deadline: latest first",
+        ("deadline", "-priority_rank", "id"),
+    ),
+    **_sort_pair(
+        "priority", "Priority: most urgent first", "Priority: lowest first",
+        ("-priority_rank", "deadline", "id"),
+    ),
+    **_sort_pair(
+        "name", "Name: A to Z", "Name: Z to A",
+        ("name", "id"),
+    ),
+}
+
+
+def get_task_sort(sort_by):
+    """The SortOption for a sort_by value, None for unknown keys."""
+    return TASK_SORTS.get(sort_by or "")
+
+
+def _index_orderings(model):
+    for index in model._meta.indexes:
+        if index.condition is None and index.fields:
+            ordering = tuple(index.fields)
+            yield ordering
+            yield reverse_ordering(ordering)
+
+
+@checks.register(checks.Tags.models)
+def check_sort_indexes(app_configs, **kwargs):
+    orderings = set(_index_orderings(Task))
+    return [
+        checks.Error(
+            f"Task sort {key!r} orders by {option.ordering}, "
+            f"which no index on Task covers.",
+            obj="tasks.sorting.TASK_SORTS",
+            id="tasks.E001",
+        )
+        for key, option in TASK_SORTS.items()
+        if option.ordering not in orderings
+    ]
@@ -0,0 +1,114 @@
+import asyncio
+from importlib import import_module
+from urllib.parse import parse_qs
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import auth
+from django.db import close_old_connections
+from django.http import HttpRequest
+from django.http.cookie import parse_cookie
+
+from tasks import events
+
+EVENTS_PATH = "/events/tasks/"
+
+
+@sync_to_async
+def get_user(scope):
+    """The session user of an ASGI scope, like AuthenticationMiddleware."""
+    close_old_connections()
+    try:
+        headers = dict(scope.get("headers", ()))
+        request = HttpRequest()
+        request.COOKIES = parse_cookie(headers.get(b"cookie", b"").decode())
+        engine = import_module(settings.SESSION_ENGINE)
+        request.session = engine.SessionStore(
+            request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+        )
+        return auth.get_user(request)
+    finally:
+        close_old_connections()
+
+
+def get_channels(scope, user):
+    """?channel=team streams every task event, by default only events
+    of the user's own tasks are sent."""
+    query = parse_qs(scope.get("query_string", b"").decode())
+    if query.get("channel") == ["team"]:
+        return [events.TEAM_CHANNEL]
+    return [events.worker_channel(user.pk)]
+
+
+async def send_text(send, text, more_body=True):
+    await send({
+        "type": "http.response.body",
+        "body": text.encode(),
+        "more_body": more_body,
+    })
+
+
+async def stream(subscription, send):
+    await send({
+        "type": "http.response.start",
+        "status": 200,
+        "headers": [
+            (b"content-type", b"text/event-stream"),
+            (b"cache-control", b"no-cache"),
+            # keep proxies like nginx from buffering the stream
+            (b"x-accel-buffering", b"no"),
+        ],
+    })
+    await send_text(send, f"retry: {settings.EVENTS_RETRY_MS}\n\n")
+
+    while True:
+        frame = await subscription.get(settings.EVENTS_HEARTBEAT)
+        if frame is events.OVERFLOW:
+            # the client reloads what it shows and reconnects
+            await send_text(send, events.format_event("reset", {}), False)
+            return
+        # comments keep idle connections open and detect gone clients
+        await send_text(send, frame if frame else ": heartbeat\n\n")
+
+
+async def wait_for_disconnect(receive):
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+async def application(scope, receive, send):
+    """ASGI app streaming task events as server-sent events."""
+    user = await get_user(scope)
+    if not user.is_authenticated:
+        await send({
+            "type": "http.response.start",
+            "status": 401,
+            "headers": [(b"content-type", b"text/plain")],
+        })
+        await send_text(send, "Authentication required.", False)
+        return
+
+    subscription = events.get_broker().subscribe(get_channels(scope, user))
+    streaming = asyncio.ensure_future(stream(subscription, send))
+    disconnected = asyncio.ensure_future(wait_for_disconnect(receive))
+    try:
+        await asyncio.wait(
+            [streaming, disconnected], return_when=asyncio.FIRST_COMPLETED
+        )
+    finally:
+        streaming.cancel()
+        disconnected.cancel()
+        subscription.close()
+
+
+def route(django_application):
+    """ASGI app sending EVENTS_PATH to the stream and everything else to
+    Django."""
+
+    async def router(scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == EVENTS_PATH:
+            await application(scope, receive, send)
+        else:
+            await django_application(scope, receive, send)
+
+    return router
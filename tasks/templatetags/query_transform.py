@@ -1,3 +1,5 @@
+from urllib.parse import urlencode
+
 from django import template
 
 register = template.Library()
@@ -6,6 +8,11 @@ register = template.Library()
 @register.simple_tag
 def query_transform(request, **kwargs):
     updated = request.GET.copy()
+    # offset and cursor pagination are mutually exclusive
+    if "cursor" in kwargs:
+        updated.pop("page", 0)
+    if "page" in kwargs:
+        updated.pop("cursor", 0)
     for key, value in kwargs.items():
         if value is not None:
             updated[key] = value
@@ -13,3 +20,25 @@ def query_transform(request, **kwargs):
             updated.pop(key, 0)
 
     return updated.urlencode()
+
+
+# parameters that change the page even when empty, "?cursor=" is the
+# first page in cursor pagination mode
+PRESENCE_PARAMETERS = {"cursor"}
+
+
+def normalized_query(query):
+    """
+    `query` (a QueryDict) in a canonical form: parameters sorted, empty
+    values dropped unless in PRESENCE_PARAMETERS. URLs that only differ
+    in parameter order or in empty fields (as submitted by the search
+    form) map to the same string.
+    """
+    return urlencode(
+        sorted(
+            (key, value)
+            for key, values in query.lists()
+            for value in values
+            if value or key in PRESENCE_PARAMETERS
+        )
+    )
@@ -1,3 +1,2163 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import re
+import tempfile
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from asgiref.testing import ApplicationCommunicator
+from django import forms
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.http import HttpResponse, QueryDict
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+
+from tasks.benchmarking import run_benchmarks, seed
+from tasks.bulk import run_bulk_action
+from tasks.forms import (
+    AssigneesForm,
+    WorkerMultipleChoiceField,
+    WorkerPositionUpdateForm,
+)
+from tasks import deadlines, events, sse, versions, workload
+from tasks.metrics import registry
+from tasks.models import (
+    DeadlineBucket,
+    Position,
+    Task,
+    TaskCounters,
+    TaskType,
+    Worker,
+)
+from tasks.pagination import CursorPaginator
+from tasks.replicas import STICKY_COOKIE, ReplicaMiddleware, ReplicaRouter
+from tasks.nplusone import (
+    Detector,
+    NPlusOneDetected,
+    NPlusOneTestMixin,
+    fingerprint,
+)
+from tasks.notifications import (
+    get_notification_tasks,
+    seconds_until_midnight,
+)
+from tasks.search import get_search_backend, ngram_indexes
+from tasks.services import DashboardStats
+from tasks.sorting import check_sort_indexes, get_task_sort
+from tasks.templatetags.query_transform import normalized_query
+from tasks.workload import WorkloadMatrix, get_workload
+
+
+class CursorPaginationTests(NPlusOneTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        task_type = TaskType.objects.create(name="Bug")
+        # several tasks share a deadline so the keyset needs every column
+        for number in range(20):
+            Task.objects.create(
+                name=f"task {number}",
+                description="description",
+                deadline=date(2030, 1, 1) + timedelta(days=number // 3),
+                priority=["Urgent", "High", "Medium", "Low"][number % 4],
+                task_type=task_type,
+            )
+
+    def setUp(self):
+        # rendered pages are cached by collection version
+        cache.clear()
+        self.client.force_login(self.worker)
+
+    def test_walks_forward_and_back_over_whole_ordering(self):
+        ordering = ("deadline", "priority", "id")
+        expected = list(Task.objects.order_by(*ordering))
+        paginator = CursorPaginator(Task.objects.all(), 6, ordering)
+
+        seen, pages = [], []
+        page = paginator.page()
+        while True:
+            pages.append(page)
+            seen.extend(page.object_list)
+            if not page.has_next():
+                break
+            page = paginator.page(page.next_cursor)
+
+        self.assertEqual(seen, expected)
+        self.assertFalse(pages[0].has_previous())
+
+        previous = paginator.page(pages[-1].previous_cursor)
+        self.assertEqual(previous.object_list, pages[-2].object_list)
+
+    def test_descending_ordering(self):
+        ordering = ("-deadline", "id")
+        paginator = CursorPaginator(Task.objects.all(), 7, ordering)
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+
+        expected = list(Task.objects.order_by(*ordering))
+        self.assertEqual(first.object_list + second.object_list, expected[:14])
+
+    def test_task_list_cursor_mode_skips_count(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("tasks:tasks-list") + "?cursor=")
+
+        self.assertFalse(
+            [query for query in queries if "COUNT(" in query["sql"]]
+        )
+
+        page = response.context["page_obj"]
+        self.assertTrue(page.is_cursor)
+        self.assertEqual(len(page.object_list), 8)
+        self.assertContains(response, "cursor=" + page.next_cursor)
+
+    def test_invalid_cursor_is_404(self):
+        response = self.client.get(
+            reverse("tasks:tasks-list") + "?cursor=not-a-cursor"
+        )
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskIndexUsageTests(NPlusOneTestMixin, TestCase):
+    """EXPLAIN the SQL the hot views run and check the planner picks the
+    indexes added in 0008_task_filter_indexes."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        task_type = TaskType.objects.create(name="Bug")
+        for number in range(10):
+            task = Task.objects.create(
+                name=f"task {number}",
+                description="description",
+                deadline=date.today() + timedelta(days=number),
+                priority=["Urgent", "High", "Medium", "Low"][number % 4],
+                is_completed=number % 2 == 0,
+                task_type=task_type,
+            )
+            task.assignees.add(cls.worker)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.worker)
+
+    def query_plans(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+
+        plans = []
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                # tiny test tables are always cheaper to scan sequentially
+                cursor.execute("SET enable_seqscan = off")
+            for query in queries:
+                if not query["sql"].startswith("SELECT"):
+                    continue
+                cursor.execute(
+                    f"{connection.ops.explain_query_prefix()} {query['sql']}"
+                )
+                plans.append(" ".join(str(row) for row in cursor.fetchall()))
+        return plans
+
+    def assertUsesIndex(self, url, index_name):
+        plans = self.query_plans(url)
+        self.assertTrue(
+            any(index_name in plan for plan in plans),
+            f"{url} does not use {index_name}:\n" + "\n".join(plans)
+        )
+
+    def test_index_counters_fallback(self):
+        # without stored counters the dashboard aggregates the tasks table
+        TaskCounters.objects.all().delete()
+        self.assertUsesIndex(reverse("tasks:index"), "task_status_priority_idx")
+
+    def test_urgent_high_list(self):
+        self.assertUsesIndex(
+            reverse("tasks:high-priority-tasks-list"), "task_open_priority_idx"
+        )
+
+    def test_completed_list(self):
+        self.assertUsesIndex(
+            reverse("tasks:tasks-completed-list"), "task_done_deadline_idx"
+        )
+
+    def test_notifications(self):
+        self.assertUsesIndex(
+            reverse("tasks:notifications"),
+            "tasks_task_assignees_worker_task_idx"
+        )
+
+    def test_cursor_page_seeks_into_sort_index(self):
+        paginator = CursorPaginator(
+            Task.objects.all(), 3, get_task_sort("deadline").ordering
+        )
+        cursor = paginator.page().next_cursor
+        plans = self.query_plans(
+            reverse("tasks:tasks-list") + f"?cursor={cursor}"
+        )
+
+        [plan] = [plan for plan in plans if "task_deadline_sort_idx" in plan]
+        if connection.vendor == "sqlite":
+            # a seek on the leading column, not a scan of the whole index
+            self.assertIn(
+                "SEARCH tasks_task USING INDEX task_deadline_sort_idx", plan
+            )
+            self.assertNotIn("MULTI-INDEX OR", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+
+
+class DashboardStatsTests(NPlusOneTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        Worker.objects.create_user(username="second")
+        task_type = TaskType.objects.create(name="Bug")
+        for priority, is_completed in [
+            ("Urgent", False), ("High", False), ("High", True), ("Low", False)
+        ]:
+            Task.objects.create(
+                name="task",
+                description="description",
+                deadline=date.today(),
+                priority=priority,
+                is_completed=is_completed,
+                task_type=task_type,
+            )
+
+    def test_single_query(self):
+        with self.assertNumQueries(1):
+            stats = DashboardStats.collect()
+
+        self.assertEqual(
+            stats,
+            DashboardStats(
+                num_workers=2,
+                num_tasks=4,
+                num_tasks_is_solved=1,
+                urgent_and_high=2,
+            )
+        )
+
+    def test_without_tasks(self):
+        Task.objects.all().delete()
+        self.assertEqual(DashboardStats.collect().num_workers, 2)
+
+    def test_aggregate_matches_counters(self):
+        with self.assertNumQueries(2):
+            stats = DashboardStats.aggregate()
+        self.assertEqual(stats, DashboardStats.collect())
+
+        Task.objects.all().delete()
+        self.assertEqual(
+            DashboardStats.aggregate(), DashboardStats(2, 0, 0, 0)
+        )
+
+    def test_json_endpoint(self):
+        self.client.force_login(self.worker)
+        response = self.client.get(reverse("tasks:dashboard-stats"))
+        self.assertEqual(
+            response.json(), DashboardStats.collect().as_dict()
+        )
+
+
+class TaskCountersTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        self.bug = TaskType.objects.create(name="Bug")
+        self.feature = TaskType.objects.create(name="Feature")
+        self.alice = Worker.objects.create_user(username="alice")
+        self.bob = Worker.objects.create_user(username="bob")
+
+    def create_task(self, **kwargs):
+        return Task.objects.create(**{
+            "name": "task",
+            "description": "description",
+            "deadline": date.today(),
+            "priority": "Urgent",
+            "task_type": self.bug,
+            **kwargs
+        })
+
+    def snapshot(self):
+        return {
+            (row.scope, row.object_id): (
+                row.total, row.completed, row.open_urgent_high
+            )
+            for row in TaskCounters.objects.all()
+            if row.total or row.completed or row.open_urgent_high
+        }
+
+    def assertMatchesRebuild(self):
+        maintained = self.snapshot()
+        call_command("rebuild_task_counters", stdout=open("/dev/null", "w"))
+        self.assertEqual(maintained, self.snapshot())
+
+    def test_signals_keep_counters_current(self):
+        first = self.create_task()
+        second = self.create_task(priority="Low", task_type=self.feature)
+        first.assignees.add(self.alice, self.bob)
+        self.bob.task_set.add(second)
+
+        self.assertEqual(
+            self.snapshot()[(TaskCounters.Scope.WORKER, self.bob.pk)],
+            (2, 0, 1)
+        )
+
+        first.is_completed = True
+        first.save()
+        second.task_type = self.bug
+        second.priority = "High"
+        second.save()
+        self.assertMatchesRebuild()
+
+        first.assignees.remove(self.alice)
+        self.bob.task_set.clear()
+        second.assignees.set([self.alice])
+        self.assertMatchesRebuild()
+
+        second.delete()
+        self.assertMatchesRebuild()
+        self.assertEqual(
+            self.snapshot()[(TaskCounters.Scope.GLOBAL, 0)], (1, 1, 0)
+        )
+
+    def test_worker_detail_reads_counters(self):
+        self.create_task().assignees.add(self.alice)
+        self.client.force_login(self.alice)
+        response = self.client.get(
+            reverse("tasks:worker-detail", kwargs={"pk": self.alice.pk})
+        )
+        self.assertEqual(response.context["task_counters"].total, 1)
+
+
+class ListViewQueryCountTests(NPlusOneTestMixin, TestCase):
+    """Pin the number of queries per page; it must not grow with rows."""
+
+    def setUp(self):
+        cache.clear()
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        self.client.force_login(self.worker)
+        self.position = Position.objects.create(name="Developer")
+
+    def add_tasks(self, count, **task_fields):
+        for number in range(count):
+            task_type = TaskType.objects.create(name=f"type {number}")
+            assignee = Worker.objects.create_user(
+                username=f"assignee {Worker.objects.count()}",
+                position=self.position,
+            )
+            task = Task.objects.create(
+                name=f"task {number}",
+                description="description",
+                deadline=date.today(),
+                priority="Urgent",
+                task_type=task_type,
+                **task_fields
+            )
+            task.assignees.add(self.worker, assignee)
+
+    def assertQueriesPerPage(self, url, expected, **task_fields):
+        for rows in (1, 7):
+            self.add_tasks(rows, **task_fields)
+            with self.assertNumQueries(expected):
+                self.client.get(url)
+
+    # the task list reads the collection versions for its ETag
+    def test_task_list(self):
+        self.assertQueriesPerPage(reverse("tasks:tasks-list"), 6)
+
+    def test_task_list_cursor(self):
+        self.assertQueriesPerPage(reverse("tasks:tasks-list") + "?cursor=", 5)
+
+    # every new row bumps the versions, so these render cold
+    def test_urgent_high_list(self):
+        self.assertQueriesPerPage(
+            reverse("tasks:high-priority-tasks-list"), 5
+        )
+
+    def test_completed_list(self):
+        self.assertQueriesPerPage(
+            reverse("tasks:tasks-completed-list"), 5, is_completed=True
+        )
+
+    def test_notifications(self):
+        self.assertQueriesPerPage(reverse("tasks:notifications"), 3)
+
+    def test_index(self):
+        self.assertQueriesPerPage(reverse("tasks:index"), 3)
+
+    def test_dashboard_team(self):
+        self.assertQueriesPerPage(reverse("tasks:dashboard-team"), 3)
+
+    def test_dashboard_my_tasks(self):
+        self.assertQueriesPerPage(reverse("tasks:dashboard-my-tasks"), 3)
+
+
+class NotificationDigestTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        self.client.force_login(self.worker)
+        self.task = Task.objects.create(
+            name="soon",
+            description="description",
+            deadline=date.today(),
+            priority="High",
+            task_type=TaskType.objects.create(name="Bug"),
+        )
+        self.task.assignees.add(self.worker)
+
+    def notification_names(self):
+        response = self.client.get(reverse("tasks:notifications"))
+        return [task["name"] for task in response.context["tasks"]]
+
+    def test_digest_is_cached(self):
+        self.assertEqual(self.notification_names(), ["soon"])
+        # session and user only, the digest comes from the cache
+        with self.assertNumQueries(2):
+            self.assertEqual(self.notification_names(), ["soon"])
+
+    def test_invalidated_by_task_changes(self):
+        self.notification_names()
+        self.task.name = "renamed"
+        self.task.save()
+        self.assertEqual(self.notification_names(), ["renamed"])
+
+        self.task.assignees.clear()
+        self.assertEqual(self.notification_names(), [])
+
+        self.worker.task_set.add(self.task)
+        self.assertEqual(self.notification_names(), ["renamed"])
+
+        self.task.delete()
+        self.assertEqual(self.notification_names(), [])
+
+    @override_settings(TIME_ZONE="Pacific/Kiritimati")
+    def test_window_uses_local_date(self):
+        # 14:00 on January 1st in UTC is already January 2nd locally
+        now = datetime(2030, 1, 1, 10, 0, tzinfo=dt_timezone.utc)
+        Task.objects.filter(pk=self.task.pk).update(deadline=date(2030, 1, 5))
+        with mock.patch("django.utils.timezone.now", return_value=now):
+            tasks = get_notification_tasks(self.worker.pk)
+        self.assertEqual([task["name"] for task in tasks], ["soon"])
+
+    @override_settings(TIME_ZONE="UTC")
+    def test_expires_at_midnight(self):
+        late_evening = datetime(2030, 1, 1, 23, 0, tzinfo=dt_timezone.utc)
+        self.assertEqual(seconds_until_midnight(late_evening), 60 * 60)
+
+
+class FullTextSearchTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!",
+            first_name="Anna", last_name="Smith",
+        )
+        self.client.force_login(self.worker)
+        task_type = TaskType.objects.create(name="Bug")
+        self.in_description = self.create_task(
+            "Release notes", "Mention the login fix", task_type
+        )
+        self.in_name = self.create_task(
+            "Fix login redirect", "Users end up on a 404", task_type
+        )
+        self.create_task("Update docs", "Nothing relevant", task_type)
+
+    def create_task(self, name, description, task_type):
+        return Task.objects.create(
+            name=name,
+            description=description,
+            deadline=date.today(),
+            priority="Low",
+            task_type=task_type,
+        )
+
+    def search_tasks(self, query):
+        return list(
+            get_search_backend().search_tasks(Task.objects.all(), query)
+        )
+
+    def test_ranks_name_matches_first(self):
+        self.assertEqual(
+            self.search_tasks("login"), [self.in_name, self.in_description]
+        )
+
+    def test_prefix_and_multiple_terms(self):
+        self.assertEqual(self.search_tasks("redir log"), [self.in_name])
+        self.assertEqual(self.search_tasks("!!"), [])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.in_name.name = "Fix signup redirect"
+        self.in_name.description = "Unrelated"
+        self.in_name.save()
+        self.assertEqual(self.search_tasks("login"), [self.in_description])
+
+        self.in_description.delete()
+        self.assertEqual(self.search_tasks("login"), [])
+
+    def test_only_searched_columns_reindex(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite FTS5 triggers")
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT sql FROM sqlite_master WHERE name IN "
+                "('tasks_task_fts_au', 'tasks_worker_fts_au') ORDER BY name"
+            )
+            triggers = [row[0] for row in cursor.fetchall()]
+        self.assertIn("AFTER UPDATE OF name, description ON", triggers[0])
+        self.assertIn(
+            "AFTER UPDATE OF username, first_name, last_name ON", triggers[1]
+        )
+
+        Task.objects.update(priority="High")
+        self.assertEqual(
+            self.search_tasks("login"), [self.in_name, self.in_description]
+        )
+
+    def test_rank_computed_once_for_many_matches(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("SQLite FTS5 bm25")
+        task_type = TaskType.objects.get(name="Bug")
+        Task.objects.bulk_create(
+            Task(
+                name=f"login task {number}",
+                description="description",
+                deadline=date.today(),
+                priority="Low",
+                task_type=task_type,
+            )
+            for number in range(3000)
+        )
+        queryset = get_search_backend().search_tasks(
+            Task.objects.all(), "login"
+        )
+
+        with self.assertNumQueries(1):
+            results = list(queryset[:20])
+        ranks = [task.search_rank for task in results]
+        self.assertEqual(len(ranks), 20)
+        self.assertEqual(ranks, sorted(ranks, reverse=True))
+
+        with connection.cursor() as cursor:
+            sql, params = queryset.query.sql_with_params()
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            plan = " ".join(str(row[-1]) for row in cursor.fetchall())
+        # one MATCH over the fts index, no subquery run per task
+        self.assertEqual(plan.count("VIRTUAL TABLE"), 1)
+        self.assertNotIn("CORRELATED", plan)
+
+    def test_list_views_use_backend(self):
+        response = self.client.get(reverse("tasks:tasks-list"), {"name": "logi"})
+        self.assertEqual(
+            list(response.context["task_list"]),
+            [self.in_name, self.in_description]
+        )
+
+        response = self.client.get(
+            reverse("tasks:workers-list"), {"username": "smith"}
+        )
+        self.assertEqual(list(response.context["worker_list"]), [self.worker])
+
+
+class FuzzySearchTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        # built empty, then kept current by the model signals
+        for index in ngram_indexes.values():
+            index.reset()
+            index.build()
+        self.worker = Worker.objects.create_user(
+            username="alexandra", password="worker_test!",
+            first_name="Alexandra", last_name="Kowalski",
+        )
+        Worker.objects.create_user(username="bob", last_name="Smith")
+        self.client.force_login(self.worker)
+        self.task = Task.objects.create(
+            name="Fix login redirect",
+            description="description",
+            deadline=date.today(),
+            priority="Low",
+            task_type=TaskType.objects.create(name="Bug"),
+        )
+
+    def fuzzy_workers(self, query):
+        response = self.client.get(
+            reverse("tasks:workers-list"), {"username": query, "fuzzy": "on"}
+        )
+        return list(response.context["worker_list"])
+
+    def fuzzy_tasks(self, query):
+        response = self.client.get(
+            reverse("tasks:tasks-list"), {"name": query, "fuzzy": "on"}
+        )
+        return list(response.context["task_list"])
+
+    def test_typos_and_partial_words(self):
+        self.assertEqual(self.fuzzy_workers("alexnadra"), [self.worker])
+        self.assertEqual(self.fuzzy_workers("kowal"), [self.worker])
+        self.assertEqual(self.fuzzy_tasks("redirekt"), [self.task])
+        self.assertEqual(self.fuzzy_tasks("zzz"), [])
+
+    def test_index_follows_saves_and_deletes(self):
+        self.assertEqual(self.fuzzy_tasks("signup"), [])
+
+        self.task.name = "Fix signup redirect"
+        self.task.save()
+        self.assertEqual(self.fuzzy_tasks("signup"), [self.task])
+
+        self.task.delete()
+        self.assertEqual(self.fuzzy_tasks("signup"), [])
+
+    def test_requests_never_build_the_index(self):
+        index = ngram_indexes[Task._meta.db_table]
+        index.reset()
+        with mock.patch.object(index, "build") as build:
+            # prefix matches until the background build is done
+            self.assertEqual(self.fuzzy_tasks("redir"), [self.task])
+            self.assertEqual(self.fuzzy_tasks("redirekt"), [])
+        build.assert_not_called()
+
+    def test_changes_during_a_build_are_kept(self):
+        index = ngram_indexes[Task._meta.db_table]
+        rows = Task.objects.values_list("pk", "name")
+        renamed = []
+
+        def rename_while_reading(*args, **kwargs):
+            # the build already read the old name
+            yield from list(rows)
+            if not renamed:
+                self.task.name = "Fix signup redirect"
+                self.task.save()
+                renamed.append(self.task)
+
+        with mock.patch(
+            "django.db.models.query.QuerySet.iterator", rename_while_reading
+        ):
+            index.build()
+        self.assertEqual(self.fuzzy_tasks("signup"), [self.task])
+
+    def test_candidates_are_capped(self):
+        index = ngram_indexes[Task._meta.db_table]
+        Task.objects.bulk_create(
+            Task(
+                name=f"redirect {number}",
+                description="description",
+                deadline=date.today(),
+                priority="Low",
+                task_type=self.task.task_type,
+            )
+            for number in range(50)
+        )
+        index.build()
+
+        scores = index.search("login redirect", max_candidates=10)
+        self.assertEqual(len(scores), 10)
+        self.assertEqual(scores[0], (self.task.pk, 1.0))
+
+
+class SearchApiTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        task_type = TaskType.objects.create(name="Bug")
+        for number in range(30):
+            Task.objects.create(
+                name=f"Deploy service {number}",
+                description="description",
+                deadline=date(2030, 1, 1),
+                priority="High",
+                task_type=task_type,
+            )
+
+    async def test_task_rows(self):
+        await sync_to_async(self.async_client.force_login)(self.worker)
+        response = await self.async_client.get(
+            reverse("tasks:api-search-tasks"), {"q": "deplo", "limit": "100"}
+        )
+        data = response.json()
+
+        self.assertEqual(data["query"], "deplo")
+        self.assertEqual(len(data["results"]), 25)
+        self.assertEqual(
+            set(data["results"][0]), {"id", "name", "priority", "deadline"}
+        )
+        self.assertEqual(data["results"][0]["deadline"], "2030-01-01")
+        self.assertIn("max-age", response["Cache-Control"])
+
+    def test_worker_rows_and_short_queries(self):
+        self.client.force_login(self.worker)
+        url = reverse("tasks:api-search-workers")
+        self.assertEqual(
+            [row["username"] for row in self.client.get(
+                url, {"q": "work"}
+            ).json()["results"]],
+            ["worker"]
+        )
+        self.assertEqual(self.client.get(url, {"q": "w"}).json()["results"], [])
+
+    def test_requires_authentication(self):
+        response = self.client.get(
+            reverse("tasks:api-search-tasks"), {"q": "deploy"}
+        )
+        self.assertEqual(response.status_code, 401)
+
+
+class TaskSortTests(NPlusOneTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        task_type = TaskType.objects.create(name="Bug")
+        for priority in ["High", "Low", "Urgent", "Medium"]:
+            Task.objects.create(
+                name=f"{priority} task",
+                description="description",
+                deadline=date(2030, 1, 1),
+                priority=priority,
+                task_type=task_type,
+            )
+
+    def setUp(self):
+        # rendered pages are cached by collection version
+        cache.clear()
+        self.client.force_login(self.worker)
+
+    def priorities(self, **params):
+        response = self.client.get(reverse("tasks:tasks-list"), params)
+        return [task.priority for task in response.context["task_list"]]
+
+    def test_priority_sorts_by_severity(self):
+        self.assertEqual(
+            self.priorities(sort_by="priority"),
+            ["Urgent", "High", "Medium", "Low"]
+        )
+        self.assertEqual(
+            self.priorities(sort_by="-priority"),
+            ["Low", "Medium", "High", "Urgent"]
+        )
+
+    def test_rank_follows_priority_changes(self):
+        task = Task.objects.get(priority="Low")
+        task.priority = "Urgent"
+        task.save(update_fields=["priority"])
+        task.refresh_from_db()
+        self.assertEqual(task.priority_rank, 4)
+
+    def test_unknown_sort_is_ignored(self):
+        response = self.client.get(
+            reverse("tasks:tasks-list"), {"sort_by": "assignees__username"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["sort_by"], "")
+
+    def test_sort_combines_with_search(self):
+        self.assertEqual(
+            self.priorities(name="task", sort_by="priority"),
+            ["Urgent", "High", "Medium", "Low"]
+        )
+
+    def test_sort_with_cursor_pagination(self):
+        response = self.client.get(
+            reverse("tasks:tasks-list"), {"sort_by": "-priority", "cursor": ""}
+        )
+        self.assertTrue(response.context["page_obj"].is_cursor)
+
+    def test_every_sort_is_index_backed(self):
+        self.assertEqual(check_sort_indexes(None), [])
+
+
+class DashboardFragmentTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        self.client.force_login(self.worker)
+
+    def test_team_is_paginated(self):
+        for number in range(12):
+            Worker.objects.create_user(
+                username=f"member{number:02}", password="member_test!"
+            )
+        response = self.client.get(reverse("tasks:dashboard-team"))
+        page = response.context["page_obj"]
+        self.assertEqual(len(page), 10)
+        self.assertTrue(page.has_next())
+
+        response = self.client.get(
+            reverse("tasks:dashboard-team"), {"cursor": page.next_cursor}
+        )
+        self.assertEqual(len(response.context["page_obj"]), 3)
+
+    def test_my_tasks_lists_only_own_tasks(self):
+        other = Worker.objects.create_user(
+            username="other", password="other_test!"
+        )
+        task_type = TaskType.objects.create(name="Bug")
+        for name, assignee in (("mine", self.worker), ("theirs", other)):
+            task = Task.objects.create(
+                name=name,
+                description="description",
+                deadline=date(2030, 1, 1),
+                priority="High",
+                task_type=task_type,
+            )
+            task.assignees.add(assignee)
+
+        response = self.client.get(reverse("tasks:dashboard-my-tasks"))
+        self.assertEqual(
+            [task.name for task in response.context["current_user_task_list"]],
+            ["mine"]
+        )
+
+    def test_fragments_are_privately_cacheable(self):
+        response = self.client.get(reverse("tasks:dashboard-team"))
+        self.assertIn("private", response["Cache-Control"])
+        self.assertIn("max-age=30", response["Cache-Control"])
+
+    def test_dashboard_does_not_render_rows(self):
+        response = self.client.get(reverse("tasks:index"))
+        self.assertNotIn("worker_list", response.context)
+        self.assertContains(response, reverse("tasks:dashboard-team"))
+
+
+class BulkTaskTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.bug = TaskType.objects.create(name="Bug")
+        self.alice = Worker.objects.create_user(
+            username="alice", password="alice_test!"
+        )
+        self.bob = Worker.objects.create_user(username="bob")
+        self.tasks = [
+            Task.objects.create(
+                name=f"task {number}",
+                description="description",
+                deadline=date(2030, 1, 1),
+                priority="Low",
+                task_type=self.bug,
+            )
+            for number in range(3)
+        ]
+        for task in self.tasks:
+            task.assignees.add(self.alice)
+        self.ids = [task.pk for task in self.tasks]
+
+    def counters(self):
+        return sorted(
+            TaskCounters.objects.values_list(
+                "scope", "object_id", "total", "completed", "open_urgent_high"
+            )
+        )
+
+    def assertMatchesRebuild(self):
+        maintained = self.counters()
+        call_command("rebuild_task_counters", stdout=open("/dev/null", "w"))
+        self.assertEqual(
+            [row for row in maintained if any(row[2:])], self.counters()
+        )
+
+    def test_complete_reports_per_task(self):
+        Task.objects.filter(pk=self.ids[0]).update(is_completed=True)
+        results = run_bulk_action("complete", self.ids + [0])
+        self.assertEqual(
+            results,
+            [
+                (self.ids[0], "unchanged"),
+                (self.ids[1], "updated"),
+                (self.ids[2], "updated"),
+                (0, "not_found"),
+            ]
+        )
+        self.assertFalse(Task.objects.filter(is_completed=False).exists())
+
+    def test_reprioritize_keeps_rank_and_counters(self):
+        run_bulk_action("reprioritize", self.ids, priority="Urgent")
+        self.assertEqual(
+            set(Task.objects.values_list("priority", "priority_rank")),
+            {("Urgent", 4)}
+        )
+        self.assertMatchesRebuild()
+
+    def test_reassign(self):
+        run_bulk_action("reassign", self.ids, assignees=[self.bob.pk])
+        self.assertFalse(self.alice.task_set.exists())
+        self.assertEqual(self.bob.task_set.count(), 3)
+        self.assertMatchesRebuild()
+
+    def test_delete(self):
+        run_bulk_action("delete", self.ids[:2])
+        self.assertEqual(Task.objects.count(), 1)
+        self.assertMatchesRebuild()
+
+    def test_queries_do_not_grow_with_tasks(self):
+        with CaptureQueriesContext(connection) as few:
+            run_bulk_action("reprioritize", self.ids[:1], priority="High")
+        with CaptureQueriesContext(connection) as many:
+            run_bulk_action("reprioritize", self.ids, priority="Urgent")
+        self.assertEqual(len(few), len(many))
+
+    def test_notifications_are_invalidated(self):
+        Task.objects.update(deadline=date.today())
+        self.client.force_login(self.alice)
+        self.client.get(reverse("tasks:notifications"))
+        run_bulk_action("reprioritize", self.ids, priority="Urgent")
+        response = self.client.get(reverse("tasks:notifications"))
+        self.assertEqual(
+            [task["priority"] for task in response.context["tasks"]],
+            ["Urgent"] * 3
+        )
+
+    def test_api(self):
+        self.client.force_login(self.alice)
+        response = self.client.post(
+            reverse("tasks:api-bulk-tasks"),
+            {"action": "reprioritize", "ids": self.ids, "priority": "High"},
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["results"],
+            [{"id": pk, "status": "updated"} for pk in self.ids]
+        )
+
+    def test_api_rejects_invalid_requests(self):
+        self.client.force_login(self.alice)
+        for payload in (
+            {"action": "archive", "ids": self.ids},
+            {"action": "reprioritize", "ids": self.ids, "priority": "Meh"},
+            {"action": "reassign", "ids": self.ids, "assignees": [0]},
+            {"action": "complete", "ids": []},
+            # strings are iterable, "12" must not become [1, 2]
+            {"action": "complete", "ids": "12"},
+            {"action": "complete", "ids": ["1"]},
+            {"action": "complete", "ids": [True]},
+            {"action": "complete", "ids": 1},
+            {"action": "reassign", "ids": self.ids, "assignees": "12"},
+            {"action": "reassign", "ids": self.ids, "assignees": {"1": 1}},
+        ):
+            response = self.client.post(
+                reverse("tasks:api-bulk-tasks"),
+                payload,
+                content_type="application/json",
+            )
+            self.assertEqual(response.status_code, 400, payload)
+
+    def test_admin_actions_split_large_selections(self):
+        self.client.force_login(
+            Worker.objects.create_superuser(username="admin", password="x")
+        )
+        url = reverse("admin:tasks_task_changelist")
+        with mock.patch("tasks.admin.MAX_TASKS", 2), \
+                mock.patch("tasks.bulk.MAX_TASKS", 2):
+            response = self.client.post(
+                url,
+                {"action": "complete_tasks", "_selected_action": self.ids},
+                follow=True,
+            )
+        self.assertContains(response, "3 of 3 tasks changed.")
+        self.assertEqual(Task.objects.filter(is_completed=False).count(), 0)
+
+
+class ImportCommandTests(TestCase):
+    def write(self, suffix, content):
+        file = tempfile.NamedTemporaryFile(
+            "w", suffix=suffix, delete=False, encoding="utf-8"
+        )
+        self.addCleanup(os.remove, file.name)
+        with file:
+            file.write(content)
+        return file.name
+
+    def call(self, command, path, **options):
+        stdout, stderr = StringIO(), StringIO()
+        call_command(command, path, stdout=stdout, stderr=stderr, **options)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_import_workers_and_tasks(self):
+        workers = self.write(
+            ".csv",
+            "username,first_name,last_name,email,position\n"
+            "alice,Alice,A,,Developer\n"
+            "bob,Bob,B,,Developer\n"
+        )
+        self.call("import_workers", workers)
+        self.assertEqual(
+            Worker.objects.filter(position__name="Developer").count(), 2
+        )
+        alice = Worker.objects.get(username="alice")
+        self.assertFalse(alice.has_usable_password())
+
+        tasks = self.write(
+            ".csv",
+            "name,description,deadline,priority,task_type,"
+            "is_completed,assignees\n"
+            "first,d,2030-01-01,Urgent,Bug,false,alice;bob\n"
+            "second,d,2030-01-02,Low,Feature,true,bob;carol\n"
+            "third,d,not a date,Low,Bug,false,\n"
+        )
+        stdout, stderr = self.call("import_tasks", tasks, batch_size=2)
+
+        self.assertIn("Imported 2 tasks", stdout)
+        self.assertIn("line 3: unknown assignee 'carol'", stderr)
+        self.assertIn("line 4: invalid deadline", stderr)
+        first = Task.objects.get(name="first")
+        self.assertEqual(first.priority_rank, 4)
+        self.assertEqual(first.assignees.count(), 2)
+        self.assertEqual(
+            set(TaskType.objects.values_list("name", flat=True)),
+            {"Bug", "Feature"}
+        )
+
+        bob = Worker.objects.get(username="bob")
+        counters = TaskCounters.objects.get(
+            scope=TaskCounters.Scope.WORKER, object_id=bob.pk
+        )
+        self.assertEqual(
+            (counters.total, counters.completed, counters.open_urgent_high),
+            (2, 1, 1)
+        )
+
+    def test_import_jsonl(self):
+        TaskType.objects.create(name="Bug")
+        tasks = self.write(
+            ".jsonl",
+            '{"name": "one", "deadline": "2030-01-01", "task_type": "Bug"}\n'
+            "\n"
+            '{"name": "two", "deadline": "2030-01-01", "task_type": "Bug", '
+            '"priority": "High", "is_completed": true}\n'
+        )
+        self.call("import_tasks", tasks)
+        self.assertEqual(
+            list(Task.objects.order_by("name").values_list(
+                "name", "priority", "is_completed"
+            )),
+            [("one", "Medium", False), ("two", "High", True)]
+        )
+        self.assertEqual(TaskType.objects.count(), 1)
+
+    def test_jsonl_rows_that_are_not_objects_are_skipped(self):
+        TaskType.objects.create(name="Bug")
+        tasks = self.write(
+            ".jsonl",
+            '{"name": "one", "deadline": "2030-01-01", "task_type": "Bug"}\n'
+            '[1, 2]\n'
+            '"x"\n'
+        )
+        stdout, stderr = self.call("import_tasks", tasks)
+        self.assertIn("Imported 1 tasks", stdout)
+        self.assertIn("line 2: expected an object, got list", stderr)
+        self.assertIn("line 3: expected an object, got str", stderr)
+
+    def test_mistyped_fields_are_reported_per_row(self):
+        TaskType.objects.create(name="Bug")
+        tasks = self.write(
+            ".jsonl",
+            '{"name": "one", "deadline": 20240101, "task_type": "Bug"}\n'
+            '{"name": "two", "deadline": "2030-01-01", "task_type": "Bug", '
+            '"priority": ["Low"]}\n'
+            '{"name": "three", "deadline": "2030-01-01", "task_type": "Bug", '
+            '"assignees": 5}\n'
+            '{"name": "four", "deadline": "2030-01-01", "task_type": ["Bug"]}\n'
+            '{"name": "five", "deadline": "2030-01-01", "task_type": "Bug"}\n'
+        )
+        stdout, stderr = self.call("import_tasks", tasks)
+
+        self.assertIn("Imported 1 tasks", stdout)
+        self.assertIn("line 1: invalid deadline 20240101", stderr)
+        self.assertIn("line 2: priority must be a string", stderr)
+        self.assertIn("line 3: assignees must be a list of usernames", stderr)
+        self.assertIn("line 4: task_type must be a string", stderr)
+        self.assertEqual(
+            list(Task.objects.values_list("name", flat=True)), ["five"]
+        )
+
+    def test_failed_rows_create_no_lookups(self):
+        tasks = self.write(
+            ".jsonl",
+            '{"name": "one", "deadline": "soon", "task_type": "Chore"}\n'
+            '{"name": "", "deadline": "2030-01-01", "task_type": "Spike"}\n'
+        )
+        self.call("import_tasks", tasks)
+        self.assertFalse(TaskType.objects.exists())
+
+        Worker.objects.create_user(username="alice")
+        workers = self.write(
+            ".jsonl",
+            '{"username": "alice", "position": "Manager"}\n'
+            '{"username": 5, "position": "Tester"}\n'
+        )
+        stdout, stderr = self.call("import_workers", workers)
+        self.assertIn("line 2: username must be a string", stderr)
+        self.assertFalse(Position.objects.exists())
+
+    def test_derived_data_follows_partial_imports(self):
+        TaskType.objects.create(name="Bug")
+        tasks = self.write(
+            ".jsonl",
+            '{"name": "one", "deadline": "2030-01-01", "task_type": "Bug"}\n'
+            "not json\n"
+        )
+        with self.assertRaises(CommandError):
+            self.call("import_tasks", tasks, batch_size=1)
+        self.assertEqual(Task.objects.count(), 1)
+        self.assertEqual(
+            TaskCounters.objects.get(
+                scope=TaskCounters.Scope.GLOBAL
+            ).total,
+            1
+        )
+
+    def test_imported_tasks_are_searchable(self):
+        ngram_indexes[Task._meta.db_table].build()
+        tasks = self.write(
+            ".jsonl",
+            '{"name": "migration", "deadline": "2030-01-01", '
+            '"task_type": "Bug"}\n'
+        )
+        self.call("import_tasks", tasks)
+        backend = get_search_backend()
+        self.assertEqual(
+            [task.name for task in backend.fuzzy_search_tasks(
+                Task.objects.all(), "migraton"
+            )],
+            ["migration"]
+        )
+
+
+class TaskExportTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        self.other = Worker.objects.create_user(username="other")
+        self.client.force_login(self.worker)
+        task_type = TaskType.objects.create(name="Bug")
+        for name, priority in (("login page", "Low"), ("logout", "Urgent")):
+            task = Task.objects.create(
+                name=name,
+                description="description",
+                deadline=date(2030, 1, 1),
+                priority=priority,
+                task_type=task_type,
+            )
+            task.assignees.add(self.worker, self.other)
+        Task.objects.create(
+            name="unassigned",
+            description="description",
+            deadline=date(2030, 1, 1),
+            priority="High",
+            task_type=task_type,
+        )
+
+    def export(self, **params):
+        response = self.client.get(reverse("tasks:tasks-export"), params)
+        self.assertTrue(response.streaming)
+        return b"".join(response.streaming_content).decode()
+
+    def test_csv(self):
+        lines = self.export().splitlines()
+        self.assertEqual(
+            lines[0],
+            "id,name,description,deadline,priority,task_type,"
+            "is_completed,assignees"
+        )
+        self.assertEqual(len(lines), 4)
+        self.assertEqual(
+            sorted(lines[1].rsplit(",", 1)[1].split(";")),
+            ["other", "worker"]
+        )
+        self.assertTrue(lines[3].endswith(",unassigned,description,"
+                                          "2030-01-01,High,Bug,False,"))
+
+    def test_filters_match_task_list(self):
+        rows = [
+            json.loads(line)
+            for line in self.export(
+                format="jsonl", name="log", sort_by="priority"
+            ).splitlines()
+        ]
+        self.assertEqual(
+            [row["name"] for row in rows], ["logout", "login page"]
+        )
+        self.assertEqual(sorted(rows[0]["assignees"]), ["other", "worker"])
+
+    def test_assignees_are_aggregated_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.export()
+        self.assertEqual(
+            len([q for q in queries if "tasks_task" in q["sql"]]), 1
+        )
+
+    def test_command_output_can_be_imported(self):
+        stdout = StringIO()
+        call_command("export_tasks", format="jsonl", stdout=stdout)
+        exported = stdout.getvalue()
+        Task.objects.all().delete()
+
+        with tempfile.NamedTemporaryFile(
+            "w", suffix=".jsonl", delete=False
+        ) as file:
+            file.write(exported)
+        self.addCleanup(os.remove, file.name)
+        call_command("import_tasks", file.name, stdout=StringIO())
+
+        self.assertEqual(Task.objects.count(), 3)
+        self.assertEqual(
+            Task.objects.get(name="logout").assignees.count(), 2
+        )
+
+
+class WorkloadTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.bug = TaskType.objects.create(name="Bug")
+        self.feature = TaskType.objects.create(name="Feature")
+        self.alice = Worker.objects.create_user(
+            username="alice", password="alice_test!"
+        )
+        self.bob = Worker.objects.create_user(username="bob")
+
+    def create_task(self, **kwargs):
+        return Task.objects.create(**{
+            "name": "task",
+            "description": "description",
+            "deadline": date.today() + timedelta(days=7),
+            "priority": "Low",
+            "task_type": self.bug,
+            **kwargs
+        })
+
+    def assertMatchesBuild(self):
+        cached = get_workload()
+        built = WorkloadMatrix.build()
+        for worker in (self.alice, self.bob):
+            self.assertEqual(
+                cached.breakdown(worker.pk), built.breakdown(worker.pk)
+            )
+
+    def test_counts_per_worker_and_type(self):
+        self.create_task(priority="Urgent").assignees.add(self.alice)
+        self.create_task(
+            deadline=date.today() - timedelta(days=1)
+        ).assignees.add(self.alice, self.bob)
+        self.create_task(
+            task_type=self.feature, is_completed=True
+        ).assignees.add(self.alice)
+
+        matrix = WorkloadMatrix.build()
+        self.assertEqual(
+            matrix.breakdown(self.alice.pk),
+            {
+                self.bug.pk: {
+                    "open": 2, "completed": 0, "overdue": 1, "urgent": 1
+                },
+                self.feature.pk: {
+                    "open": 0, "completed": 1, "overdue": 0, "urgent": 0
+                },
+            }
+        )
+        self.assertEqual(
+            matrix.leaderboard("open"),
+            [
+                (self.alice.pk, {
+                    "open": 2, "completed": 1, "overdue": 1, "urgent": 1
+                }),
+                (self.bob.pk, {
+                    "open": 1, "completed": 0, "overdue": 1, "urgent": 0
+                }),
+            ]
+        )
+
+    def test_assignment_changes_update_cached_matrix(self):
+        first = self.create_task(priority="High")
+        second = self.create_task(task_type=self.feature)
+        first.assignees.add(self.alice)
+        second.assignees.add(self.alice)
+        get_workload()
+
+        for change in (
+            lambda: first.assignees.add(self.bob),
+            lambda: self.bob.task_set.add(second),
+            lambda: self.alice.task_set.remove(first),
+            lambda: second.assignees.clear(),
+        ):
+            with self.captureOnCommitCallbacks(execute=True):
+                change()
+            self.assertIsNotNone(workload.get_cached())
+            self.assertMatchesBuild()
+
+    def test_task_changes_update_cached_matrix(self):
+        task = self.create_task()
+        task.assignees.add(self.alice, self.bob)
+        # types without assignments aren't in the matrix, moving a task to
+        # one rebuilds it
+        self.create_task(task_type=self.feature).assignees.add(self.bob)
+        get_workload()
+
+        task.name = "renamed"
+        task.save()
+        self.assertIsNotNone(workload.get_cached())
+        for field, value in [
+            ("priority", "Urgent"),
+            ("task_type", self.feature),
+            ("deadline", date.today() - timedelta(days=1)),
+            ("is_completed", True),
+        ]:
+            setattr(task, field, value)
+            with self.captureOnCommitCallbacks(execute=True):
+                task.save()
+            self.assertIsNotNone(
+                workload.get_cached(), field
+            )
+            self.assertMatchesBuild()
+        task.delete()
+        self.assertMatchesBuild()
+
+    def test_writes_elsewhere_hide_cached_matrix(self):
+        task = self.create_task()
+        task.assignees.add(self.alice)
+        get_workload()
+
+        # another process changed assignments, this cache still holds
+        # the matrix of the version it read
+        versions.bump(versions.WORKLOAD)
+        self.assertIsNone(workload.get_cached())
+        self.assertEqual(get_workload().totals(self.alice.pk)["open"], 1)
+
+    def test_concurrent_update_is_not_lost(self):
+        task = self.create_task()
+        get_workload()
+
+        # a concurrent writer advanced the version first
+        with mock.patch.object(versions, "advance", return_value=False), \
+                self.captureOnCommitCallbacks(execute=True):
+            task.assignees.add(self.alice)
+        self.assertIsNone(workload.get_cached())
+        self.assertMatchesBuild()
+
+    def test_worker_detail_and_leaderboard(self):
+        self.create_task().assignees.add(self.alice)
+        self.client.force_login(self.alice)
+
+        response = self.client.get(
+            reverse("tasks:worker-detail", kwargs={"pk": self.alice.pk})
+        )
+        self.assertEqual(response.context["workload_totals"]["open"], 1)
+        self.assertEqual(response.context["workload"][0][0], self.bug)
+
+        response = self.client.get(
+            reverse("tasks:workload-leaderboard"), {"metric": "nonsense"}
+        )
+        self.assertEqual(response.context["metric"], "open")
+        self.assertEqual(
+            [worker for worker, _ in response.context["leaderboard"]],
+            [self.alice]
+        )
+
+
+class DeadlineBucketTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        self.today = date.today()
+        self.task_type = TaskType.objects.create(name="Bug")
+
+    def create_task(self, days, **kwargs):
+        return Task.objects.create(**{
+            "name": "task",
+            "description": "description",
+            "deadline": self.today + timedelta(days=days),
+            "priority": "Low",
+            "task_type": self.task_type,
+            **kwargs
+        })
+
+    def buckets(self):
+        return dict(
+            DeadlineBucket.objects.exclude(open_tasks=0).values_list(
+                "day", "open_tasks"
+            )
+        )
+
+    def assertMatchesRebuild(self):
+        overdue = deadlines.overdue_count(self.today)
+        upcoming = deadlines.due_counts(
+            self.today, self.today + timedelta(days=30)
+        )
+        deadlines.rebuild_deadline_buckets(self.today)
+        self.assertEqual(deadlines.overdue_count(self.today), overdue)
+        self.assertEqual(
+            deadlines.due_counts(self.today, self.today + timedelta(days=30)),
+            upcoming
+        )
+
+    def test_signals_keep_buckets_current(self):
+        first = self.create_task(1)
+        second = self.create_task(1)
+        self.create_task(2, is_completed=True)
+        overdue = self.create_task(-3)
+        self.assertEqual(
+            self.buckets(),
+            {self.today + timedelta(days=1): 2, deadlines.OVERDUE: 1}
+        )
+
+        first.deadline = self.today + timedelta(days=5)
+        first.save()
+        second.is_completed = True
+        second.save()
+        overdue.delete()
+        self.assertEqual(
+            self.buckets(), {self.today + timedelta(days=5): 1}
+        )
+        self.assertMatchesRebuild()
+
+    def test_rollover_folds_past_days(self):
+        # created three days ago, when these days were still ahead
+        with mock.patch(
+            "tasks.deadlines.timezone.localdate",
+            return_value=self.today - timedelta(days=3),
+        ):
+            self.create_task(-2)
+            self.create_task(-1)
+            late = self.create_task(-1)
+            self.create_task(0)
+
+        self.assertEqual(deadlines.rollover(self.today), 2)
+        self.assertEqual(
+            self.buckets(), {deadlines.OVERDUE: 3, self.today: 1}
+        )
+        self.assertEqual(deadlines.overdue_count(self.today), 3)
+
+        # finishing or deleting an overdue task after the rollover comes
+        # off the overdue row, not its folded day
+        late.is_completed = True
+        late.save()
+        Task.objects.filter(deadline=self.today - timedelta(days=2)).delete()
+        self.assertEqual(
+            self.buckets(), {deadlines.OVERDUE: 1, self.today: 1}
+        )
+        self.assertMatchesRebuild()
+
+        counts = deadlines.due_counts(
+            self.today - timedelta(days=2), self.today, self.today
+        )
+        self.assertEqual(list(counts.values()), [None, None, 1])
+
+    def test_bulk_changes_rebuild_buckets(self):
+        tasks = [self.create_task(1), self.create_task(-1)]
+        run_bulk_action("complete", [task.pk for task in tasks])
+        self.assertEqual(self.buckets(), {})
+
+    def test_views_read_buckets_only(self):
+        self.create_task(-1)
+        self.create_task(2)
+        worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        self.client.force_login(worker)
+
+        # session, user, overdue and upcoming buckets
+        with self.assertNumQueries(4):
+            response = self.client.get(reverse("tasks:tasks-due-soon"))
+        self.assertEqual(response.context["overdue"], 1)
+        self.assertEqual(
+            response.context["due_counts"][self.today + timedelta(days=2)], 1
+        )
+
+        response = self.client.get(
+            reverse("tasks:tasks-calendar"),
+            {"month": self.today.strftime("%Y-%m")}
+        )
+        self.assertEqual(response.context["overdue"], 1)
+        self.assertIn(
+            (self.today + timedelta(days=2), 1),
+            [cell for week in response.context["weeks"] for cell in week]
+        )
+
+        for month in ("9999-12", "0001-01", "2030-13", "soon"):
+            response = self.client.get(
+                reverse("tasks:tasks-calendar"), {"month": month}
+            )
+            self.assertEqual(
+                response.context["month"], self.today.replace(day=1), month
+            )
+
+
+class RecordingBroker:
+    """Stand-in broker keeping what was published."""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, channels, frame):
+        self.published.append((sorted(channels), frame))
+
+
+@override_settings(EVENTS_BROKER="tasks.tests.RecordingBroker")
+class TaskEventTests(TestCase):
+    def setUp(self):
+        events.get_broker.cache_clear()
+        self.addCleanup(events.get_broker.cache_clear)
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        self.task_type = TaskType.objects.create(name="Bug")
+
+    def published(self):
+        return [
+            (channels, frame.split("\n")[0])
+            for channels, frame in events.get_broker().published
+        ]
+
+    def test_signals_publish_on_commit(self):
+        team = [events.TEAM_CHANNEL]
+        mine = sorted(team + [events.worker_channel(self.worker.pk)])
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(
+                name="task",
+                description="description",
+                deadline=date(2030, 1, 1),
+                priority="Low",
+                task_type=self.task_type,
+            )
+            task.assignees.add(self.worker)
+            task.is_completed = True
+            task.save()
+            run_bulk_action("reprioritize", [task.pk], priority="High")
+
+        self.assertEqual(
+            self.published(),
+            [
+                (team, "event: task.created"),
+                (mine, "event: task.assigned"),
+                (mine, "event: task.completed"),
+                (mine, "event: task.bulk"),
+            ]
+        )
+
+    def test_nothing_published_on_rollback(self):
+        Task.objects.create(
+            name="task",
+            description="description",
+            deadline=date(2030, 1, 1),
+            priority="Low",
+            task_type=self.task_type,
+        )
+        self.assertEqual(self.published(), [])
+
+
+class EventStreamTests(TestCase):
+    def setUp(self):
+        events.get_broker.cache_clear()
+        self.addCleanup(events.get_broker.cache_clear)
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+
+    def scope(self, query=b""):
+        cookie = self.client.cookies.output(header="", sep=";").strip()
+        return {
+            "type": "http",
+            "method": "GET",
+            "path": sse.EVENTS_PATH,
+            "query_string": query,
+            "headers": [(b"cookie", cookie.encode())],
+        }
+
+    async def test_requires_login(self):
+        communicator = ApplicationCommunicator(sse.application, self.scope())
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(1)
+        self.assertEqual(start["status"], 401)
+
+    async def test_streams_published_events(self):
+        await sync_to_async(self.client.force_login)(self.worker)
+        communicator = ApplicationCommunicator(
+            sse.application, self.scope(b"channel=team")
+        )
+        await communicator.send_input({"type": "http.request"})
+        start = await communicator.receive_output(1)
+        self.assertEqual(start["status"], 200)
+        self.assertEqual(
+            dict(start["headers"])[b"content-type"], b"text/event-stream"
+        )
+        await communicator.receive_output(1)  # retry interval
+
+        frame = events.format_event("task.updated", {"id": 1})
+        events.get_broker().publish([events.TEAM_CHANNEL], frame)
+        body = await communicator.receive_output(1)
+        self.assertEqual(body["body"].decode(), frame)
+
+        await communicator.send_input({"type": "http.disconnect"})
+        await communicator.wait(1)
+        self.assertFalse(events.get_broker().subscriptions)
+
+    @override_settings(EVENTS_QUEUE_SIZE=2)
+    async def test_slow_clients_are_reset(self):
+        subscription = events.get_broker().subscribe([events.TEAM_CHANNEL])
+        for number in range(5):
+            events.get_broker().publish(
+                [events.TEAM_CHANNEL], f"frame {number}"
+            )
+        await asyncio.sleep(0)
+        self.assertIs(await subscription.get(1), events.OVERFLOW)
+        self.assertEqual(subscription.queue.qsize(), 0)
+        subscription.close()
+
+
+class ConditionalGetTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        self.other = Worker.objects.create_user(username="other")
+        self.client.force_login(self.worker)
+        self.task = Task.objects.create(
+            name="task",
+            description="description",
+            deadline=date(2030, 1, 1),
+            priority="Low",
+            task_type=TaskType.objects.create(name="Bug"),
+        )
+
+    def test_unchanged_pages_are_not_modified(self):
+        # session, user, then the versions and the row's updated_at
+        urls = {
+            reverse("tasks:tasks-list"): 3,
+            reverse("tasks:task-detail", kwargs={"pk": self.task.pk}): 4,
+            reverse("tasks:worker-detail", kwargs={"pk": self.worker.pk}): 4,
+        }
+        for url, queries in urls.items():
+            etag = self.client.get(url)["ETag"]
+            with self.assertNumQueries(queries):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304, url)
+
+    def test_task_detail_has_last_modified(self):
+        url = reverse("tasks:task-detail", kwargs={"pk": self.task.pk})
+        response = self.client.get(url)
+        self.assertIn("Last-Modified", response)
+        self.assertIn("no-cache", response["Cache-Control"])
+
+    def test_writes_change_validators(self):
+        url = reverse("tasks:task-detail", kwargs={"pk": self.task.pk})
+        list_url = reverse("tasks:tasks-list")
+        etag = self.client.get(url)["ETag"]
+        list_etag = self.client.get(list_url)["ETag"]
+
+        self.task.assignees.add(self.other)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+        self.assertEqual(
+            self.client.get(
+                list_url, HTTP_IF_NONE_MATCH=list_etag
+            ).status_code,
+            200
+        )
+
+        etag = self.client.get(url)["ETag"]
+        run_bulk_action("complete", [self.task.pk])
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+    def test_worker_etag_changes_at_midnight(self):
+        url = reverse("tasks:worker-detail", kwargs={"pk": self.worker.pk})
+        etag = self.client.get(url)["ETag"]
+        tomorrow = date.today() + timedelta(days=1)
+        with mock.patch(
+            "tasks.views.timezone.localdate", return_value=tomorrow
+        ):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_relogin_is_not_served_a_stale_csrf_token(self):
+        url = reverse("tasks:task-detail", kwargs={"pk": self.task.pk})
+        self.client.logout()
+        self.client.post(
+            reverse("login"),
+            {"username": "worker", "password": "worker_test!"},
+        )
+        etag = self.client.get(url)["ETag"]
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304
+        )
+
+        # logging in again rotates the CSRF secret the forms must carry
+        self.client.logout()
+        self.client.post(
+            reverse("login"),
+            {"username": "worker", "password": "worker_test!"},
+        )
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        token = re.search(
+            r'name="csrfmiddlewaretoken" value="([^"]+)"',
+            response.content.decode(),
+        ).group(1)
+        self.client.handler.enforce_csrf_checks = True
+        response = self.client.post(
+            reverse("tasks:task-update", kwargs={"pk": self.task.pk}),
+            {"csrfmiddlewaretoken": token, "is_completed": "on"},
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_etag_differs_per_user(self):
+        url = reverse("tasks:tasks-list")
+        etag = self.client.get(url)["ETag"]
+        self.client.force_login(self.other)
+        self.assertEqual(
+            self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200
+        )
+
+
+class PageCacheTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        cache.clear()
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        self.other = Worker.objects.create_user(username="other")
+        self.staff = Worker.objects.create_user(
+            username="staff", is_staff=True
+        )
+        self.task_type = TaskType.objects.create(name="Bug")
+        self.task = Task.objects.create(
+            name="first task",
+            description="description",
+            deadline=date(2030, 1, 1),
+            priority="Urgent",
+            task_type=self.task_type,
+        )
+        self.task.assignees.add(self.other)
+        self.urls = [
+            reverse("tasks:tasks-list"),
+            reverse("tasks:high-priority-tasks-list"),
+        ]
+
+    def get(self, user, url):
+        self.client.force_login(user)
+        return self.client.get(url).content.decode()
+
+    def test_page_is_shared_within_a_permission_tier(self):
+        for url in self.urls:
+            self.get(self.worker, url)
+            self.client.force_login(self.other)
+            # session, user and the versions, nothing is rendered
+            with self.assertNumQueries(3):
+                response = self.client.get(url)
+            self.assertContains(response, "first task")
+            # the navigation stays per user
+            self.assertContains(
+                response,
+                reverse("tasks:worker-detail", kwargs={"pk": self.other.pk}),
+            )
+
+    def test_staff_get_their_own_page(self):
+        url = reverse("tasks:tasks-list")
+        button = "btn btn-primary link-to-page"
+        self.assertNotIn(button, self.get(self.worker, url))
+        self.assertIn(button, self.get(self.staff, url))
+
+    def test_query_string_is_normalized(self):
+        self.assertEqual(
+            normalized_query(QueryDict("sort_by=priority&name=&cursor=x")),
+            normalized_query(QueryDict("cursor=x&sort_by=priority")),
+        )
+        self.assertNotEqual(
+            normalized_query(QueryDict("name=first")),
+            normalized_query(QueryDict("name=second")),
+        )
+        # an empty cursor selects cursor pagination
+        self.assertNotEqual(
+            normalized_query(QueryDict("cursor=")), normalized_query(QueryDict())
+        )
+
+    def test_cursor_mode_is_cached_separately(self):
+        url = reverse("tasks:tasks-list")
+        self.get(self.worker, url)
+        self.client.force_login(self.worker)
+        response = self.client.get(url, {"cursor": ""})
+        self.assertTrue(response.context["page_obj"].is_cursor)
+
+    def test_writes_invalidate_pages_and_rows(self):
+        url = reverse("tasks:tasks-list")
+        self.get(self.worker, url)
+
+        self.task.name = "renamed task"
+        self.task.save()
+        self.assertIn("renamed task", self.get(self.worker, url))
+
+        self.other.username = "renamed worker"
+        self.other.save()
+        self.assertIn("renamed worker", self.get(self.worker, url))
+
+        self.task_type.name = "Feature"
+        self.task_type.save()
+        self.assertIn("Feature", self.get(self.worker, url))
+
+        run_bulk_action("complete", [self.task.pk])
+        self.assertNotIn(
+            "renamed task",
+            self.get(self.worker, reverse("tasks:high-priority-tasks-list")),
+        )
+
+
+class MetricsTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        registry.clear()
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        self.staff = Worker.objects.create_user(
+            username="staff", is_staff=True
+        )
+        self.client.force_login(self.worker)
+
+    def metrics(self, **headers):
+        self.client.force_login(self.staff)
+        return self.client.get(reverse("metrics"), **headers)
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.get(reverse("tasks:tasks-list"))
+        self.client.get(reverse("tasks:tasks-list"))
+        text = self.metrics().content.decode()
+
+        self.assertIn(
+            'tasks_requests_total{view="tasks:tasks-list",status="200"} 2',
+            text,
+        )
+        self.assertIn(
+            'tasks_request_duration_seconds_count{view="tasks:tasks-list"} 2',
+            text,
+        )
+        self.assertIn(
+            'tasks_template_render_seconds_count{view="tasks:tasks-list"} 2',
+            text,
+        )
+        self.assertIn(
+            'tasks_db_queries_bucket{view="tasks:tasks-list",le="+Inf"} 2',
+            text,
+        )
+
+    def test_render_time_covers_every_way_of_rendering(self):
+        # render(), a View.get with render() and the page cache content
+        for name in ("tasks:index", "tasks:notifications", "tasks:tasks-list"):
+            self.client.get(reverse(name))
+            histogram = registry.series["tasks_template_render_seconds"][name]
+            self.assertEqual(histogram.count, 1, name)
+            self.assertGreater(histogram.sum, 0, name)
+        # metrics itself renders no template
+        self.metrics()
+        self.assertNotIn(
+            "metrics", registry.series["tasks_template_render_seconds"]
+        )
+
+    def test_query_count_matches_executed_queries(self):
+        url = reverse("tasks:tasks-list")
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(url)
+        histogram = registry.series["tasks_db_queries"]["tasks:tasks-list"]
+        self.assertEqual(histogram.sum, len(queries))
+
+    def test_metrics_need_staff_or_token(self):
+        self.assertEqual(
+            self.client.get(reverse("metrics")).status_code, 403
+        )
+        self.client.logout()
+        with self.settings(METRICS_TOKEN="secret"):
+            response = self.client.get(
+                reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret"
+            )
+            self.assertEqual(response.status_code, 200)
+            response = self.client.get(
+                reverse("metrics"), HTTP_AUTHORIZATION="Bearer wrong"
+            )
+            self.assertEqual(response.status_code, 403)
+
+    @override_settings(METRICS_SLOW_REQUEST_MS=0, METRICS_SLOW_QUERIES=1)
+    def test_slow_requests_are_logged_with_sql(self):
+        with self.assertLogs("tasks.metrics", "WARNING") as logs:
+            self.client.get(reverse("tasks:tasks-list"))
+        self.assertIn("tasks:tasks-list", logs.output[0])
+        self.assertIn("SELECT", logs.output[0])
+
+
+class BenchmarkTests(NPlusOneTestMixin, TestCase):
+    def test_seed_is_reproducible(self):
+        seed(5, 20, random_seed=1)
+        first = list(Task.objects.order_by("pk").values_list(
+            "name", "deadline", "priority", "is_completed"
+        ))
+        Task.objects.all().delete()
+        Worker.objects.all().delete()
+        seed(5, 20, random_seed=1)
+        self.assertEqual(len(first), 20)
+        self.assertEqual(
+            list(Task.objects.order_by("pk").values_list(
+                "name", "deadline", "priority", "is_completed"
+            )),
+            first,
+        )
+        self.assertEqual(Worker.objects.count(), 5)
+        self.assertFalse(
+            Task.objects.filter(assignees__isnull=True).exists()
+        )
+
+    def test_benchmark_reports_every_page(self):
+        seed(5, 20)
+        report = run_benchmarks(iterations=2)
+        self.assertEqual(report["meta"]["tasks"], 20)
+        self.assertIn("task_detail", report["results"])
+        for name, result in report["results"].items():
+            self.assertEqual(result["status"], 200, name)
+            self.assertGreater(result["queries"], 0, name)
+            self.assertLessEqual(result["p50_ms"], result["p95_ms"], name)
+
+
+class NPlusOneTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        position = Position.objects.create(name="Developer")
+        self.workers = [
+            Worker.objects.create_user(
+                username=f"worker{number}", position=position
+            )
+            for number in range(6)
+        ]
+        self.task = Task.objects.create(
+            name="task",
+            description="description",
+            deadline=date(2030, 1, 1),
+            priority="Low",
+            task_type=TaskType.objects.create(name="Bug"),
+        )
+        self.client.force_login(self.workers[0])
+
+    def test_fingerprint_ignores_literals(self):
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 1 AND name = 'a'"),
+            fingerprint("SELECT  * FROM t WHERE id = 22 AND name = 'it''s'"),
+        )
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s)"),
+            fingerprint("SELECT * FROM t WHERE id IN (%s, %s, %s)"),
+        )
+
+    def test_detector_reports_lazy_loads_with_call_site(self):
+        with Detector(threshold=3) as detector:
+            for worker in Worker.objects.all():
+                str(worker)
+        [violation] = detector.violations()
+        self.assertEqual(violation["count"], 6)
+        self.assertTrue(violation["call_site"].startswith("tasks/models.py"))
+        self.assertIn("tasks_position", violation["fingerprint"])
+
+    def test_pages_listing_workers_stay_flat(self):
+        for url in [
+            reverse("tasks:task-create"),
+            reverse("tasks:assign-member", kwargs={"pk": self.task.pk}),
+        ]:
+            self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_repeated_queries_fail_the_request(self):
+        # Worker.__str__ as the label loads a position per selected assignee
+        self.task.assignees.set(self.workers)
+        url = reverse("tasks:assign-member", kwargs={"pk": self.task.pk})
+        with mock.patch.object(
+            WorkerMultipleChoiceField,
+            "label_from_instance",
+            forms.ModelMultipleChoiceField.label_from_instance,
+        ):
+            with self.assertRaises(NPlusOneDetected):
+                self.client.get(url)
+
+            with self.settings(NPLUSONE_DETECTION="warn"):
+                with self.assertLogs("tasks.nplusone", "WARNING") as logs:
+                    response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('"call_site": "tasks/models.py', logs.output[0])
+
+
+class AssigneePickerTests(NPlusOneTestMixin, TestCase):
+    def setUp(self):
+        self.position = Position.objects.create(name="Developer")
+        self.workers = [
+            Worker.objects.create_user(
+                username=f"dev{number:02}",
+                password="worker_test!",
+                position=self.position,
+            )
+            for number in range(25)
+        ]
+        self.task = Task.objects.create(
+            name="task",
+            description="description",
+            deadline=date(2030, 1, 1),
+            priority="Low",
+            task_type=TaskType.objects.create(name="Bug"),
+        )
+        self.task.assignees.set(self.workers[:2])
+        self.client.force_login(self.workers[0])
+
+    def test_lookup_pages_by_username(self):
+        url = reverse("tasks:api-worker-lookup")
+        first = self.client.get(url, {"q": "dev"}).json()
+        self.assertEqual(len(first["results"]), 20)
+        self.assertEqual(first["results"][0]["text"], "dev00")
+        self.assertEqual(first["next"], "dev19")
+
+        second = self.client.get(
+            url, {"q": "dev", "after": first["next"]}
+        ).json()
+        self.assertEqual(
+            [row["text"] for row in second["results"]],
+            ["dev20", "dev21", "dev22", "dev23", "dev24"]
+        )
+        self.assertIsNone(second["next"])
+
+        self.client.logout()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_forms_render_only_selected_workers(self):
+        response = self.client.get(
+            reverse("tasks:assign-member", kwargs={"pk": self.task.pk})
+        )
+        self.assertContains(response, "data-remote-url")
+        self.assertContains(response, "<option", count=2)
+
+        response = self.client.get(reverse("tasks:task-create"))
+        self.assertNotContains(response, "dev24")
+
+    def test_validation_checks_only_the_submitted_workers(self):
+        form = AssigneesForm(
+            {"assignees": [self.workers[3].pk, self.workers[4].pk]}
+        )
+        # the field's own pk IN (...) lookup
+        with self.assertNumQueries(1):
+            self.assertTrue(form.is_valid())
+
+        self.assertFalse(AssigneesForm({"assignees": ["999"]}).is_valid())
+
+        form = WorkerPositionUpdateForm(
+            {"position": self.position.pk}, instance=self.workers[0]
+        )
+        self.assertTrue(form.is_valid())
+
+
+@override_settings(DATABASE_REPLICAS=["replica1", "replica2"])
+class ReplicaRoutingTests(TestCase):
+    def routed(self, method, url, cookies=None):
+        """The alias task reads went to and the response."""
+        request = getattr(RequestFactory(), method)(url)
+        request.COOKIES.update(cookies or {})
+        request.resolver_match = resolve(url)
+        aliases = []
+
+        def view(request):
+            middleware.process_view(request, None, (), {})
+            aliases.append(ReplicaRouter().db_for_read(Task))
+            return HttpResponse()
+
+        middleware = ReplicaMiddleware(view)
+        response = middleware(request)
+        return aliases[0], response
+
+    def test_list_views_rotate_over_replicas(self):
+        url = reverse("tasks:tasks-list")
+        first, _ = self.routed("get", url)
+        second, _ = self.routed("get", url)
+        self.assertEqual({first, second}, {"replica1", "replica2"})
+        # outside a request everything reads from the primary
+        self.assertIsNone(ReplicaRouter().db_for_read(Task))
+
+    def test_other_views_and_apps_read_from_primary(self):
+        alias, _ = self.routed(
+            "get", reverse("tasks:task-detail", kwargs={"pk": 1})
+        )
+        self.assertIsNone(alias)
+        self.assertIsNone(ReplicaRouter().db_for_read(Session))
+        self.assertEqual(ReplicaRouter().db_for_write(Task), "default")
+
+    def test_writes_stick_to_primary(self):
+        url = reverse("tasks:tasks-list")
+        alias, response = self.routed("post", url)
+        self.assertIsNone(alias)
+        cookie = response.cookies[STICKY_COOKIE]
+        self.assertEqual(
+            cookie["max-age"], settings.DATABASE_REPLICA_STICKY_SECONDS
+        )
+
+        alias, _ = self.routed("get", url, {STICKY_COOKIE: cookie.value})
+        self.assertIsNone(alias)
+
+
+@override_settings(DATABASE_REPLICAS=["replica"])
+class ReplicaDatabaseTests(NPlusOneTestMixin, TestCase):
+    """Against a second SQLite file standing in for a replica that
+    hasn't caught up: it has the schema and the worker, not the task."""
+
+    @classmethod
+    def setUpClass(cls):
+        # added here, the test runner only sets up configured databases
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        connections.settings["replica"] = {
+            **connections.settings["default"],
+            "NAME": os.path.join(directory.name, "replica.sqlite3"),
+        }
+        cls.addClassCleanup(cls.remove_replica)
+        call_command("migrate", database="replica", verbosity=0)
+        cls.databases = {"default", "replica"}
+        super().setUpClass()
+
+    @classmethod
+    def remove_replica(cls):
+        connections["replica"].close()
+        del connections["replica"]
+        del connections.settings["replica"]
+
+    def setUp(self):
+        cache.clear()
+        self.worker = Worker.objects.create_user(
+            username="worker", password="worker_test!"
+        )
+        self.worker.save(using="replica")
+        self.task = Task.objects.create(
+            name="Only on the primary",
+            description="description",
+            deadline=date(2030, 1, 1),
+            priority="Low",
+            task_type=TaskType.objects.create(name="Bug"),
+        )
+        self.client.force_login(self.worker)
+
+    def test_reads_follow_writes(self):
+        url = reverse("tasks:tasks-list")
+        self.assertNotContains(self.client.get(url), "Only on the primary")
+
+        self.client.post(
+            reverse("tasks:task-update", kwargs={"pk": self.task.pk}),
+            {"is_completed": "on"},
+        )
+        cache.clear()
+        self.assertContains(self.client.get(url), "Only on the primary")
@@ -1,19 +1,32 @@
 from django.urls import path
 
+from tasks.api import (
+    bulk_tasks,
+    dashboard_stats,
+    search_tasks,
+    search_workers,
+    worker_lookup,
+)
 from tasks.views import (
     index,
+    DashboardTeamView,
+    DashboardMyTasksView,
     WorkerListView,
     WorkerCreateView,
     WorkerDetailView,
+    WorkloadLeaderboardView,
     WorkerPositionUpdateView,
     WorkerDeleteView,
     TaskListView,
+    TaskExportView,
     TaskDetailView,
     TaskCreateView,
     TaskUpdateView,
     TaskDeleteView,
     TaskAssignView,
     NotificationView,
+    DueSoonView,
+    DeadlineCalendarView,
     TaskUrgentHighView,
     TaskCompletedView
 )
@@ -21,7 +34,33 @@ from tasks.views import (
 
 urlpatterns = [
     path("", index, name="index"),
+    path(
+        "api/dashboard/stats/",
+        dashboard_stats,
+        name="dashboard-stats"
+    ),
+    path(
+        "dashboard/team/",
+        DashboardTeamView.as_view(),
+        name="dashboard-team"
+    ),
+    path(
+        "dashboard/my-tasks/",
+        DashboardMyTasksView.as_view(),
+        name="dashboard-my-tasks"
+    ),
+    path("api/tasks/bulk/", bulk_tasks, name="api-bulk-tasks"),
+    path("api/search/tasks/", search_tasks, name="api-search-tasks"),
+    path("api/search/workers/", search_workers, name="api-search-workers"),
+    path(
+        "api/workers/lookup/", worker_lookup, name="api-worker-lookup"
+    ),
     path("workers/", WorkerListView.as_view(), name="workers-list"),
+    path(
+        "workers/workload/",
+        WorkloadLeaderboardView.as_view(),
+        name="workload-leaderboard"
+    ),
     path("workers/create/", WorkerCreateView.as_view(), name="worker-create"),
     path(
         "workers/<int:pk>/", WorkerDetailView.as_view(), name="worker-detail"
@@ -37,6 +76,7 @@ urlpatterns = [
         name="worker-delete",
     ),
     path("tasks/", TaskListView.as_view(), name="tasks-list"),
+    path("tasks/export/", TaskExportView.as_view(), name="tasks-export"),
     path(
         "tasks/urgnent_high/",
         TaskUrgentHighView.as_view(),
@@ -58,6 +98,12 @@ urlpatterns = [
          TaskAssignView.as_view(),
          name="assign-member"
     ),
+    path("tasks/due-soon/", DueSoonView.as_view(), name="tasks-due-soon"),
+    path(
+        "tasks/calendar/",
+        DeadlineCalendarView.as_view(),
+        name="tasks-calendar"
+    ),
     path(
         "notifications/",
         NotificationView.as_view(),
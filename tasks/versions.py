@@ -0,0 +1,82 @@
+import hashlib
+
+from django.db.models import F
+from django.middleware.csrf import get_token
+
+from tasks.models import CollectionVersion
+
+TASKS = "tasks"
+WORKERS = "workers"
+TASK_TYPES = "task_types"
+COLLECTIONS = (TASKS, WORKERS, TASK_TYPES)
+# versions the cached workload matrix, not part of the page cache keys
+WORKLOAD = "workload"
+
+
+def bump(*names):
+    """Advance every named version with a single UPDATE."""
+    updated = CollectionVersion.objects.filter(name__in=names).update(
+        version=F("version") + 1
+    )
+    if updated == len(names):
+        return
+    existing = set(
+        CollectionVersion.objects.filter(name__in=names).values_list(
+            "name", flat=True
+        )
+    )
+    for name in set(names) - existing:
+        _, created = CollectionVersion.objects.get_or_create(
+            name=name, defaults={"version": 1}
+        )
+        if not created:
+            # lost a race with a concurrent insert
+            bump(name)
+
+
+def advance(name, expected):
+    """Bump `name` only if it is still at `expected`, False when another
+    writer got there first."""
+    return bool(
+        CollectionVersion.objects.filter(
+            name=name, version=expected
+        ).update(version=F("version") + 1)
+    )
+
+
+def get_versions(*names):
+    """{name: version} in one query, 0 for collections never written."""
+    versions = dict.fromkeys(names, 0)
+    versions.update(
+        CollectionVersion.objects.filter(name__in=names).values_list(
+            "name", "version"
+        )
+    )
+    return versions
+
+
+def get_request_versions(request):
+    """Every collection version, read once per request however many
+    validators and caches ask for them."""
+    if not hasattr(request, "_collection_versions"):
+        request._collection_versions = get_versions(*COLLECTIONS)
+    return request._collection_versions
+
+
+def make_etag(request, *parts):
+    """
+    ETag of a page rendered from `parts`. The user and the full path are
+    mixed in, pages differ per user (navigation, staff buttons) and per
+    query string, and so is the CSRF secret the page's forms carry: it
+    is rotated on login and a 304 must not keep a stale one.
+    """
+    # creates the secret the page will render, so the first ETag already
+    # matches the cookie sent with the response
+    get_token(request)
+    key = "|".join(map(str, (
+        request.user.pk,
+        request.get_full_path(),
+        request.META["CSRF_COOKIE"],
+        *parts,
+    )))
+    return hashlib.md5(key.encode(), usedforsecurity=False).hexdigest()
@@ -1,72 +1,183 @@
-from datetime import datetime, timedelta
+import calendar
+from datetime import MAXYEAR, MINYEAR, date, timedelta
 
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
+from django.http import StreamingHttpResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse_lazy, reverse
+from django.utils import timezone
 from django.utils.decorators import method_decorator
 from django.views import generic, View
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.views.decorators.http import require_POST
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_POST
 
 from .forms import (
     WorkerSearchForm,
     WorkerCreationForm,
     WorkerPositionUpdateForm,
     TaskSearchForm,
-    AssigneesForm
+    AssigneesForm,
+    TaskCreationForm,
 )
-from .models import Worker, Task
+from . import deadlines, exporting, versions, workload
+from .counters import get_counters
+from .filters import filter_tasks
+from .models import Worker, Task, TaskCounters, TaskType
+from .notifications import get_notification_tasks
+from .page_cache import PageCacheMixin
+from .pagination import CursorPaginationMixin
+from .search import get_search_backend
+from .sorting import get_task_sort
+from .services import DashboardStats
+
+# fragments are per user, browsers may reuse them for a short while
+DASHBOARD_FRAGMENT_MAX_AGE = 30
+
+
+def updated_at(request, model, pk):
+    """The row's updated_at, looked up once per request for both the
+    ETag and Last-Modified."""
+    cached = request.__dict__.setdefault("_updated_at", {})
+    if (model, pk) not in cached:
+        cached[model, pk] = model.objects.filter(pk=pk).order_by(
+        ).values_list("updated_at", flat=True).first()
+    return cached[model, pk]
+
+
+def task_list_etag(request, *args, **kwargs):
+    return versions.make_etag(
+        request, *versions.get_request_versions(request).values()
+    )
+
+
+def task_last_modified(request, pk):
+    return updated_at(request, Task, pk)
+
+
+def task_detail_etag(request, pk):
+    modified = updated_at(request, Task, pk)
+    if modified is None:
+        return None
+    return versions.make_etag(
+        request,
+        modified.isoformat(),
+        versions.get_request_versions(request)[versions.WORKERS],
+    )
+
+
+def worker_detail_etag(request, pk):
+    modified = updated_at(request, Worker, pk)
+    if modified is None:
+        return None
+    # task counters and workload follow the tasks, overdue the date
+    return versions.make_etag(
+        request,
+        modified.isoformat(),
+        versions.get_request_versions(request)[versions.TASKS],
+        timezone.localdate().isoformat(),
+    )
+
+
+def conditional(**condition_kwargs):
+    """Answer unchanged pages with 304 before the view runs, browsers
+    revalidate every time."""
+    return method_decorator(
+        [
+            cache_control(private=True, no_cache=True),
+            condition(**condition_kwargs),
+        ],
+        name="get",
+    )
 
 
 @login_required
 def index(request):
     """View function for the home page of the site."""
-    worker_list = Worker.objects.select_related("position")
-    tasks_list = Task.objects.prefetch_related("assignees")
-    logged_worker = request.user
-    num_workers = worker_list.count()
-    num_tasks = tasks_list.count()
-    num_tasks_is_solved = tasks_list.filter(is_completed=True).count()
-    urgent_and_high = tasks_list.filter(priority__in=["Urgent", "High"], is_completed=False).count()
-    current_user_task_list = tasks_list.filter(assignees__in=[request.user.id])
-
+    # team members and the user's tasks are loaded as separate fragments
     context = {
-        "num_workers": num_workers,
-        "num_tasks": num_tasks,
-        "num_tasks_is_solved": num_tasks_is_solved,
-        "urgent_and_high": urgent_and_high,
-        "worker_list": worker_list,
-        "current_user_task_list": current_user_task_list,
-        "logged_worker": logged_worker,
+        **DashboardStats.collect().as_dict(),
+        "logged_worker": request.user,
     }
 
     return render(request, "tasks/index.html", context=context)
 
 
-class WorkerListView(LoginRequiredMixin, generic.ListView):
+@method_decorator(
+    cache_control(private=True, max_age=DASHBOARD_FRAGMENT_MAX_AGE),
+    name="dispatch"
+)
+class DashboardFragmentView(
+    LoginRequiredMixin, CursorPaginationMixin, generic.ListView
+):
+    """Paginated table rendered on its own and fetched by the dashboard,
+    so the dashboard response does not grow with the number of rows."""
+    paginate_by = 10
+
+    def use_cursor_pagination(self):
+        return True
+
+
+class DashboardTeamView(DashboardFragmentView):
+    template_name = "tasks/fragments/dashboard_team.html"
+    context_object_name = "worker_list"
+    cursor_ordering = ("username",)
+    queryset = Worker.objects.select_related("position").only(
+        "username", "first_name", "last_name", "position__name"
+    )
+
+
+class DashboardMyTasksView(DashboardFragmentView):
+    template_name = "tasks/fragments/dashboard_my_tasks.html"
+    context_object_name = "current_user_task_list"
+    cursor_ordering = get_task_sort("deadline").ordering
+
+    def get_queryset(self):
+        return Task.objects.filter(assignees=self.request.user).only(
+            "name", "deadline", "priority", "priority_rank", "is_completed"
+        )
+
+
+class WorkerListView(
+    LoginRequiredMixin, CursorPaginationMixin, generic.ListView
+):
     model = Worker
     paginate_by = 5
+    cursor_ordering = ("username",)
 
     def get_context_data(self, *, object_list=None, **kwargs):
         context = super(WorkerListView, self).get_context_data(**kwargs)
         username = self.request.GET.get("username", "")
         context["search_form"] = WorkerSearchForm(
-            initial={"username": username}
+            initial={
+                "username": username,
+                "fuzzy": bool(self.request.GET.get("fuzzy")),
+            }
         )
 
         return context
 
+    def get_cursor_ordering(self):
+        # search results are ordered by rank
+        if self.request.GET.get("username"):
+            return None
+        return super().get_cursor_ordering()
+
     def get_queryset(self):
         queryset = Worker.objects.select_related("position")
         username = self.request.GET.get("username")
 
         if username:
-            return queryset.filter(username__icontains=username)
+            backend = get_search_backend()
+            if self.request.GET.get("fuzzy"):
+                return backend.fuzzy_search_workers(queryset, username)
+            return backend.search_workers(queryset, username)
 
         return queryset
 
 
+@conditional(etag_func=worker_detail_etag)
 class WorkerDetailView(LoginRequiredMixin, generic.DetailView):
     model = Worker
     queryset = Worker.objects.select_related("position")
@@ -75,6 +186,42 @@ class WorkerDetailView(LoginRequiredMixin, generic.DetailView):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         context['is_admin'] = user.is_superuser
+        context["task_counters"] = get_counters(
+            TaskCounters.Scope.WORKER, self.object.pk
+        )
+        matrix = workload.get_workload()
+        breakdown = matrix.breakdown(self.object.pk)
+        task_types = TaskType.objects.in_bulk(breakdown)
+        context["workload_totals"] = matrix.totals(self.object.pk)
+        context["workload"] = [
+            (task_types[type_id], counts)
+            for type_id, counts in breakdown.items()
+            if type_id in task_types
+        ]
+        return context
+
+
+class WorkloadLeaderboardView(LoginRequiredMixin, generic.TemplateView):
+    template_name = "tasks/workload_leaderboard.html"
+    limit = 25
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        metric = self.request.GET.get("metric")
+        if metric not in workload.METRICS:
+            metric = "open"
+
+        board = workload.get_workload().leaderboard(metric, self.limit)
+        workers = Worker.objects.select_related("position").only(
+            "username", "first_name", "last_name", "position__name"
+        ).in_bulk([worker_id for worker_id, _ in board])
+        context["metric"] = metric
+        context["metrics"] = workload.METRICS
+        context["leaderboard"] = [
+            (workers[worker_id], totals)
+            for worker_id, totals in board
+            if worker_id in workers
+        ]
         return context
 
 
@@ -94,35 +241,69 @@ class WorkerDeleteView(LoginRequiredMixin, generic.DeleteView):
     success_url = reverse_lazy("")
 
 
-class TaskListView(LoginRequiredMixin, generic.ListView):
+@conditional(etag_func=task_list_etag)
+class TaskListView(
+    LoginRequiredMixin, PageCacheMixin, CursorPaginationMixin, generic.ListView
+):
     model = Task
     paginate_by = 8
+    # same ordering as sort_by=deadline, served by task_deadline_sort_idx
+    cursor_ordering = get_task_sort("deadline").ordering
+    page_cache_name = "task_list"
+    content_template_name = "tasks/fragments/task_list_content.html"
 
-    def get_context_data(self, *, object_list=None, **kwargs):
-        context = super(TaskListView, self).get_context_data(**kwargs)
+    def get_content_context_data(self, **kwargs):
+        context = super().get_content_context_data(**kwargs)
         name = self.request.GET.get("name", "")
         sort_by = self.request.GET.get("sort_by", "")
+        if not get_task_sort(sort_by):
+            sort_by = ""
         context["search_form"] = TaskSearchForm(
-            initial={"name": name}
+            initial={
+                "name": name,
+                "fuzzy": bool(self.request.GET.get("fuzzy")),
+                "sort_by": sort_by,
+            }
         )
         context["sort_by"] = sort_by
 
         return context
 
+    def get_cursor_ordering(self):
+        sort = get_task_sort(self.request.GET.get("sort_by"))
+        if sort:
+            return sort.ordering
+        # search results are ordered by rank
+        if self.request.GET.get("name"):
+            return None
+        return super().get_cursor_ordering()
+
     def get_queryset(self):
-        queryset = Task.objects.prefetch_related("assignees")
-        name = self.request.GET.get("name")
-        sort_by = self.request.GET.get("sort_by")
+        return filter_tasks(Task.objects.for_listing(), self.request.GET)
 
-        if name:
-            return queryset.filter(name__icontains=name)
 
-        if sort_by:
-            queryset = queryset.order_by(sort_by)
+class TaskExportView(LoginRequiredMixin, View):
+    """The task list, as filtered by the GET parameters, streamed as CSV
+    or JSON lines without loading it into memory."""
 
-        return queryset
+    def get(self, request):
+        format = request.GET.get("format", "csv")
+        if format not in exporting.FORMATS:
+            format = "csv"
+
+        response = StreamingHttpResponse(
+            exporting.export_tasks(request.GET, format),
+            content_type=exporting.CONTENT_TYPES[format],
+        )
+        response["Content-Disposition"] = (
+            f'attachment; filename="tasks.{format}"'
+        )
+        return response
 
 
+@conditional(
+    etag_func=task_detail_etag, last_modified_func=task_last_modified
+)
 class TaskDetailView(LoginRequiredMixin, generic.DetailView):
     model = Task
     queryset = Task.objects.prefetch_related("assignees")
@@ -139,16 +320,8 @@ class TaskDetailView(LoginRequiredMixin, generic.DetailView):
 
 class TaskCreateView(LoginRequiredMixin, generic.CreateView):
     model = Task
-    fields = [
-        "name",
-        "description",
-        "deadline",
-        "priority",
-        "task_type",
-        "assignees"
-    ]
+    form_class = TaskCreationForm
     queryset = Task.objects.prefetch_related("assignees")
-    # form_class = TaskCreationForm
     success_url = reverse_lazy("tasks:tasks-list")
 
 
@@ -190,7 +363,6 @@ class TaskAssignView(View):
         if form.is_valid():
             assignees = form.cleaned_data["assignees"]
             task.assignees.set(assignees)
-            task.save()
             return redirect("tasks:task-detail", pk=task.id)
         return render(request, self.template_name, {"form": form, "task": task})
 
@@ -199,13 +371,7 @@ class NotificationView(LoginRequiredMixin, View):
     template_name = "tasks/notifications.html"
 
     def get(self, request):
-        user = request.user
-        deadline = datetime.now() + timedelta(days=3)
-        tasks = Task.objects.prefetch_related(
-            "assignees").filter(
-            assignees__in=[user],
-            deadline__lte=deadline
-        ).order_by("deadline")
+        tasks = get_notification_tasks(request.user.pk)
 
         context = {
             'tasks': tasks
@@ -214,28 +380,75 @@ class NotificationView(LoginRequiredMixin, View):
         return render(request, self.template_name, context)
 
 
-class TaskUrgentHighView(LoginRequiredMixin, View):
-    template_name = "tasks/urgent_high_priority_task_list.html"
+class DueSoonView(LoginRequiredMixin, generic.TemplateView):
+    """Open tasks per day for the coming week, read from the deadline
+    buckets."""
+    template_name = "tasks/due_soon.html"
+    days = 7
 
-    def get(self, request):
-        tasks_uh = Task.objects.prefetch_related(
-            "assignees"
-        ).filter(priority__in=["Urgent", "High"], is_completed=False)
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        today = timezone.localdate()
+        context["overdue"] = deadlines.overdue_count(today)
+        context["due_counts"] = deadlines.due_counts(
+            today, today + timedelta(days=self.days - 1)
+        )
+        return context
 
-        context = {
-            "tasks_uh": tasks_uh
-        }
-        return render(request, self.template_name, context)
+
+class DeadlineCalendarView(LoginRequiredMixin, generic.TemplateView):
+    """Month grid of open tasks per deadline day, `month` is YYYY-MM."""
+    template_name = "tasks/deadline_calendar.html"
+
+    def get_month(self):
+        try:
+            year, month = map(int, self.request.GET["month"].split("-"))
+            # the grid and the neighbour links reach into adjacent months
+            if not MINYEAR < year < MAXYEAR:
+                raise ValueError(year)
+            return date(year, month, 1)
+        except (KeyError, ValueError):
+            return timezone.localdate().replace(day=1)
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        month = self.get_month()
+        weeks = calendar.Calendar().monthdatescalendar(month.year, month.month)
+        today = timezone.localdate()
+        counts = deadlines.due_counts(weeks[0][0], weeks[-1][-1], today)
+        context["month"] = month
+        context["today"] = today
+        # past days are only kept as one total
+        context["overdue"] = deadlines.overdue_count(today)
+        context["weeks"] = [
+            [(day, counts[day]) for day in week] for week in weeks
+        ]
+        context["previous_month"] = (month - timedelta(days=1)).replace(
+            day=1
+        )
+        context["next_month"] = (month + timedelta(days=31)).replace(day=1)
+        return context
+
+
+class TaskUrgentHighView(LoginRequiredMixin, PageCacheMixin, generic.ListView):
+    template_name = "tasks/urgent_high_priority_task_list.html"
+    context_object_name = "tasks_uh"
+    page_cache_name = "urgent_high_task_list"
+    content_template_name = (
+        "tasks/fragments/urgent_high_priority_task_list_content.html"
+    )
+
+    def get_queryset(self):
+        return Task.objects.for_listing().filter(
+            priority__in=["Urgent", "High"], is_completed=False
+        )
 
 
-class TaskCompletedView(LoginRequiredMixin, View):
+class TaskCompletedView(LoginRequiredMixin, PageCacheMixin, generic.ListView):
     template_name = "tasks/completed_tasks_list.html"
+    context_object_name = "tasks_completed"
+    page_cache_name = "completed_task_list"
+    content_template_name = "tasks/fragments/completed_tasks_list_content.html"
 
-    def get(self, request):
-        tasks_completed = Task.objects.prefetch_related(
-            "assignees"
-        ).filter(is_completed=True)
-        context = {
-            "tasks_completed": tasks_completed
-        }
-        return render(request, self.template_name, context)
+    def get_queryset(self):
+        return Task.objects.for_listing().filter(is_completed=True)
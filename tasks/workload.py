@@ -0,0 +1,247 @@
+from array import array
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from tasks import versions
+from tasks.counters import URGENT_PRIORITIES
+from tasks.models import Task
+from tasks.notifications import seconds_until_midnight
+
+CACHE_KEY = "tasks:workload"
+METRICS = ("open", "completed", "overdue", "urgent")
+
+Assignment = Task.assignees.through
+
+
+def get_cache():
+    return caches[getattr(settings, "WORKLOAD_CACHE", "default")]
+
+
+def metric_aggregates(today):
+    return {
+        "open": Count("pk", filter=Q(task__is_completed=False)),
+        "completed": Count("pk", filter=Q(task__is_completed=True)),
+        "overdue": Count(
+            "pk",
+            filter=Q(task__is_completed=False, task__deadline__lt=today),
+        ),
+        "urgent": Count(
+            "pk",
+            filter=Q(
+                task__is_completed=False,
+                task__priority__in=URGENT_PRIORITIES,
+            ),
+        ),
+    }
+
+
+def task_vector(is_completed, priority, deadline, today):
+    """What one assignment of a task adds to every metric."""
+    is_open = not is_completed
+    return (
+        int(is_open),
+        int(not is_open),
+        int(is_open and deadline < today),
+        int(is_open and priority in URGENT_PRIORITIES),
+    )
+
+
+class WorkloadMatrix:
+    """
+    Assignment counts per worker, task type and metric in one flat
+    array("l"), row-major by worker then type then METRICS. Only valid
+    for the day it was built on, overdue depends on the date.
+    """
+
+    def __init__(self, worker_ids=(), type_ids=(), today=None):
+        self.today = today or timezone.localdate()
+        self.workers = {pk: index for index, pk in enumerate(worker_ids)}
+        self.types = {pk: index for index, pk in enumerate(type_ids)}
+        self.cells = array("l", [0]) * (self._row_size * len(self.workers))
+
+    @property
+    def _row_size(self):
+        return len(self.types) * len(METRICS)
+
+    def _offset(self, worker_id, type_id):
+        return (
+            self.workers[worker_id] * self._row_size
+            + self.types[type_id] * len(METRICS)
+        )
+
+    @classmethod
+    def build(cls, today=None):
+        """One GROUP BY over the assignees table."""
+        today = today or timezone.localdate()
+        rows = list(
+            Assignment.objects.order_by().values(
+                "worker_id", "task__task_type_id"
+            ).annotate(**metric_aggregates(today))
+        )
+        matrix = cls(
+            sorted({row["worker_id"] for row in rows}),
+            sorted({row["task__task_type_id"] for row in rows}),
+            today,
+        )
+        for row in rows:
+            offset = matrix._offset(
+                row["worker_id"], row["task__task_type_id"]
+            )
+            for position, metric in enumerate(METRICS):
+                matrix.cells[offset + position] = row[metric]
+        return matrix
+
+    def add(self, worker_id, type_id, vector, sign=1):
+        """Apply one assignment change, False when the type is unknown
+        and the matrix has to be rebuilt."""
+        if type_id not in self.types:
+            return False
+        if worker_id not in self.workers:
+            self.workers[worker_id] = len(self.workers)
+            self.cells.extend(array("l", [0]) * self._row_size)
+        offset = self._offset(worker_id, type_id)
+        for position, value in enumerate(vector):
+            self.cells[offset + position] += sign * value
+        return True
+
+    def breakdown(self, worker_id):
+        """{type_id: {metric: count}} for the types the worker has tasks
+        of."""
+        if worker_id not in self.workers:
+            return {}
+        result = {}
+        for type_id in self.types:
+            offset = self._offset(worker_id, type_id)
+            counts = self.cells[offset:offset + len(METRICS)]
+            if any(counts):
+                result[type_id] = dict(zip(METRICS, counts))
+        return result
+
+    def totals(self, worker_id):
+        totals = dict.fromkeys(METRICS, 0)
+        for counts in self.breakdown(worker_id).values():
+            for metric, value in counts.items():
+                totals[metric] += value
+        return totals
+
+    def leaderboard(self, metric="open", limit=None):
+        """(worker_id, totals) pairs, highest `metric` first."""
+        board = sorted(
+            ((pk, self.totals(pk)) for pk in self.workers),
+            key=lambda item: (-item[1][metric], item[0]),
+        )
+        return board[:limit]
+
+
+def cache_key(version):
+    return f"{CACHE_KEY}:{version}"
+
+
+def get_version():
+    return versions.get_versions(versions.WORKLOAD)[versions.WORKLOAD]
+
+
+def get_cached(version=None):
+    """The matrix cached for the current workload version, None when
+    there is none."""
+    if version is None:
+        version = get_version()
+    return get_cache().get(cache_key(version))
+
+
+def get_workload():
+    """The cached matrix, rebuilt once a day or after it was dropped."""
+    version = get_version()
+    matrix = get_cached(version)
+    if matrix is None or matrix.today != timezone.localdate():
+        matrix = WorkloadMatrix.build()
+        get_cache().set(
+            cache_key(version), matrix, seconds_until_midnight()
+        )
+    return matrix
+
+
+def _change_matrix(change):
+    """
+    Store `change(matrix)` of the cached matrix as the next workload
+    version, or drop the matrix when `change` returns False.
+
+    The version is a CollectionVersion row advanced with a compare and
+    set, so every write makes the matrices cached for older versions
+    unreachable, in per-process caches too, and of two concurrent writers
+    only the first stores its matrix; the other leaves the new version
+    uncached for the next read to build instead of losing an update.
+    """
+    version = get_version()
+    matrix = get_cached(version)
+    if (
+        matrix is None
+        or matrix.today != timezone.localdate()
+        or not change(matrix)
+        or not versions.advance(versions.WORKLOAD, version)
+    ):
+        invalidate()
+        return
+
+    transaction.on_commit(
+        lambda: get_cache().set(
+            cache_key(version + 1), matrix, seconds_until_midnight()
+        )
+    )
+
+
+def apply_assignments(tasks, worker_ids, sign):
+    """
+    Update the cached matrix for `tasks` (dicts with task_type_id,
+    is_completed, priority and deadline) gaining (sign 1) or losing
+    (sign -1) the workers in `worker_ids`.
+    """
+    def change(matrix):
+        for task in tasks:
+            vector = task_vector(
+                task["is_completed"], task["priority"], task["deadline"],
+                matrix.today,
+            )
+            for worker_id in worker_ids:
+                if not matrix.add(
+                    worker_id, task["task_type_id"], vector, sign
+                ):
+                    return False
+        return True
+
+    _change_matrix(change)
+
+
+def apply_task_change(previous, task):
+    """
+    Move the assignments of a saved `task` from its `previous` values
+    (a dict like apply_assignments takes) to its current ones. Edits that
+    change no metric, a rename for one, leave the matrix alone.
+    """
+    today = timezone.localdate()
+    old = task_vector(
+        previous["is_completed"], previous["priority"], previous["deadline"],
+        today,
+    )
+    new = task_vector(task.is_completed, task.priority, task.deadline, today)
+    if old == new and previous["task_type_id"] == task.task_type_id:
+        return
+
+    def change(matrix):
+        for worker_id in task.assignees.values_list("pk", flat=True):
+            if not (
+                matrix.add(worker_id, previous["task_type_id"], old, -1)
+                and matrix.add(worker_id, task.task_type_id, new)
+            ):
+                return False
+        return True
+
+    _change_matrix(change)
+
+
+def invalidate():
+    versions.bump(versions.WORKLOAD)